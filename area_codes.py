@@ -0,0 +1,145 @@
+"""
+Timezones of North American area codes, for sending at each recipient's local time.
+"""
+
+from collections.abc import Iterable
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from progress import BulkStats
+from scheduling import ScheduleSpec
+
+# Only for annotations; send_sms imports this module for its CLI
+if TYPE_CHECKING:
+    from send_sms import SMSSender
+
+# Area codes by IANA timezone. An area code split between zones is listed
+# under the zone most of its numbers are in.
+_ZONE_AREA_CODES = {
+    "America/New_York": (
+        # CT, DC, DE, FL, GA
+        "203 475 860 959 202 771 302 239 305 321 352 386 407 448 561 656 689 727 754 772 "
+        "786 813 850 863 904 941 954 229 404 470 478 678 706 762 770 912 943 "
+        # IN, KY, MA, MD, ME, NC, NH, NJ
+        "260 317 463 574 765 812 930 502 606 859 339 351 413 508 617 774 781 857 978 "
+        "227 240 301 410 443 667 207 252 336 704 743 828 910 919 980 984 603 "
+        "201 551 609 640 732 848 856 862 908 973 "
+        # NY, OH, PA, RI, SC, TN, VA, VT, WV
+        "212 315 332 347 363 516 518 585 607 631 646 680 716 718 838 845 914 917 929 934 "
+        "216 220 234 283 326 330 380 419 440 513 567 614 740 937 "
+        "215 223 267 272 412 445 484 570 582 610 717 724 814 835 878 401 "
+        "803 839 843 854 864 423 865 276 434 540 571 703 757 804 826 948 802 304 681"
+    ),
+    "America/Detroit": (
+        "231 248 269 313 517 586 616 679 734 810 906 947 989"
+    ),
+    "America/Toronto": (
+        # ON, QC
+        "226 249 289 343 365 382 416 437 519 548 613 647 683 705 742 753 807 905 942 "
+        "263 354 367 418 438 450 468 514 579 581 819 873"
+    ),
+    "America/Chicago": (
+        # AL, AR, IA, IL, IN, KS, KY, LA, MN, MO, MS
+        "205 251 256 334 659 938 327 479 501 870 319 515 563 641 712 "
+        "217 224 309 312 331 447 464 618 630 708 730 773 779 815 847 872 219 "
+        "316 620 785 913 270 364 225 318 337 504 985 218 320 507 612 651 763 952 "
+        "314 417 557 573 636 660 816 975 228 601 662 769 "
+        # ND, NE, OK, SD, TN, TX, WI
+        "701 308 402 531 405 539 572 580 918 605 615 629 731 901 931 "
+        "210 214 254 281 325 346 361 409 430 432 469 512 682 713 726 737 806 817 830 "
+        "832 903 936 940 945 956 972 979 262 274 414 534 608 715 920"
+    ),
+    "America/Winnipeg": "204 431 584",
+    "America/Regina": "306 474 639",
+    "America/Denver": (
+        # CO, ID, MT, NM, TX (El Paso), UT, WY
+        "303 719 720 970 983 208 986 406 505 575 915 385 435 801 307"
+    ),
+    "America/Phoenix": "480 520 602 623 928",
+    "America/Edmonton": "368 403 587 780 825",
+    "America/Los_Angeles": (
+        # CA, NV, OR, WA
+        "209 213 279 310 323 341 350 369 408 415 424 442 510 530 559 562 619 626 628 650 "
+        "657 661 669 707 714 747 760 805 818 820 831 840 858 909 916 925 949 951 "
+        "702 725 775 458 503 541 971 206 253 360 425 509 564"
+    ),
+    "America/Vancouver": "236 250 604 672 778",
+    "America/Anchorage": "907",
+    "Pacific/Honolulu": "808",
+    "America/Halifax": "506 782 902",
+    "America/St_Johns": "709 879",
+    "America/Puerto_Rico": "787 939",
+}
+
+AREA_CODE_TIMEZONES: dict[str, str] = {
+    area_code: zone
+    for zone, area_codes in _ZONE_AREA_CODES.items()
+    for area_code in area_codes.split()
+}
+
+
+def area_code_timezone(phone: str) -> str | None:
+    """Return the timezone of a +1 E.164 number's area code, or None if it is not known."""
+    if len(phone) != 12 or not phone.startswith("+1"):
+        return None
+    return AREA_CODE_TIMEZONES.get(phone[2:5])
+
+
+def send_bulk_local_time(  # pylint: disable=too-many-arguments
+    sender: "SMSSender",
+    recipients: Iterable[str | tuple[str, str]],
+    body: str,
+    send_at: datetime,
+    default_timezone: str = "America/New_York",
+    *,
+    infer_timezone: bool = True,
+    **options,
+) -> list[dict] | BulkStats:
+    """
+    Send scheduled SMS at the same local time in each recipient's own timezone.
+
+    The local time is converted once per distinct timezone. Recipients are
+    then grouped by the UTC instant they are scheduled for and sent in one
+    send_bulk run, earliest group first, so the recipient list is held in
+    memory.
+
+    Args:
+        sender: Sender the messages are sent with
+        recipients: Recipient phone numbers (E.164 format), or (phone,
+            timezone) pairs for recipients whose timezone is known
+        body: Message content
+        send_at: Local datetime to send at, in each recipient's timezone
+        default_timezone: Timezone of numbers without a known one
+            (default: America/New_York)
+        infer_timezone: Look up the timezone of +1 numbers without one by
+            their area code (default: True)
+        **options: Keyword options passed on to send_bulk
+
+    Returns:
+        As send_bulk, with results ordered by send time and then by
+        recipient order.
+    """
+    specs: dict[str, ScheduleSpec] = {}
+    groups: dict[ScheduleSpec, list[str]] = {}
+    for recipient in recipients:
+        phone, zone = (recipient, None) if isinstance(recipient, str) else recipient
+        if zone is None and infer_timezone:
+            zone = area_code_timezone(phone)
+        zone = zone or default_timezone
+        spec = specs.get(zone)
+        if spec is None:
+            spec = specs[zone] = ScheduleSpec.from_local(send_at, zone)
+        groups.setdefault(spec, []).append(phone)
+
+    # Iterating the schedule yields the recipients grouped by send time
+    ordered = sorted(groups.items(), key=lambda group: group[0].send_at_utc)
+    schedule = {phone: spec for spec, phones in ordered for phone in phones}
+    del groups, ordered
+    return sender.send_bulk(
+        schedule,
+        body,
+        send_at,
+        default_timezone,
+        schedule=schedule.__getitem__,
+        **options,
+    )
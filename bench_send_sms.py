@@ -0,0 +1,230 @@
+"""
+Benchmark SMSSender.send and send_bulk throughput and latency.
+
+Each scenario runs in a fresh process so peak RSS is its own. Results are
+written as JSON, and an earlier results file can be compared against:
+
+    python bench_send_sms.py --output before.json
+    python bench_send_sms.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import tempfile
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+from fake_twilio import FakeTwilioBehavior, FakeTwilioServer
+from progress import ProgressReporter
+from scheduling import ScheduleSpec
+from send_sms import SMSSender
+from sinks import CallbackSink
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+
+# Metrics where a higher value is better when comparing runs
+HIGHER_IS_BETTER = {"msgs_per_sec"}
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One benchmark run."""
+
+    # "send" calls SMSSender.send in a loop; "send_bulk" uses send_bulk
+    mode: str
+    size: int
+    # "mock" stubs out the Twilio client; "local" goes over HTTP to fake_twilio,
+    # "fast" does too but with SMSSender's FastTransport
+    transport: str = "mock"
+    max_workers: int = 1
+    # Mean fake API latency in seconds, for the local transport
+    latency: float = 0.0
+
+    @property
+    def name(self) -> str:
+        """Key identifying the scenario across result files."""
+        return f"{self.mode}/{self.transport}/n={self.size}/workers={self.max_workers}"
+
+
+class _InstantMessages:  # pylint: disable=too-few-public-methods
+    """Stand-in for client.messages that accepts every message immediately."""
+
+    def __init__(self):
+        self._message = SimpleNamespace(sid="SM" + "0" * 32, status="scheduled")
+
+    def create(self, **_kwargs):
+        """Return the same scheduled message for every call."""
+        return self._message
+
+
+def _recipients(size: int) -> Iterator[str]:
+    """Yield distinct valid E.164 numbers."""
+    for i in range(size):
+        yield f"+1{2_000_000_000 + i}"
+
+
+def run_scenario(scenario: Scenario) -> dict:
+    """Run a scenario in this process and return its metrics."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = Path(temp_dir) / "config.json"
+        config_path.write_text(json.dumps({
+            "account_sid": "ACbench",
+            "auth_token": "bench_token",
+            "messaging_service_sid": "MGbench",
+        }))
+        if scenario.transport in ("local", "fast"):
+            with FakeTwilioServer(behavior=FakeTwilioBehavior(latency=scenario.latency)) as server:
+                sender = SMSSender(
+                    config_path=config_path,
+                    api_base_url=server.url,
+                    fast_transport=scenario.transport == "fast",
+                )
+                return _measure(sender, scenario)
+        sender = SMSSender(config_path=config_path)
+        sender.client = SimpleNamespace(messages=_InstantMessages())
+        return _measure(sender, scenario)
+
+
+def _measure(sender: SMSSender, scenario: Scenario) -> dict:
+    """Time the scenario's sends and collect throughput, latency and resource use."""
+    progress = ProgressReporter(total=scenario.size, quiet=True, latency_window=None)
+    send_at = datetime(2030, 1, 1, 10, 0, 0)
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+
+    if scenario.mode == "send":
+        spec = ScheduleSpec.from_local(send_at)
+        for phone in _recipients(scenario.size):
+            call_started = time.perf_counter()
+            result = sender.send(to=phone, body="Benchmark message", send_at=spec)
+            result["success"] = True
+            progress.update(result, time.perf_counter() - call_started)
+    else:
+        sender.send_bulk(
+            recipients=_recipients(scenario.size),
+            body="Benchmark message",
+            send_at=send_at,
+            max_workers=scenario.max_workers,
+            sink=CallbackSink(lambda _result: None),
+            progress=progress,
+        )
+
+    elapsed = time.perf_counter() - started
+    snapshot = progress.snapshot()
+    return {
+        "scenario": scenario.name,
+        **asdict(scenario),
+        "elapsed_s": round(elapsed, 3),
+        "msgs_per_sec": round(scenario.size / elapsed, 1),
+        "p50_ms": snapshot["p50_ms"],
+        "p95_ms": snapshot["p95_ms"],
+        "p99_ms": snapshot["p99_ms"],
+        "cpu_s": round(time.process_time() - cpu_started, 3),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "failed": snapshot["failed"],
+    }
+
+
+def run_isolated(scenario: Scenario) -> dict:
+    """Run a scenario in a fresh process so its peak RSS is not inherited."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(run_scenario, (scenario,))
+
+
+def compare(current: list[dict], baseline: list[dict]) -> list[str]:
+    """Describe how each metric moved from a baseline run, flagging regressions."""
+    baseline_by_name = {result["scenario"]: result for result in baseline}
+    lines = []
+    for result in current:
+        before = baseline_by_name.get(result["scenario"])
+        if before is None:
+            continue
+        for metric in ("msgs_per_sec", "p50_ms", "p95_ms", "p99_ms", "cpu_s", "peak_rss_mb"):
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = change < 0 if metric in HIGHER_IS_BETTER else change > 0
+            flag = "  REGRESSION" if worse and abs(change) >= 10 else ""
+            lines.append(f"{result['scenario']} {metric}: {old} -> {new} ({change:+.1f}%){flag}")
+    return lines
+
+
+def main() -> None:
+    """Run the benchmarks selected on the command line."""
+    arg_parser = argparse.ArgumentParser(description="Benchmark SMSSender throughput and latency")
+    arg_parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=list(DEFAULT_SIZES),
+        help="Comma-separated recipient counts (default: 1000,100000,1000000)"
+    )
+    arg_parser.add_argument(
+        "--modes",
+        type=lambda value: value.split(","),
+        default=["send", "send_bulk"],
+        help="Comma-separated modes: send, send_bulk (default: both)"
+    )
+    arg_parser.add_argument(
+        "--transport",
+        choices=("mock", "local", "fast"),
+        default="mock",
+        help="mock: stubbed client, local: HTTP to fake_twilio, fast: local with "
+             "--fast-transport (default: mock)"
+    )
+    arg_parser.add_argument(
+        "--max-workers", type=int, default=8, help="Threads for send_bulk (default: 8)"
+    )
+    arg_parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Fake API latency for local (default: 0)"
+    )
+    arg_parser.add_argument(
+        "--output", type=Path, default=Path("bench_results.json"),
+        help="Where to write results (default: bench_results.json)"
+    )
+    arg_parser.add_argument("--compare", type=Path, help="Earlier results file to compare with")
+    args = arg_parser.parse_args()
+
+    results = []
+    for mode in args.modes:
+        for size in args.sizes:
+            scenario = Scenario(
+                mode=mode,
+                size=size,
+                transport=args.transport,
+                max_workers=args.max_workers if mode == "send_bulk" else 1,
+                latency=args.latency_ms / 1000,
+            )
+            print(f"Running {scenario.name}...", flush=True)
+            result = run_isolated(scenario)
+            print(
+                f"  {result['msgs_per_sec']} msgs/s, p50 {result['p50_ms']}ms "
+                f"p95 {result['p95_ms']}ms p99 {result['p99_ms']}ms, "
+                f"CPU {result['cpu_s']}s, peak RSS {result['peak_rss_mb']} MB"
+            )
+            results.append(result)
+
+    args.output.write_text(json.dumps({
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }, indent=2))
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        print(f"\nCompared with {args.compare}:")
+        for line in compare(results, json.loads(args.compare.read_text())["results"]):
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Bloom filters over recently messaged numbers, for cross-campaign frequency caps.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Header: magic, number of bits, number of hash functions, items added
+_HEADER = struct.Struct("<8sQQQ")
+_MAGIC = b"SMSBLM1\0"
+
+
+class BloomFilter:
+    """
+    Bloom filter in a memory-mapped file.
+
+    The file is the header followed by the bit array, so it can be mapped
+    read-only by any number of processes, copied between nodes and merged.
+    Positions come from double hashing one BLAKE2b digest of the number. Adding
+    is safe across threads of one process; only one process should add to a
+    file at a time.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        capacity: int = 1_000_000,
+        false_positive_rate: float = 0.001,
+        *,
+        read_only: bool = False,
+    ):
+        """
+        Open a filter, creating it sized for capacity if the file does not exist.
+
+        Args:
+            path: Filter file
+            capacity: Items the filter is sized for when created (default: 1,000,000)
+            false_positive_rate: False positive rate at capacity when created
+                (default: 0.001); an existing file keeps its own sizing
+            read_only: Map an existing file without write access, e.g. another
+                node's; it is never created or written back (default: False)
+        """
+        if not 0 < false_positive_rate < 1:
+            raise ValueError(
+                f"false_positive_rate must be between 0 and 1, got {false_positive_rate}"
+            )
+        self.path = path
+        self.read_only = read_only
+        if not read_only and not path.exists():
+            num_bits, num_hashes = self.sizing(capacity, false_positive_rate)
+            temp_path = path.with_name(path.name + ".tmp")
+            with temp_path.open("wb") as filter_file:
+                filter_file.write(_HEADER.pack(_MAGIC, num_bits, num_hashes, 0))
+                filter_file.truncate(_HEADER.size + (num_bits + 7) // 8)
+            os.replace(temp_path, path)
+
+        with path.open("rb" if read_only else "r+b") as filter_file:
+            header = filter_file.read(_HEADER.size)
+            if len(header) < _HEADER.size or not header.startswith(_MAGIC):
+                raise ValueError(f"Not a Bloom filter: {path}")
+            _, self.num_bits, self.num_hashes, self.count = _HEADER.unpack(header)
+            self._map = mmap.mmap(
+                filter_file.fileno(), 0,
+                access=mmap.ACCESS_READ if read_only else mmap.ACCESS_WRITE,
+            )
+        if len(self._map) < _HEADER.size + (self.num_bits + 7) // 8:
+            self._map.close()
+            raise ValueError(f"Truncated Bloom filter: {path}")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def sizing(capacity: int, false_positive_rate: float) -> tuple[int, int]:
+        """Return the optimal (bits, hash functions) for a capacity and error rate."""
+        num_bits = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / max(1, capacity) * math.log(2)))
+        return num_bits, num_hashes
+
+    def _positions(self, phone: str) -> list[int]:
+        digest = hashlib.blake2b(phone.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        # Odd, so successive positions never repeat when num_bits is a power of 2
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, phone: str) -> None:
+        """Add a number."""
+        bits = self._map
+        with self._lock:
+            for position in self._positions(phone):
+                offset = _HEADER.size + (position >> 3)
+                bits[offset] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, phone: str) -> bool:
+        """Return True if phone was probably added, False if it certainly was not."""
+        bits = self._map
+        return all(
+            bits[_HEADER.size + (position >> 3)] & (1 << (position & 7))
+            for position in self._positions(phone)
+        )
+
+    def bits(self) -> bytes:
+        """Return a copy of the bit array."""
+        return self._map[_HEADER.size:_HEADER.size + (self.num_bits + 7) // 8]
+
+    def merge(self, other: "BloomFilter") -> None:
+        """Add every item of a filter with the same sizing, e.g. from another node."""
+        if (other.num_bits, other.num_hashes) != (self.num_bits, self.num_hashes):
+            raise ValueError("Can only merge Bloom filters with the same bits and hash functions")
+        with self._lock:
+            bits = self.bits()
+            merged = int.from_bytes(bits, "little") | int.from_bytes(other.bits(), "little")
+            self._map[_HEADER.size:_HEADER.size + len(bits)] = merged.to_bytes(len(bits), "little")
+            # An upper bound; items in both filters are counted twice
+            self.count += other.count
+
+    def flush(self) -> None:
+        """Write the item count and flush the bits to disk."""
+        with self._lock:
+            self._map[:_HEADER.size] = _HEADER.pack(
+                _MAGIC, self.num_bits, self.num_hashes, self.count
+            )
+            self._map.flush()
+
+    def close(self) -> None:
+        """Flush and unmap the filter; a read-only one is only unmapped."""
+        if not self._map.closed:
+            if not self.read_only:
+                self.flush()
+            self._map.close()
+
+    def __enter__(self) -> "BloomFilter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ContactHistory:  # pylint: disable=too-many-instance-attributes
+    """
+    Numbers messaged over the last window_days, as one Bloom filter per UTC day.
+
+    recently_messaged() checks the filters of the window first; only a probable
+    hit is confirmed with the optional exact lookup, so the exact store is
+    consulted for about false_positive_rate of numbers never messaged. Filters
+    of days that fell out of the window are deleted. Each node sending a
+    campaign keeps its own directory; merge() folds in another node's days.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        directory: Path,
+        window_days: int,
+        *,
+        daily_capacity: int = 1_000_000,
+        false_positive_rate: float = 0.001,
+        exact: Callable[[str, float], bool] | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Open (or create) a history.
+
+        Args:
+            directory: Directory holding one <YYYY-MM-DD>.bloom file per day
+            window_days: Days a number counts as recently messaged, today included
+            daily_capacity: Numbers each day's filter is sized for (default: 1,000,000)
+            false_positive_rate: Chance that a number not messaged in the window
+                is a probable hit, split evenly across the window's daily
+                filters (default: 0.001)
+            exact: Optional exact check exact(phone, since) against the
+                authoritative message history, where since is the window start
+                as a Unix time; called only for probable hits (default: trust
+                the filters)
+            clock: Time source in Unix seconds (default: time.time)
+        """
+        if window_days < 1:
+            raise ValueError(f"window_days must be at least 1, got {window_days}")
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self.window_days = window_days
+        self.daily_capacity = daily_capacity
+        self.false_positive_rate = false_positive_rate
+        self.exact = exact
+        self._clock = clock
+        self._filters: dict[str, BloomFilter] = {}
+        self._window: list[str] = []
+        self._lock = threading.Lock()
+
+    def _days(self) -> list[str]:
+        """Return the window's days, newest first, dropping filters outside it once a day."""
+        today = datetime.fromtimestamp(self._clock(), timezone.utc).date()
+        if self._window and self._window[0] == today.isoformat():
+            return self._window
+        self._window = [
+            (today - timedelta(days=offset)).isoformat() for offset in range(self.window_days)
+        ]
+        for path in self.directory.glob("*.bloom"):
+            if path.stem not in self._window:
+                stale = self._filters.pop(path.stem, None)
+                if stale is not None:
+                    stale.close()
+                path.unlink(missing_ok=True)
+        return self._window
+
+    def _filter(self, day: str, create: bool) -> BloomFilter | None:
+        bloom_filter = self._filters.get(day)
+        if bloom_filter is None:
+            path = self.directory / f"{day}.bloom"
+            if not create and not path.exists():
+                return None
+            bloom_filter = BloomFilter(
+                path, self.daily_capacity, self.false_positive_rate / self.window_days
+            )
+            self._filters[day] = bloom_filter
+        return bloom_filter
+
+    def recently_messaged(self, phone: str) -> bool:
+        """Return True if phone was messaged within the window."""
+        with self._lock:
+            filters = [self._filter(day, create=False) for day in self._days()]
+        if not any(bloom_filter is not None and phone in bloom_filter for bloom_filter in filters):
+            return False
+        if self.exact is None:
+            return True
+        since = self._clock() - self.window_days * 86400
+        return self.exact(phone, since)
+
+    def record(self, phone: str) -> None:
+        """Remember that phone was messaged today."""
+        with self._lock:
+            bloom_filter = self._filter(self._days()[0], create=True)
+        bloom_filter.add(phone)
+
+    def merge(self, other_directory: Path) -> None:
+        """Fold another node's history for the days in the window into this one."""
+        with self._lock:
+            for day in self._days():
+                other_path = other_directory / f"{day}.bloom"
+                if other_path.exists():
+                    with BloomFilter(other_path, read_only=True) as other:
+                        self._filter(day, create=True).merge(other)
+
+    def close(self) -> None:
+        """Flush and close every open filter."""
+        with self._lock:
+            for bloom_filter in self._filters.values():
+                bloom_filter.close()
+            self._filters.clear()
+
+    def __enter__(self) -> "ContactHistory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,272 @@
+"""
+Local stand-in for the Twilio Messages API, for load testing SMSSender.
+
+Run it and point a sender at it:
+
+    python fake_twilio.py --port 8080 --latency-ms 80 --error-rate 0.01 --mps 100
+
+    sender = SMSSender(api_base_url="http://127.0.0.1:8080")
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from flow_control import TokenBucket
+
+MESSAGES_PATH = re.compile(r"^/2010-04-01/Accounts/(?P<account_sid>[^/]+)/Messages\.json$")
+
+
+@dataclass(frozen=True)
+class FakeTwilioBehavior:  # pylint: disable=too-many-instance-attributes
+    """How the fake API responds to message creation."""
+
+    # Mean response latency in seconds
+    latency: float = 0.0
+    # "constant", "uniform" (0 to 2x mean) or "lognormal" (shape latency_sigma)
+    latency_distribution: str = "constant"
+    latency_sigma: float = 0.5
+    # Fraction of requests answered with a 500 error
+    error_rate: float = 0.0
+    # Messages per second accepted before answering 429 (default: unlimited)
+    throttle_mps: float | None = None
+    throttle_burst: int = 1
+    # Seconds sent in Retry-After with each 429
+    retry_after: int = 1
+    seed: int | None = None
+
+    def __post_init__(self):
+        if self.latency_distribution not in ("constant", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {self.latency_distribution}")
+        if not 0 <= self.error_rate <= 1:
+            raise ValueError(f"error_rate must be between 0 and 1, got {self.error_rate}")
+
+
+class FakeTwilioServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering POST .../Messages.json like Twilio does.
+
+    Connections are kept alive between requests. Counters of requests by outcome
+    are available in `stats`.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        behavior: FakeTwilioBehavior | None = None,
+    ):
+        """
+        Bind the server; call start() or serve_forever() to begin answering.
+
+        Args:
+            host: Interface to listen on (default: 127.0.0.1)
+            port: Port to listen on, 0 for any free port (default: 0)
+            behavior: Latency, error and throttling settings (default: instant success)
+        """
+        super().__init__((host, port), _MessagesHandler)
+        self.behavior = behavior or FakeTwilioBehavior()
+        self._random = random.Random(self.behavior.seed)
+        self._throttle = (
+            TokenBucket(self.behavior.throttle_mps, self.behavior.throttle_burst)
+            if self.behavior.throttle_mps else None
+        )
+        self.stats = {"requests": 0, "created": 0, "errors": 0, "throttled": 0, "not_found": 0}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass to SMSSender(api_base_url=...)."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTwilioServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeTwilioServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def count(self, outcome: str) -> None:
+        """Increment a request counter."""
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def draw_latency(self) -> float:
+        """Pick a response latency from the configured distribution."""
+        behavior = self.behavior
+        if behavior.latency <= 0:
+            return 0.0
+        with self._lock:
+            if behavior.latency_distribution == "uniform":
+                return self._random.uniform(0, 2 * behavior.latency)
+            if behavior.latency_distribution == "lognormal":
+                # Scale so the distribution's mean equals behavior.latency
+                sigma = behavior.latency_sigma
+                return behavior.latency * self._random.lognormvariate(-sigma * sigma / 2, sigma)
+            return behavior.latency
+
+    def draw_error(self) -> bool:
+        """Decide whether this request fails with a server error."""
+        with self._lock:
+            return self._random.random() < self.behavior.error_rate
+
+    def is_throttled(self) -> bool:
+        """Decide whether this request is over the configured rate."""
+        return self._throttle is not None and not self._throttle.try_acquire()
+
+
+class _MessagesHandler(BaseHTTPRequestHandler):
+    """Request handler for FakeTwilioServer."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY every
+    # response waits on the client's delayed ACK
+    disable_nagle_algorithm = True
+    server: FakeTwilioServer
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Handle message creation."""
+        form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+        self.server.count("requests")
+        match = MESSAGES_PATH.match(self.path)
+        if match is None:
+            self.server.count("not_found")
+            self._send_error(404, 20404, "The requested resource was not found")
+            return
+
+        time.sleep(self.server.draw_latency())
+        if self.server.is_throttled():
+            self.server.count("throttled")
+            self._send_error(
+                429, 20429, "Too Many Requests",
+                {"Retry-After": str(self.server.behavior.retry_after)},
+            )
+        elif self.server.draw_error():
+            self.server.count("errors")
+            self._send_error(500, 20500, "Internal Server Error")
+        else:
+            self.server.count("created")
+            self._send_json(201, _message_resource(match.group("account_sid"), form))
+
+    def _send_error(self, status: int, code: int, message: str, headers: dict | None = None):
+        self._send_json(status, {
+            "code": code,
+            "message": message,
+            "more_info": f"https://www.twilio.com/docs/errors/{code}",
+            "status": status,
+        }, headers)
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        try:
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client timed out or hung up; a load test sees this routinely
+            self.close_connection = True
+
+    def log_message(self, *_log_args):
+        """Stay quiet; per-request logging would dominate a load test."""
+
+
+def _message_resource(account_sid: str, form: dict[str, list[str]]) -> dict:
+    """Build a Message resource like Twilio returns for a scheduled message."""
+    def field(name: str) -> str | None:
+        return form.get(name, [None])[0]
+
+    sid = "SM" + uuid.uuid4().hex
+    now = datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S +0000")
+    return {
+        "account_sid": account_sid,
+        "api_version": "2010-04-01",
+        "body": field("Body"),
+        "date_created": now,
+        "date_sent": None,
+        "date_updated": now,
+        "direction": "outbound-api",
+        "error_code": None,
+        "error_message": None,
+        "from": None,
+        "messaging_service_sid": field("MessagingServiceSid"),
+        "num_media": "0",
+        "num_segments": "0",
+        "price": None,
+        "price_unit": None,
+        "sid": sid,
+        "status": "scheduled" if field("ScheduleType") == "fixed" else "accepted",
+        "subresource_uris": {
+            "media": f"/2010-04-01/Accounts/{account_sid}/Messages/{sid}/Media.json"
+        },
+        "to": field("To"),
+        "uri": f"/2010-04-01/Accounts/{account_sid}/Messages/{sid}.json",
+    }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Run a local fake Twilio Messages API")
+    arg_parser.add_argument("--host", default="127.0.0.1", help="Interface (default: 127.0.0.1)")
+    arg_parser.add_argument("--port", type=int, default=8080, help="Port (default: 8080)")
+    arg_parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Mean response latency (default: 0)"
+    )
+    arg_parser.add_argument(
+        "--distribution",
+        choices=("constant", "uniform", "lognormal"),
+        default="lognormal",
+        help="Latency distribution (default: lognormal)"
+    )
+    arg_parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of 500 responses (default: 0)"
+    )
+    arg_parser.add_argument(
+        "--mps", type=float, help="Messages per second before 429s (default: unlimited)"
+    )
+    arg_parser.add_argument(
+        "--burst", type=int, default=1, help="Burst allowed under --mps (default: 1)"
+    )
+    args = arg_parser.parse_args()
+
+    server = FakeTwilioServer(args.host, args.port, FakeTwilioBehavior(
+        latency=args.latency_ms / 1000,
+        latency_distribution=args.distribution,
+        error_rate=args.error_rate,
+        throttle_mps=args.mps,
+        throttle_burst=args.burst,
+    ))
+    print(f"Fake Twilio API listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n{server.stats}")
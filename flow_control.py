@@ -0,0 +1,285 @@
+"""
+Flow control for sending to Twilio at a sustainable rate.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting sends to a fixed rate with bursts.
+
+    Each send takes one token. Tokens refill at `rate` per second up to `burst`.
+    When the bucket is empty a caller reserves the next token and sleeps until it
+    is due, so concurrent threads and asyncio tasks are paced in arrival order
+    without holding the lock while they wait.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the bucket full.
+
+        Args:
+            rate: Sustained messages per second
+            burst: Maximum number of sends allowed back to back (default: 1)
+            clock: Monotonic time source in seconds (default: time.monotonic)
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds to wait before using it."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def try_acquire(self) -> bool:
+        """Take one token if one is available now, without waiting."""
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Block the calling thread until a send is allowed."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Suspend the calling task until a send is allowed."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed Twilio request.
+
+    Only throttling and server-side errors are retried. Delays grow exponentially
+    from base_delay up to max_delay with full jitter, but are never shorter than a
+    Retry-After the server asked for.
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    max_elapsed: float = 120.0
+    retryable_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    # 20429: Too Many Requests, 20500: Internal Server Error, 20503: Service Unavailable
+    retryable_codes: frozenset[int] = frozenset({20429, 20500, 20503})
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {self.max_attempts}")
+
+    def should_retry(self, attempt: int, status: int | None, code: int | None) -> bool:
+        """Return True if a request that failed on this attempt may be tried again."""
+        if attempt >= self.max_attempts:
+            return False
+        return status in self.retryable_statuses or code in self.retryable_codes
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Return seconds to wait after the given (1-based) failed attempt."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return max(random.uniform(0, ceiling), retry_after or 0.0)
+
+
+class AdaptiveConcurrency:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """
+    AIMD controller for the number of sends kept in flight.
+
+    The limit grows by `increase` after each full window of `limit` completions
+    without congestion, and is multiplied by `decrease` when a send is throttled
+    or the smoothed latency rises above `latency_tolerance` times the best seen.
+    After a decrease, congestion signals are ignored until the requests already
+    in flight at the old limit have completed, so one burst of 429s shrinks the
+    limit once rather than collapsing it to the minimum.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        *,
+        increase: int = 1,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            initial: Starting in-flight limit (default: 4)
+            minimum: Lowest limit the controller will back off to (default: 1)
+            maximum: Highest limit the controller will grow to (default: 64)
+            increase: Amount added per congestion-free window (default: 1)
+            decrease: Factor applied on congestion, between 0 and 1 (default: 0.5)
+            latency_tolerance: Ratio of smoothed to baseline latency treated as
+                congestion (default: 2.0)
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError(
+                f"Expected 1 <= minimum <= initial <= maximum, got {minimum}, {initial}, {maximum}"
+            )
+        if not 0 < decrease < 1:
+            raise ValueError(f"decrease must be between 0 and 1, got {decrease}")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.limit = initial
+        self.completed = 0
+        # (completed sends, new limit) for every change, starting with the initial limit
+        self.history: list[tuple[int, int]] = [(0, initial)]
+        self._smoothed: float | None = None
+        self._baseline: float | None = None
+        self._window_good = 0
+        self._cooldown = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, throttled: bool = False) -> int:
+        """Record one completed send and return the updated limit."""
+        with self._lock:
+            self.completed += 1
+            if self._smoothed is None:
+                self._smoothed = latency
+            else:
+                self._smoothed = 0.8 * self._smoothed + 0.2 * latency
+            if self._baseline is None or self._smoothed < self._baseline:
+                self._baseline = self._smoothed
+            congested = throttled or self._smoothed > self.latency_tolerance * self._baseline
+
+            if self._cooldown > 0:
+                self._cooldown -= 1
+            elif congested:
+                self._cooldown = self.limit
+                self._window_good = 0
+                # Let latency settle at the new level before comparing again
+                self._baseline = self._smoothed
+                self._set_limit(max(self.minimum, int(self.limit * self.decrease)))
+            else:
+                self._window_good += 1
+                if self._window_good >= self.limit:
+                    self._window_good = 0
+                    self._set_limit(min(self.maximum, self.limit + self.increase))
+            return self.limit
+
+    def _set_limit(self, limit: int) -> None:
+        if limit != self.limit:
+            self.limit = limit
+            self.history.append((self.completed, limit))
+
+
+# Twilio accepts a send_at from 15 minutes to 35 days after the create request
+MIN_SCHEDULE_LEAD = 15 * 60
+MAX_SCHEDULE_LEAD = 35 * 86400
+# Extra lead for the create request's latency and clock skew
+_LEAD_MARGIN = 60
+
+
+class SendWindow:  # pylint: disable=too-many-instance-attributes
+    """
+    Spread the send times of a bulk run over a window at a target rate.
+
+    Scheduling every message for one instant makes Twilio release them in one
+    burst. Instead, the n-th message scheduled is given the time start + n / rate,
+    in whole seconds. start is the run's send time, or the earliest time Twilio
+    accepts if that is sooner. Messages beyond what the window holds at the rate
+    keep the rate and are scheduled past its end, which callers report, rather
+    than the rate being exceeded. A time less than MIN_SCHEDULE_LEAD ahead when
+    its message is created is pushed back to it.
+    """
+
+    def __init__(
+        self,
+        duration: float,
+        rate: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the window.
+
+        Args:
+            duration: Seconds from the run's send time the sends are spread over
+            rate: Target messages released per second
+            clock: Wall clock time source in Unix seconds (default: time.time)
+        """
+        if duration <= 0:
+            raise ValueError(f"duration must be positive, got {duration}")
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.duration = duration
+        self.rate = rate
+        self._clock = clock
+        self._start: float | None = None
+        self._base = 0.0
+        self.scheduled = 0
+        # End of the current run's window in Unix seconds; send times from it
+        # on are past the window
+        self.end = 0.0
+        self._lock = threading.Lock()
+
+    def check(self, start: float) -> None:
+        """Raise ValueError if a window from start would end beyond MAX_SCHEDULE_LEAD."""
+        latest = self._clock() + MAX_SCHEDULE_LEAD
+        if start + self.duration > latest:
+            raise ValueError(
+                f"Send window must end within {MAX_SCHEDULE_LEAD // 86400} days; "
+                f"it ends {(start + self.duration - latest) / 3600:.1f} hours too late"
+            )
+
+    def next_send_time(self, start: float) -> int:
+        """
+        Return the send time, in Unix seconds, of the next message of a run from start.
+
+        Raises:
+            ValueError: If the run has overrun its window so far that the time
+                is beyond MAX_SCHEDULE_LEAD
+        """
+        with self._lock:
+            now = self._clock()
+            earliest = int(now) + MIN_SCHEDULE_LEAD + _LEAD_MARGIN
+            if start != self._start:
+                self._start = start
+                self._base = max(start, earliest)
+                self.end = self._base + self.duration
+                self.scheduled = 0
+            send_time = max(int(self._base + self.scheduled / self.rate), earliest)
+            if send_time > now + MAX_SCHEDULE_LEAD:
+                raise ValueError(
+                    f"Send time past the window is more than {MAX_SCHEDULE_LEAD // 86400} "
+                    "days ahead"
+                )
+            self.scheduled += 1
+            return send_time
@@ -0,0 +1,116 @@
+"""
+Local index of idempotency keys so a message is never scheduled twice.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class UnknownOutcomeError(RuntimeError):
+    """An earlier attempt for this key may or may not have scheduled the message."""
+
+    def __init__(self, key: str, phone: str):
+        super().__init__(
+            f"An earlier attempt to send to {phone} may already have been scheduled; "
+            f"check Twilio, then resolve idempotency key {key}"
+        )
+        self.key = key
+        self.phone = phone
+
+
+def idempotency_key(campaign: str, phone: str) -> str:
+    """Return the deterministic key for sending a campaign to one recipient."""
+    return hashlib.sha256(f"{campaign}\0{phone}".encode()).hexdigest()
+
+
+class IdempotencyIndex:
+    """
+    SQLite index of idempotency keys and what became of each.
+
+    A key is reserved as pending before Twilio is called and marked sent with
+    the message sid once it is created. A key left pending means the outcome is
+    unknown (the process died, or the request timed out or failed ambiguously),
+    so it is not sent again until someone checks Twilio and resolves it.
+    Commits survive the process crashing; with synchronous=NORMAL the last few
+    can be lost to a power failure.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) an index.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._connection = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+            "key TEXT PRIMARY KEY, state TEXT NOT NULL, sid TEXT, status TEXT, "
+            "updated REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str) -> dict | None:
+        """
+        Claim a key before sending.
+
+        Returns None if the key was new and is now pending, otherwise the
+        existing entry as a dict with state ("pending" or "sent"), sid and status.
+        """
+        with self._lock:
+            inserted = self._connection.execute(
+                "INSERT OR IGNORE INTO idempotency_keys (key, state, updated) "
+                "VALUES (?, 'pending', ?)",
+                (key, time.time()),
+            ).rowcount
+            if inserted:
+                return None
+            state, sid, status = self._connection.execute(
+                "SELECT state, sid, status FROM idempotency_keys WHERE key = ?", (key,)
+            ).fetchall()[0]
+        return {"state": state, "sid": sid, "status": status}
+
+    def complete(self, key: str, sid: str, status: str) -> None:
+        """Record that the message for key was created."""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE idempotency_keys SET state = 'sent', sid = ?, status = ?, updated = ? "
+                "WHERE key = ?",
+                (sid, status, time.time(), key),
+            )
+
+    def release(self, key: str) -> None:
+        """
+        Forget a key so the message may be sent again.
+
+        Called when Twilio definitely rejected the message, or by an operator
+        after checking that a pending key's message was never created.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM idempotency_keys WHERE key = ?", (key,))
+
+    def pending(self) -> list[str]:
+        """Return keys whose outcome is unknown."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key FROM idempotency_keys WHERE state = 'pending' ORDER BY updated"
+            ).fetchall()
+        return [key for (key,) in rows]
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def __enter__(self) -> "IdempotencyIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,99 @@
+"""
+Append-only journal of bulk send outcomes, used to resume interrupted runs.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from phone_numbers import PhoneSet
+
+
+class SendJournal:  # pylint: disable=too-many-instance-attributes
+    """
+    JSON Lines journal with one record per recipient outcome.
+
+    Records are flushed to the OS as they are written, so they survive the process
+    crashing or being interrupted, and fsynced in batches to bound what a power
+    loss can take. Opening an existing journal loads the recipients it already
+    scheduled so that a re-run skips them.
+    """
+
+    def __init__(self, path: Path, sync_every: int = 100, sync_interval: float = 1.0):
+        """
+        Open (or create) a journal.
+
+        Args:
+            path: Journal file; appended to if it exists
+            sync_every: fsync after this many records (default: 100)
+            sync_interval: fsync when this many seconds passed since the last one
+                (default: 1.0)
+        """
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.completed = PhoneSet()
+        if path.exists():
+            self._load()
+        self._file = path.open("a", encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        """Collect successfully scheduled recipients from an existing journal."""
+        with self.path.open(encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write can leave a partial last line
+                    continue
+                if record.get("success"):
+                    self.completed.add(record["phone"])
+
+    def is_done(self, phone: str) -> bool:
+        """Return True if the journal shows phone as already scheduled."""
+        with self._lock:
+            return phone in self.completed
+
+    def record(self, result: dict) -> None:
+        """Append one send_bulk result."""
+        entry = {
+            key: result[key]
+            for key in ("phone", "success", "sid", "status", "error", "attempts")
+            if key in result
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if result["success"]:
+                self.completed.add(result["phone"])
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval
+            ):
+                self._sync()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Flush, fsync and close the journal."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._sync()
+                self._file.close()
+
+    def __enter__(self) -> "SendJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,300 @@
+"""
+Local scheduler that sends messages from this process when they fall due.
+
+Twilio's fixed scheduling only takes send times from 15 minutes to 35 days
+ahead. For sooner or later sends, add the numbers to a scheduler database and
+keep a scheduler running on it:
+
+    python local_scheduler.py jobs.db --add numbers.txt --body "Hi" --send-at 2026-01-30T10:00
+    python local_scheduler.py jobs.db --run
+"""
+
+import argparse
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from itertools import groupby, islice
+from pathlib import Path
+
+from phone_numbers import dedupe_phone_numbers, normalize_phone_stream, read_phone_numbers
+from progress import BulkStats
+from scheduling import SEND_NOW, ScheduleSpec
+from send_sms import SMSSender
+from sinks import ResultSink
+from work_queue import connect, transaction
+
+# "skipped" reason for messages found more than max_lateness past due
+EXPIRED = "expired"
+
+
+class LocalScheduler:  # pylint: disable=too-many-instance-attributes
+    """
+    Persistent queue of messages sent unscheduled once they fall due.
+
+    Pending messages are rows of a SQLite database indexed by due time; the
+    index is an on-disk priority queue, so millions of pending messages cost
+    disk rather than memory and survive restarts. run() takes the due rows
+    batch_size at a time, sends them with SMSSender.send_bulk and deletes them,
+    then sleeps until the earliest pending due time. schedule() wakes it when
+    it adds messages, and it checks the database at least every poll_interval
+    for messages other processes added, so a message goes out within about
+    poll_interval of its due time unless sending falls behind.
+
+    Rows are deleted once their results are in. Give the sender an idempotency
+    index so a message sent just before a crash is not sent again on restart.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        path: Path,
+        sender: SMSSender,
+        *,
+        sink: ResultSink | None = None,
+        max_workers: int = 1,
+        batch_size: int = 1000,
+        max_lateness: float | None = None,
+        poll_interval: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Open (or create) a scheduler database.
+
+        Args:
+            path: SQLite database file
+            sender: Sender the messages are sent through
+            sink: Optional destination each result is written to (default:
+                only counted in stats)
+            max_workers: Threads sending each batch concurrently (default: 1)
+            batch_size: Due messages taken from the database at a time
+                (default: 1000)
+            max_lateness: Seconds past due after which a message is reported
+                as skipped with EXPIRED instead of being sent, e.g. after the
+                scheduler was down (default: always send)
+            poll_interval: Longest wait between checks of the database, in
+                seconds (default: 1.0)
+            clock: Wall-clock time source in seconds (default: time.time)
+        """
+        self.sender = sender
+        self.sink = sink
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.max_lateness = max_lateness
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._connection = connect(path)
+        # A campaign's body is stored once, not with each of its messages
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS bodies (id INTEGER PRIMARY KEY, body TEXT NOT NULL UNIQUE)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id INTEGER PRIMARY KEY, due REAL NOT NULL, phone TEXT NOT NULL, "
+            "body_id INTEGER NOT NULL REFERENCES bodies (id), campaign TEXT)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS messages_due ON messages (due)")
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self.stats = BulkStats()
+        # Most seconds past due any message was sent
+        self.worst_lateness = 0.0
+
+    def _transaction(self, work: Callable[[sqlite3.Connection], object]) -> object:
+        """Run work inside a write transaction."""
+        return transaction(self._connection, self._lock, work)
+
+    def schedule(  # pylint: disable=too-many-arguments
+        self,
+        phones: Iterable[str],
+        body: str,
+        send_at: datetime | ScheduleSpec,
+        timezone: str = "America/New_York",
+        *,
+        campaign: str | None = None,
+        batch_size: int = 10_000,
+    ) -> int:
+        """
+        Add messages to be sent at send_at.
+
+        Args:
+            phones: Recipient phone numbers (E.164 format)
+            body: Message content
+            send_at: Local datetime to send at, a ScheduleSpec, or SEND_NOW
+            timezone: Timezone for send_at (default: America/New_York); ignored
+                for a ScheduleSpec
+            campaign: Campaign idempotency keys are derived from, if the sender
+                has an index (default: the send time and body)
+            batch_size: Messages inserted per transaction (default: 10,000)
+
+        Returns:
+            Number of messages added
+        """
+        spec = ScheduleSpec.of(send_at, timezone)
+        due = spec.timestamp() if spec.send_at_utc else self._clock()
+
+        def body_id(connection: sqlite3.Connection) -> int:
+            connection.execute("INSERT OR IGNORE INTO bodies (body) VALUES (?)", (body,))
+            return connection.execute("SELECT id FROM bodies WHERE body = ?", (body,)).fetchone()[0]
+
+        stored_body = self._transaction(body_id)
+        phones = iter(phones)
+        added = 0
+        while batch := list(islice(phones, batch_size)):
+            added += self._transaction(lambda connection, batch=batch: connection.executemany(
+                "INSERT INTO messages (due, phone, body_id, campaign) VALUES (?, ?, ?, ?)",
+                ((due, phone, stored_body, campaign) for phone in batch),
+            ).rowcount)
+        self._wakeup.set()
+        return added
+
+    def pending(self) -> int:
+        """Count messages not yet sent."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def next_due(self) -> float | None:
+        """Return the earliest pending due time in Unix seconds, or None if nothing is pending."""
+        with self._lock:
+            return self._connection.execute("SELECT MIN(due) FROM messages").fetchone()[0]
+
+    def run_pending(self) -> int:
+        """Send every message that is due now; return how many were handled."""
+        handled = 0
+        while not self._stopped.is_set():
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT messages.id, due, phone, body, campaign FROM messages "
+                    "JOIN bodies ON bodies.id = body_id WHERE due <= ? ORDER BY due, messages.id "
+                    "LIMIT ?",
+                    (self._clock(), self.batch_size),
+                ).fetchall()
+            if not rows:
+                return handled
+            # One send_bulk per send time, body and campaign in the batch
+            rows.sort(key=lambda row: (row[1], row[3], row[4] or ""))
+            for (due, body, campaign), group in groupby(rows, key=lambda row: row[1:2] + row[3:]):
+                self._send_due(list(group), due, body, campaign)
+            handled += len(rows)
+        return handled
+
+    def _send_due(self, rows: list[tuple], due: float, body: str, campaign: str | None) -> None:
+        """Send one group of due messages, record their results and delete them."""
+        phones = [row[2] for row in rows]
+        lateness = self._clock() - due
+        if self.max_lateness is not None and lateness > self.max_lateness:
+            results = [{"phone": phone, "success": False, "skipped": EXPIRED} for phone in phones]
+            for result in results:
+                self.stats.record(result)
+        else:
+            self.worst_lateness = max(self.worst_lateness, lateness)
+            results = self.sender.send_bulk(
+                phones,
+                body,
+                SEND_NOW,
+                max_workers=min(self.max_workers, len(phones)),
+                campaign=campaign if campaign is not None else f"{due}\0{body}",
+            )
+            self.stats.merge(self.sender.last_run_stats)
+        if self.sink is not None:
+            for result in results:
+                self.sink.write(result)
+        self._transaction(lambda connection: connection.executemany(
+            "DELETE FROM messages WHERE id = ?", ((row[0],) for row in rows)
+        ))
+
+    def run(self) -> None:
+        """Send messages as they fall due until stop() is called."""
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            # Cleared first, so a schedule() during the run below is not missed
+            self._wakeup.clear()
+            self.run_pending()
+            next_due = self.next_due()
+            timeout = self.poll_interval
+            if next_due is not None:
+                timeout = min(timeout, max(0.0, next_due - self._clock()))
+            self._wakeup.wait(timeout)
+
+    def stop(self) -> None:
+        """Make run() and run_pending() return once the batch they are sending is done."""
+        self._stopped.set()
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def __enter__(self) -> "LocalScheduler":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Schedule SMS in a local database and send them when they fall due"
+    )
+    arg_parser.add_argument("path", type=Path, help="Scheduler database (created if missing)")
+    arg_parser.add_argument(
+        "--add",
+        type=Path,
+        help="File of phone numbers to schedule, one per line (E.164 or national format)"
+    )
+    arg_parser.add_argument("--body", help="Message to send the --add numbers")
+    arg_parser.add_argument(
+        "--send-at",
+        type=datetime.fromisoformat,
+        help="Local time to send the --add numbers, e.g. 2026-01-30T10:00 (default: now)"
+    )
+    arg_parser.add_argument(
+        "--timezone",
+        default="America/New_York",
+        help="Timezone of --send-at (default: America/New_York)"
+    )
+    arg_parser.add_argument(
+        "--run",
+        action="store_true",
+        help="Keep running, sending messages as they fall due, until Ctrl+C"
+    )
+    arg_parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=1,
+        help="Threads sending due messages concurrently (default: 1)"
+    )
+    arg_parser.add_argument(
+        "--max-lateness",
+        type=float,
+        help="Seconds past due after which a message is dropped instead of sent "
+             "(default: always send)"
+    )
+    args = arg_parser.parse_args()
+    if args.add and not args.body:
+        arg_parser.error("--add requires --body")
+
+    with LocalScheduler(
+        args.path,
+        SMSSender(),
+        max_workers=args.max_workers,
+        max_lateness=args.max_lateness,
+    ) as scheduler:
+        if args.add:
+            added_count = scheduler.schedule(
+                dedupe_phone_numbers(normalize_phone_stream(read_phone_numbers(args.add))),
+                args.body,
+                args.send_at if args.send_at is not None else SEND_NOW,
+                args.timezone,
+            )
+            print(f"Scheduled {added_count} messages from {args.add}")
+        print(f"{scheduler.pending()} messages pending")
+        if args.run:
+            try:
+                scheduler.run()
+            except KeyboardInterrupt:
+                pass
+            print(f"Sent {scheduler.stats.succeeded}, failed {scheduler.stats.failed}, "
+                  f"skipped {scheduler.stats.skipped}; at most "
+                  f"{scheduler.worst_lateness:.1f}s late")
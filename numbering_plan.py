@@ -0,0 +1,188 @@
+"""
+Country numbering plans for checking E.164 numbers before they are sent.
+"""
+
+from dataclasses import dataclass
+
+# Line types a number range can have
+LINE_MOBILE = "mobile"
+LINE_FIXED = "fixed"
+LINE_FIXED_OR_MOBILE = "fixed_or_mobile"
+LINE_TOLL_FREE = "toll_free"
+LINE_PREMIUM_RATE = "premium_rate"
+LINE_VOIP = "voip"
+# Assigned country code without range data in the table below
+LINE_UNKNOWN = "unknown"
+
+# Line types Twilio rejects as SMS destinations (error 21614 for landlines)
+NON_SMS_LINE_TYPES = frozenset({LINE_FIXED, LINE_PREMIUM_RATE})
+
+# Digits of a full E.164 number, country code included
+_MIN_DIGITS = 7
+_MAX_DIGITS = 15
+
+# National number ranges by country code, as (prefix, national number lengths,
+# line type). The longest matching prefix decides a number's range; a number
+# matching no prefix of its country is unassigned.
+NUMBERING_PLANS: dict[str, tuple[tuple[str, tuple[int, ...], str], ...]] = {
+    # NANP shares ranges between mobile and fixed lines, so only the length is checked
+    "1": (("", (10,), LINE_FIXED_OR_MOBILE),),
+    "7": (
+        ("3", (10,), LINE_FIXED), ("4", (10,), LINE_FIXED), ("8", (10,), LINE_FIXED),
+        ("9", (10,), LINE_MOBILE), ("7", (10,), LINE_FIXED_OR_MOBILE),
+        ("800", (10,), LINE_TOLL_FREE),
+    ),
+    "31": (
+        *((prefix, (9,), LINE_FIXED) for prefix in "123457"),
+        ("6", (9,), LINE_MOBILE),
+        ("800", (7, 8, 9, 10), LINE_TOLL_FREE), ("90", (7, 8, 9, 10), LINE_PREMIUM_RATE),
+    ),
+    "33": (
+        *((prefix, (9,), LINE_FIXED) for prefix in "12345"),
+        ("6", (9,), LINE_MOBILE), ("7", (9,), LINE_MOBILE),
+        ("80", (9,), LINE_TOLL_FREE), ("81", (9,), LINE_PREMIUM_RATE),
+        ("82", (9,), LINE_PREMIUM_RATE), ("89", (9,), LINE_PREMIUM_RATE),
+        ("9", (9,), LINE_VOIP),
+    ),
+    "34": (
+        ("6", (9,), LINE_MOBILE), ("7", (9,), LINE_MOBILE),
+        ("8", (9,), LINE_FIXED), ("9", (9,), LINE_FIXED),
+        ("800", (9,), LINE_TOLL_FREE), ("900", (9,), LINE_TOLL_FREE),
+    ),
+    "39": (
+        ("0", tuple(range(6, 12)), LINE_FIXED), ("3", (9, 10), LINE_MOBILE),
+        ("800", (9,), LINE_TOLL_FREE), ("89", (9, 10), LINE_PREMIUM_RATE),
+    ),
+    "44": (
+        ("1", (9, 10), LINE_FIXED), ("2", (10,), LINE_FIXED), ("3", (10,), LINE_FIXED),
+        ("55", (10,), LINE_FIXED), ("56", (10,), LINE_VOIP),
+        *((prefix, (10,), LINE_MOBILE) for prefix in ("71", "72", "73", "74", "75", "77",
+                                                       "78", "79", "7624")),
+        ("800", (9, 10), LINE_TOLL_FREE), ("808", (10,), LINE_TOLL_FREE),
+        ("84", (10,), LINE_PREMIUM_RATE), ("87", (10,), LINE_PREMIUM_RATE),
+        ("9", (10,), LINE_PREMIUM_RATE),
+    ),
+    "49": (
+        *((prefix, tuple(range(6, 12)), LINE_FIXED) for prefix in "23456789"),
+        ("15", (10, 11), LINE_MOBILE), ("16", (10, 11), LINE_MOBILE),
+        ("17", (10, 11), LINE_MOBILE),
+        ("800", (10,), LINE_TOLL_FREE), ("900", (10, 11), LINE_PREMIUM_RATE),
+    ),
+    "52": (("", (10,), LINE_FIXED_OR_MOBILE),),
+    "55": (("", (10, 11), LINE_FIXED_OR_MOBILE),),
+    "61": (
+        ("2", (9,), LINE_FIXED), ("3", (9,), LINE_FIXED), ("7", (9,), LINE_FIXED),
+        ("8", (9,), LINE_FIXED), ("4", (9,), LINE_MOBILE),
+        ("1800", (10,), LINE_TOLL_FREE), ("190", (10,), LINE_PREMIUM_RATE),
+    ),
+    "65": (
+        ("3", (8,), LINE_VOIP), ("6", (8,), LINE_FIXED), ("8", (8,), LINE_MOBILE),
+        ("9", (8,), LINE_MOBILE), ("800", (10,), LINE_TOLL_FREE),
+    ),
+    "81": (
+        *((prefix, (9,), LINE_FIXED) for prefix in "123456789"),
+        ("70", (10,), LINE_MOBILE), ("80", (10,), LINE_MOBILE), ("90", (10,), LINE_MOBILE),
+        ("50", (10,), LINE_VOIP), ("120", (9,), LINE_TOLL_FREE), ("800", (10,), LINE_TOLL_FREE),
+    ),
+    "86": (
+        ("10", (10,), LINE_FIXED), ("2", (10,), LINE_FIXED),
+        *((prefix, (10, 11), LINE_FIXED) for prefix in "3456789"),
+        *((prefix, (11,), LINE_MOBILE) for prefix in ("13", "14", "15", "16", "17", "18", "19")),
+        ("400", (10,), LINE_TOLL_FREE), ("800", (10,), LINE_TOLL_FREE),
+    ),
+    "91": (("", (10,), LINE_FIXED_OR_MOBILE),),
+}
+
+# Other assigned geographic country codes, checked against the E.164 length
+# limits only. Global service codes (800, 808, 870, 881-883, ...) are left out;
+# they cannot receive SMS.
+OTHER_COUNTRY_CODES = (
+    "20 211 212 213 216 218 220 221 222 223 224 225 226 227 228 229 230 231 232 233 "
+    "234 235 236 237 238 239 240 241 242 243 244 245 246 247 248 249 250 251 252 253 "
+    "254 255 256 257 258 260 261 262 263 264 265 266 267 268 269 27 290 291 297 298 "
+    "299 30 32 350 351 352 353 354 355 356 357 358 359 36 370 371 372 373 374 375 376 "
+    "377 378 380 381 382 383 385 386 387 389 40 41 420 421 423 43 45 46 47 48 500 501 "
+    "502 503 504 505 506 507 508 509 51 53 54 56 57 58 590 591 592 593 594 595 596 "
+    "597 598 599 60 62 63 64 66 670 672 673 674 675 676 677 678 679 680 681 682 683 "
+    "685 686 687 688 689 690 691 692 82 84 850 852 853 855 856 880 886 90 92 93 94 95 "
+    "960 961 962 963 964 965 966 967 968 970 971 972 973 974 975 976 977 98 992 993 "
+    "994 995 996 998"
+).split()
+
+
+@dataclass(frozen=True)
+class NumberInfo:
+    """What the numbering plan says about an E.164 number."""
+
+    country_code: str
+    national_number: str
+    # LINE_* type of the range the number is in
+    line_type: str
+
+
+@dataclass(frozen=True)
+class _Range:
+    country_code: str
+    lengths: frozenset[int]
+    line_type: str
+
+
+def _build_trie() -> dict:
+    """
+    Build a digit trie over country code + range prefix.
+
+    Each node maps a digit to its child node; the range ending at a node, if
+    any, is stored under the key "". Country codes are prefix-free, so one
+    walk down the trie finds both the country and its longest matching range.
+    """
+    root: dict = {}
+
+    def insert(digits: str, number_range: _Range) -> None:
+        node = root
+        for digit in digits:
+            node = node.setdefault(digit, {})
+        node[""] = number_range
+
+    for country_code, ranges in NUMBERING_PLANS.items():
+        for prefix, lengths, line_type in ranges:
+            insert(country_code + prefix, _Range(country_code, frozenset(lengths), line_type))
+    for country_code in OTHER_COUNTRY_CODES:
+        digits = len(country_code)
+        lengths = range(max(1, _MIN_DIGITS - digits), _MAX_DIGITS - digits + 1)
+        insert(country_code, _Range(country_code, frozenset(lengths), LINE_UNKNOWN))
+    return root
+
+
+_TRIE = _build_trie()
+
+
+def lookup(phone: str) -> NumberInfo | None:
+    """
+    Find the range an E.164 number belongs to, in time linear in its length.
+
+    Returns:
+        NumberInfo, or None if phone is not E.164, its country code is not
+        assigned, or it is not a valid length for the range it falls in
+    """
+    digits = phone[1:]
+    if not phone.startswith("+") or not digits.isascii() or not digits.isdigit():
+        return None
+    node = _TRIE
+    best: _Range | None = None
+    for digit in digits:
+        node = node.get(digit)
+        if node is None:
+            break
+        best = node.get("", best)
+    if best is None:
+        return None
+    national_number = digits[len(best.country_code):]
+    if len(national_number) not in best.lengths:
+        return None
+    return NumberInfo(best.country_code, national_number, best.line_type)
+
+
+def accepts_sms(phone: str) -> bool:
+    """Return True if phone is a valid number in a range that can receive SMS."""
+    info = lookup(phone)
+    return info is not None and info.line_type not in NON_SMS_LINE_TYPES
@@ -0,0 +1,169 @@
+"""
+Throttled progress reporting for bulk sends.
+"""
+
+import json
+import sys
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TextIO
+
+# "skipped" reasons for recipients on the suppression list, and for recipients
+# the contact history shows were messaged within its window
+OPTED_OUT = "opted out"
+RECENTLY_MESSAGED = "recently messaged"
+
+
+@dataclass
+class BulkStats:  # pylint: disable=too-many-instance-attributes
+    """Aggregate outcome of a send_bulk run."""
+
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    # Skipped because they are on the suppression list
+    opted_out: int = 0
+    # Skipped because the contact history shows them messaged recently
+    recently_messaged: int = 0
+    # Scheduled past the end of a send window that could not hold them all
+    spread_overflow: int = 0
+    attempts: int = 0
+    elapsed: float = 0.0
+    concurrency_limit: int | None = None
+    # (completed sends, limit) each time an adaptive controller changed its limit
+    concurrency_history: list[tuple[int, int]] = field(default_factory=list)
+
+    def record(self, result: dict) -> None:
+        """Count one recipient's bulk result."""
+        self.total += 1
+        if "skipped" in result:
+            self.skipped += 1
+            self.opted_out += result["skipped"] == OPTED_OUT
+            self.recently_messaged += result["skipped"] == RECENTLY_MESSAGED
+        elif result["success"]:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self.spread_overflow += result.get("past_window", False)
+        self.attempts += result.get("attempts", 0)
+
+    def merge(self, other: "BulkStats") -> None:
+        """Add another run's counts to these."""
+        self.total += other.total
+        self.succeeded += other.succeeded
+        self.failed += other.failed
+        self.skipped += other.skipped
+        self.opted_out += other.opted_out
+        self.recently_messaged += other.recently_messaged
+        self.spread_overflow += other.spread_overflow
+        self.attempts += other.attempts
+
+
+class ProgressReporter:  # pylint: disable=too-many-instance-attributes
+    """
+    Report bulk send progress at most once per interval.
+
+    On a terminal the report is a single line redrawn in place; otherwise each
+    report is a JSON object on its own line, suitable for log aggregation. Both
+    show counts, rate, ETA (when the total is known) and latency percentiles
+    over the most recent sends.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        total: int | None = None,
+        stream: TextIO | None = None,
+        *,
+        interval: float | None = None,
+        quiet: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+        latency_window: int | None = 4096,
+    ):
+        """
+        Initialize the reporter.
+
+        Args:
+            total: Number of recipients expected, used for the ETA (default: unknown)
+            stream: Where to write reports (default: sys.stderr)
+            interval: Minimum seconds between reports (default: 0.2 on a
+                terminal, 10 otherwise)
+            quiet: Track progress without writing anything (default: False)
+            clock: Monotonic time source in seconds (default: time.monotonic)
+            latency_window: Number of most recent latencies percentiles are
+                computed over, or None to keep all (default: 4096)
+        """
+        self.total = total
+        self.stream = stream if stream is not None else sys.stderr
+        self.tty = self.stream.isatty()
+        self.interval = interval if interval is not None else (0.2 if self.tty else 10.0)
+        self.quiet = quiet
+        self._clock = clock
+        self.started = clock()
+        self._last_report = self.started
+        self.counts = {"done": 0, "succeeded": 0, "failed": 0, "skipped": 0}
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+
+    def update(self, result: dict, latency: float) -> None:
+        """Count one completed recipient and report if the interval has passed."""
+        self.counts["done"] += 1
+        if "skipped" in result:
+            self.counts["skipped"] += 1
+        else:
+            self.counts["succeeded" if result["success"] else "failed"] += 1
+            self._latencies.append(latency)
+
+        now = self._clock()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self._report(self.snapshot())
+
+    def finish(self) -> None:
+        """Write the final report."""
+        self._report(self.snapshot())
+        if self.tty and not self.quiet:
+            self.stream.write("\n")
+            self.stream.flush()
+
+    def snapshot(self) -> dict:
+        """Return current counts, rate, ETA and latency percentiles."""
+        elapsed = self._clock() - self.started
+        rate = self.counts["done"] / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = max(0, self.total - self.counts["done"]) / rate
+        latencies = sorted(self._latencies)
+        percentiles = {f"p{p}_ms": _percentile_ms(latencies, p) for p in (50, 95, 99)}
+        return {
+            **self.counts,
+            "total": self.total,
+            "elapsed_s": round(elapsed, 1),
+            "rate_per_s": round(rate, 1),
+            "eta_s": round(eta, 1) if eta is not None else None,
+            **percentiles,
+        }
+
+    def _report(self, snapshot: dict) -> None:
+        if self.quiet:
+            return
+        if self.tty:
+            done = snapshot["done"] if self.total is None else f"{snapshot['done']}/{self.total}"
+            eta = f"{snapshot['eta_s']:.0f}s" if snapshot["eta_s"] is not None else "?"
+            self.stream.write(
+                f"\r{done} ✓{snapshot['succeeded']} ✗{snapshot['failed']} "
+                f"skipped {snapshot['skipped']} | {snapshot['rate_per_s']}/s ETA {eta} | "
+                f"p50 {snapshot['p50_ms']}ms p95 {snapshot['p95_ms']}ms p99 {snapshot['p99_ms']}ms"
+            )
+        else:
+            self.stream.write(json.dumps({"event": "progress", **snapshot}) + "\n")
+        self.stream.flush()
+
+
+def _percentile_ms(sorted_latencies: list[float], percent: int) -> float | None:
+    """Return the given percentile of latencies in seconds, as milliseconds."""
+    if not sorted_latencies:
+        return None
+    index = min(len(sorted_latencies) - 1, len(sorted_latencies) * percent // 100)
+    return round(1000 * sorted_latencies[index], 3)
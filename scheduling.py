@@ -0,0 +1,52 @@
+"""
+Send times prepared once in the UTC form Twilio's scheduling API expects.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+
+@dataclass(frozen=True)
+class ScheduleSpec:
+    """
+    A send time already converted to the UTC string Twilio expects.
+
+    Build one with from_local() and pass it as send_at to send() to skip the
+    timezone conversion on every call; send_bulk does this once per run.
+    """
+
+    send_at_utc: str
+
+    @classmethod
+    def from_local(cls, send_at: datetime, timezone: str = "America/New_York") -> "ScheduleSpec":
+        """
+        Convert a local send time.
+
+        Args:
+            send_at: Local datetime to send at
+            timezone: Timezone for send_at (default: America/New_York)
+        """
+        scheduled_utc = send_at.replace(tzinfo=ZoneInfo(timezone)).astimezone(ZoneInfo("UTC"))
+        return cls(scheduled_utc.isoformat(timespec='seconds').replace('+00:00', 'Z'))
+
+    @classmethod
+    def from_timestamp(cls, timestamp: float) -> "ScheduleSpec":
+        """Convert a send time in Unix seconds."""
+        scheduled_utc = datetime.fromtimestamp(int(timestamp), ZoneInfo("UTC"))
+        return cls(scheduled_utc.isoformat(timespec='seconds').replace('+00:00', 'Z'))
+
+    def timestamp(self) -> float:
+        """Return the send time in Unix seconds."""
+        # fromisoformat only takes a "Z" suffix from Python 3.11
+        return datetime.fromisoformat(self.send_at_utc.replace("Z", "+00:00")).timestamp()
+
+    @classmethod
+    def of(cls, send_at: "datetime | ScheduleSpec", timezone: str) -> "ScheduleSpec":
+        """Return send_at unchanged if it is already a ScheduleSpec, else convert it."""
+        return send_at if isinstance(send_at, ScheduleSpec) else cls.from_local(send_at, timezone)
+
+
+# Send time meaning "now": the message is sent unscheduled, for callers such as
+# local_scheduler that time sends themselves
+SEND_NOW = ScheduleSpec("")
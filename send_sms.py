@@ -3,37 +3,135 @@ Send SMS via Twilio API with scheduling support.
 """
 
 import argparse
+import asyncio
 import json
 import re
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import partial
 from pathlib import Path
-from zoneinfo import ZoneInfo
 
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
 
-# E.164 format: + followed by 11 digits
-E164_PATTERN = re.compile(r"^\+\d{11}$")
+from area_codes import send_bulk_local_time
+from bloom import ContactHistory
+from flow_control import AdaptiveConcurrency, RetryPolicy, SendWindow, TokenBucket
+from idempotency import IdempotencyIndex, UnknownOutcomeError, idempotency_key
+from journal import SendJournal
+from numbering_plan import accepts_sms
+from phone_numbers import dedupe_phone_numbers, normalize_phone_stream, read_phone_numbers
+from progress import OPTED_OUT, RECENTLY_MESSAGED, BulkStats, ProgressReporter
+from scheduling import ScheduleSpec
+from sharding import send_bulk_sharded
+from sinks import CallbackSink, CsvSink, JsonlSink, ResultSink, SqliteSink
+from suppression import SuppressionList
+from transport import (
+    TWILIO_API_URL,
+    AsyncTrackingHttpClient,
+    ConnectionStats,
+    FastTransport,
+    HttpPoolConfig,
+    TrackingHttpClient,
+    TransportError,
+    last_response,
+)
+from work_queue import QueueDrain, SqliteWorkQueue, send_from_queue
 
+# E.164 format: + followed by a country code and up to 15 digits in all
+E164_PATTERN = re.compile(r"^\+[1-9]\d{6,14}$")
 
-class SMSSender:
+
+class SendError(RuntimeError):
+    """Twilio rejected a message after all allowed attempts."""
+
+    def __init__(self, error: TwilioRestException, attempts: int):
+        super().__init__(f"Failed to send SMS: {error.msg}")
+        self.status = error.status
+        self.code = error.code
+        self.attempts = attempts
+
+
+class SMSSender:  # pylint: disable=too-many-instance-attributes
     """Twilio SMS sender with scheduling support."""
 
-    def __init__(self, config_path: Path | None = None):
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        config_path: Path | None = None,
+        rate_limiter: TokenBucket | None = None,
+        retry_policy: RetryPolicy | None = None,
+        api_base_url: str | None = None,
+        *,
+        fast_transport: bool = False,
+        http_pool: HttpPoolConfig | None = None,
+        idempotency: IdempotencyIndex | None = None,
+        suppression: SuppressionList | None = None,
+        contact_history: ContactHistory | None = None,
+    ):
         """
         Initialize SMS sender with Twilio credentials.
 
         Args:
             config_path: Path to config.json file (default: config.json in script directory)
+            rate_limiter: Optional token bucket pacing every send, shared by all
+                threads and tasks using this sender
+            retry_policy: Optional policy for retrying throttled and server
+                errors (default: no retries)
+            api_base_url: Send API requests here instead of https://api.twilio.com,
+                e.g. to a local fake_twilio server
+            fast_transport: Create messages in send() with the lean FastTransport
+                instead of the Twilio SDK (default: False)
+            http_pool: Connection pool size, keep-alive, timeouts and HTTP/2 for
+                every HTTP client the sender uses (default: library defaults).
+                Size the pool to the number of concurrent sends.
+            idempotency: Optional index of idempotency keys, one per campaign and
+                recipient, checked before every create so retries and resumed
+                runs never schedule the same message twice. Only 429s are retried
+                while it is in use, since other errors may follow a create.
+            suppression: Optional list of opted-out numbers that are never sent
+                to; bulk sends report them as skipped
+            contact_history: Optional record of numbers messaged recently, across
+                campaigns. Bulk sends skip numbers it shows within its window
+                and record every number they schedule.
         """
         if config_path is None:
             config_path = Path(__file__).parent / "config.json"
 
+        if http_pool is not None and http_pool.http2 and not fast_transport:
+            raise ValueError("HTTP/2 requires fast_transport=True")
+
         config = self._load_config(config_path)
+        self.config_path = config_path
         self.account_sid = config["account_sid"]
         self.auth_token = config["auth_token"]
         self.messaging_service_sid = config["messaging_service_sid"]
-        self.client = Client(self.account_sid, self.auth_token)
+        self.api_base_url = api_base_url
+        self.http_pool = http_pool
+        self.client = Client(
+            self.account_sid,
+            self.auth_token,
+            http_client=TrackingHttpClient(None if fast_transport else http_pool),
+        )
+        if api_base_url is not None:
+            self.client.api.base_url = api_base_url
+        self.transport = FastTransport(
+            self.account_sid,
+            self.auth_token,
+            self.messaging_service_sid,
+            api_base_url or TWILIO_API_URL,
+            pool=http_pool,
+        ) if fast_transport else None
+        self._async_client: Client | None = None
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+        self.idempotency = idempotency
+        self.suppression = suppression
+        self.contact_history = contact_history
+        self.last_run_stats: BulkStats | None = None
 
     @staticmethod
     def _load_config(config_path: Path) -> dict:
@@ -47,15 +145,22 @@ class SMSSender:
 
     @staticmethod
     def validate_phone(phone: str) -> bool:
-        """Validate phone number is in E.164 format (+11 digits)."""
-        return bool(E164_PATTERN.match(phone))
+        """
+        Validate phone number is E.164 and deliverable by SMS.
 
-    def send(
+        The number must be a valid length for an assigned range of its country's
+        numbering plan, and not a landline or premium-rate range.
+        """
+        return bool(E164_PATTERN.match(phone)) and accepts_sms(phone)
+
+    def send(  # pylint: disable=too-many-arguments
         self,
         to: str,
         body: str,
-        send_at: datetime,
+        send_at: datetime | ScheduleSpec,
         timezone: str = "America/New_York",
+        *,
+        campaign: str | None = None,
     ) -> dict:
         """
         Send a scheduled SMS message.
@@ -63,75 +168,694 @@ class SMSSender:
         Args:
             to: Recipient phone number (E.164 format for US. numbers)
             body: Message content
-            send_at: Local datetime to send the message
-            timezone: Timezone for send_at (default: America/New_York)
+            send_at: Local datetime to send the message, or a ScheduleSpec
+                prepared in advance to skip the timezone conversion; SEND_NOW
+                sends it unscheduled
+            timezone: Timezone for send_at (default: America/New_York); ignored
+                for a ScheduleSpec
+            campaign: Campaign the idempotency key is derived from, with the
+                recipient (default: the send time and body)
 
         Returns:
-            dict with message sid and status
+            dict with message sid and status; with "skipped" set instead of
+            sending if the recipient opted out or the idempotency index shows
+            it was already scheduled
+
+        Raises:
+            UnknownOutcomeError: If an earlier attempt for the same key may have
+                scheduled the message
         """
-        if not self.validate_phone(to):
-            raise ValueError(f"Invalid phone number format: {to}. Expected E.164 format.")
+        send_at_utc = self._prepare(to, send_at, timezone)
+        key, earlier = self._reserve(to, body, send_at_utc, campaign)
+        if earlier is not None:
+            return earlier
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                sid, status = self._create(to, body, send_at_utc)
+            except TransportError as e:
+                # Left pending: the message may have been created
+                e.attempts = attempt
+                raise
+            except TwilioRestException as e:
+                delay = self._retry_delay(e, attempt, started)
+                if delay is None:
+                    self._settle_rejected(key, e)
+                    raise SendError(e, attempt) from e
+            else:
+                self._settle_created(key, sid, status)
+                return {"sid": sid, "status": status, "attempts": attempt}
+            time.sleep(delay)
+
+    def _create(self, to: str, body: str, send_at_utc: str) -> tuple[str, str]:
+        """Create one message with the fast transport if enabled, else the SDK."""
+        if self.transport is not None:
+            return self.transport.create(to, body, send_at_utc)
+        message = self.client.messages.create(
+            body=body,
+            messaging_service_sid=self.messaging_service_sid,
+            to=to,
+            **self._schedule_params(send_at_utc),
+        )
+        return message.sid, message.status
+
+    @staticmethod
+    def _schedule_params(send_at_utc: str) -> dict:
+        """Return the create parameters scheduling a message, none for SEND_NOW."""
+        return {"send_at": send_at_utc, "schedule_type": "fixed"} if send_at_utc else {}
+
+    async def send_async(  # pylint: disable=too-many-arguments
+        self,
+        to: str,
+        body: str,
+        send_at: datetime | ScheduleSpec,
+        timezone: str = "America/New_York",
+        *,
+        campaign: str | None = None,
+    ) -> dict:
+        """
+        Send a scheduled SMS message without blocking the event loop.
+
+        Uses a separate Twilio client backed by the SDK's aiohttp transport,
+        created on first use. Call aclose() when done to release its session.
+
+        Args:
+            to: Recipient phone number (E.164 format for US. numbers)
+            body: Message content
+            send_at: Local datetime to send the message, or a ScheduleSpec
+                prepared in advance to skip the timezone conversion
+            timezone: Timezone for send_at (default: America/New_York); ignored
+                for a ScheduleSpec
+            campaign: Campaign the idempotency key is derived from, with the
+                recipient (default: the send time and body)
 
-        local_tz = ZoneInfo(timezone)
-        scheduled_utc = send_at.replace(tzinfo=local_tz).astimezone(ZoneInfo("UTC"))
+        Returns:
+            dict with message sid and status, as for send()
+        """
+        send_at_utc = self._prepare(to, send_at, timezone)
+        key, earlier = self._reserve(to, body, send_at_utc, campaign)
+        if earlier is not None:
+            return earlier
+        if self._async_client is None:
+            self._async_client = Client(
+                self.account_sid,
+                self.auth_token,
+                http_client=AsyncTrackingHttpClient(self.http_pool),
+            )
+            if self.api_base_url is not None:
+                self._async_client.api.base_url = self.api_base_url
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            try:
+                message = await self._async_client.messages.create_async(
+                    body=body,
+                    messaging_service_sid=self.messaging_service_sid,
+                    to=to,
+                    **self._schedule_params(send_at_utc),
+                )
+            except TransportError as e:
+                # Left pending: the message may have been created
+                e.attempts = attempt
+                raise
+            except TwilioRestException as e:
+                delay = self._retry_delay(e, attempt, started)
+                if delay is None:
+                    self._settle_rejected(key, e)
+                    raise SendError(e, attempt) from e
+            else:
+                self._settle_created(key, message.sid, message.status)
+                return {"sid": message.sid, "status": message.status, "attempts": attempt}
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        """Close the async HTTP session opened by send_async, if any."""
+        if self._async_client is not None:
+            await self._async_client.http_client.close()
+            self._async_client = None
+
+    def connection_stats(self) -> ConnectionStats:
+        """
+        Return requests sent and connections opened across this sender's HTTP clients.
+
+        Counts are only kept for clients built with an http_pool or by the fast
+        transport; reused is requests that did not need a new connection.
+        """
+        stats = self.client.http_client.connection_stats()
+        if self.transport is not None:
+            stats += self.transport.connection_stats()
+        if self._async_client is not None:
+            stats += self._async_client.http_client.connection_stats()
+        return stats
+
+    def _reserve(
+        self, to: str, body: str, send_at_utc: str, campaign: str | None
+    ) -> tuple[str | None, dict | None]:
+        """
+        Check the suppression list and claim the idempotency key for a send.
 
+        Returns the key (None without an index) and, if the recipient opted out
+        or the message was already scheduled, the result to return instead of
+        sending.
+        """
+        if self.suppression is not None and to in self.suppression:
+            return None, {"sid": None, "status": None, "attempts": 0, "skipped": OPTED_OUT}
+        if self.idempotency is None:
+            return None, None
+        key = idempotency_key(campaign if campaign is not None else f"{send_at_utc}\0{body}", to)
+        entry = self.idempotency.reserve(key)
+        if entry is None:
+            return key, None
+        if entry["state"] == "pending":
+            raise UnknownOutcomeError(key, to)
+        return key, {
+            "sid": entry["sid"], "status": entry["status"], "attempts": 0,
+            "skipped": "already scheduled",
+        }
+
+    def _settle_created(self, key: str | None, sid: str, status: str) -> None:
+        """Record a created message against its idempotency key."""
+        if key is not None:
+            self.idempotency.complete(key, sid, status)
+
+    def _settle_rejected(self, key: str | None, error: TwilioRestException) -> None:
+        """
+        Release the key of a message Twilio definitely did not create.
+
+        A 4xx means the request was refused. After a 5xx the message may still
+        have been created, so the key stays pending and the outcome unknown.
+        """
+        if key is not None and error.status < 500:
+            self.idempotency.release(key)
+
+    def _retry_delay(
+        self, error: TwilioRestException, attempt: int, started: float
+    ) -> float | None:
+        """Return seconds to wait before retrying, or None if the error is final."""
+        # A 429 is refused before anything is created; other retryable errors may
+        # follow a create that landed, so retrying them could schedule twice
+        if self.idempotency is not None and error.status != 429:
+            return None
+        if not self.retry_policy.should_retry(attempt, error.status, error.code):
+            return None
+        delay = self.retry_policy.delay(attempt, self._retry_after())
+        if time.monotonic() - started + delay > self.retry_policy.max_elapsed:
+            return None
+        return delay
+
+    @staticmethod
+    def _retry_after() -> float | None:
+        """Return the Retry-After of the last response in seconds, if it sent one."""
+        response = last_response.get()
+        value = response.headers.get("Retry-After") if response and response.headers else None
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
         try:
-            message = self.client.messages.create(
-                body=body,
-                messaging_service_sid=self.messaging_service_sid,
-                send_at=scheduled_utc.isoformat(timespec='seconds').replace('+00:00', 'Z'),
-                schedule_type="fixed",
-                to=to,
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _prepare(self, to: str, send_at: datetime | ScheduleSpec, timezone: str) -> str:
+        """Validate the recipient and return send_at as a UTC ISO 8601 string."""
+        if not self.validate_phone(to):
+            if not E164_PATTERN.match(to):
+                raise ValueError(f"Invalid phone number format: {to}. Expected E.164 format.")
+            raise ValueError(
+                f"Invalid phone number: {to} is not in a range of its numbering plan that takes SMS"
             )
-            return {"sid": message.sid, "status": message.status}
-        except TwilioRestException as e:
-            raise RuntimeError(f"Failed to send SMS: {e.msg}") from e
 
-    def send_bulk(
+        return ScheduleSpec.of(send_at, timezone).send_at_utc
+
+    def send_bulk(  # pylint: disable=too-many-arguments,too-many-locals
         self,
-        recipients: list[str],
+        recipients: Iterable[str],
         body: str,
-        send_at: datetime,
+        send_at: datetime | ScheduleSpec,
         timezone: str = "America/New_York",
-    ) -> list[dict]:
+        *,
+        max_workers: int = 1,
+        concurrency: AdaptiveConcurrency | None = None,
+        journal: SendJournal | None = None,
+        sink: ResultSink | None = None,
+        progress: ProgressReporter | None = None,
+        campaign: str | None = None,
+        schedule: Callable[[str], ScheduleSpec] | None = None,
+        window: SendWindow | None = None,
+    ) -> list[dict] | BulkStats:
         """
         Send scheduled SMS to multiple phone numbers.
 
         Args:
-            recipients: List of recipient phone numbers (E.164 format)
+            recipients: Recipient phone numbers (E.164 format); any iterable,
+                consumed lazily so generators are not materialized
             body: Message content
-            send_at: Local datetime to send the messages
-            timezone: Timezone for send_at (default: America/New_York)
+            send_at: Local datetime to send the messages, or a ScheduleSpec
+            timezone: Timezone for send_at (default: America/New_York); ignored
+                for a ScheduleSpec
+            max_workers: Number of threads sending concurrently through the shared
+                Twilio client (default: 1, sequential)
+            concurrency: Optional AIMD controller that tunes the number of sends in
+                flight between its minimum and maximum; replaces max_workers
+            journal: Optional journal that every outcome is appended to as it
+                completes. Recipients it already shows as scheduled, from an
+                earlier interrupted run, are skipped and reported with a
+                "skipped" reason instead of being sent again.
+            sink: Optional destination each result is written to as it completes,
+                instead of being collected in memory. The caller closes it.
+            progress: Optional reporter updated as each recipient completes
+                (default: no output)
+            campaign: Campaign idempotency keys are derived from, if the sender
+                has an index (default: the send time and body)
+            schedule: Optional function returning each recipient's prepared send
+                time, overriding send_at (default: send_at for every recipient)
+            window: Optional window the send times are spread over at its rate,
+                starting from send_at, instead of all being send_at. Reusing one
+                window across runs with the same send_at continues the spread.
+                Results scheduled past its end have "past_window" set and are
+                counted in the stats' spread_overflow.
 
         Returns:
-            List of dicts with send results for each number
+            List of dicts with send results for each number, in recipient order,
+            or only the run's BulkStats when a sink is given. The stats are also
+            left in last_run_stats.
         """
-        message_results = []
-        for phone in recipients:
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        past_window: set[ScheduleSpec] = set()
+        if window is not None:
+            if schedule is not None:
+                raise ValueError("schedule and window cannot be combined")
+            start = ScheduleSpec.of(send_at, timezone)
+            window.check(start.timestamp())
+            schedule = self._window_schedule(window, start, past_window)
+            # Keep the keys of a spread run the same as an unspread one, since
+            # a rerun gives recipients different times
+            if campaign is None:
+                campaign = f"{start.send_at_utc}\0{body}"
+
+        stats = BulkStats()
+        started = time.monotonic()
+        # Convert the send time once for the whole run instead of per recipient
+        spec = ScheduleSpec.of(send_at, timezone) if schedule is None else None
+        timed_send = partial(self._timed_send, body=body, timezone=timezone, campaign=campaign)
+
+        def send_one(phone: str) -> tuple[dict, float]:
+            skipped = self._skip_reason(phone)
+            if skipped is not None:
+                return {"phone": phone, "success": False, "skipped": skipped}, 0.0
+            if journal is not None and journal.is_done(phone):
+                return {"phone": phone, "success": True, "skipped": "already scheduled"}, 0.0
+            if schedule is None:
+                return timed_send(phone, send_at=spec)
+            return self._scheduled_send(phone, timed_send, schedule, past_window)
+
+        message_results: list[dict | None] = []
+
+        def on_result(index: int, result: dict, latency: float) -> None:
+            stats.record(result)
+            if progress is not None:
+                progress.update(result, latency)
+            if sink is not None:
+                sink.write(result)
+            else:
+                message_results.extend([None] * (index + 1 - len(message_results)))
+                message_results[index] = result
+            if "skipped" in result:
+                return
+            if self.contact_history is not None and result["success"]:
+                self.contact_history.record(result["phone"])
+            if journal is not None:
+                journal.record(result)
+            # Recipients rejected before reaching Twilio say nothing about its latency
+            if concurrency is not None and "attempts" in result:
+                concurrency.record(latency, throttled=self._is_throttled(result))
+
+        if concurrency is not None:
+            self._send_concurrently(
+                recipients, send_one, concurrency.maximum, lambda: concurrency.limit, on_result
+            )
+        elif max_workers > 1:
+            self._send_concurrently(
+                recipients, send_one, max_workers, lambda: max_workers, on_result
+            )
+        else:
+            for index, phone in enumerate(recipients):
+                on_result(index, *send_one(phone))
+
+        stats.elapsed = time.monotonic() - started
+        if progress is not None:
+            progress.finish()
+        if concurrency is not None:
+            stats.concurrency_limit = concurrency.limit
+            stats.concurrency_history = list(concurrency.history)
+        self.last_run_stats = stats
+        return stats if sink is not None else message_results
+
+    @staticmethod
+    def _window_schedule(
+        window: SendWindow, start: ScheduleSpec, past_window: set[ScheduleSpec]
+    ) -> Callable[[str], ScheduleSpec]:
+        """
+        Return a send_bulk schedule giving each recipient the window's next send time.
+
+        Send times past the window's end are added to past_window.
+        """
+        start_time = start.timestamp()
+        # Many recipients share each second, so convert each second once
+        specs: dict[int, ScheduleSpec] = {}
+
+        def schedule(_phone: str) -> ScheduleSpec:
+            second = window.next_send_time(start_time)
+            spec = specs.get(second)
+            if spec is None:
+                spec = ScheduleSpec.from_timestamp(second)
+                # Marked before it is shared, so no thread sees it unmarked
+                if second >= window.end:
+                    past_window.add(spec)
+                specs[second] = spec
+            return spec
+
+        return schedule
+
+    @staticmethod
+    def _scheduled_send(
+        phone: str,
+        timed_send: Callable[..., tuple[dict, float]],
+        schedule: Callable[[str], ScheduleSpec],
+        past_window: set[ScheduleSpec],
+    ) -> tuple[dict, float]:
+        """Send to phone at its scheduled time, marking a result past the send window."""
+        try:
+            send_time = schedule(phone)
+        except ValueError as e:
+            return SMSSender._failure(phone, e), 0.0
+        result, latency = timed_send(phone, send_at=send_time)
+        if send_time in past_window and "skipped" not in result:
+            result["past_window"] = True
+        return result, latency
+
+    @staticmethod
+    def _send_concurrently(
+        recipients: Iterable[str],
+        send_one: Callable[[str], tuple[dict, float]],
+        workers: int,
+        window: Callable[[], int],
+        on_result: Callable[[int, dict, float], None],
+    ) -> None:
+        """Run send_one over a thread pool, keeping window() sends in flight."""
+        in_flight: dict[Future, int] = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for index, phone in enumerate(recipients):
+                # Only submit up to the window so large lists are not turned into
+                # one future per recipient up front
+                while len(in_flight) >= window():
+                    SMSSender._collect(in_flight, on_result, wait_for_all=False)
+                in_flight[executor.submit(send_one, phone)] = index
+            SMSSender._collect(in_flight, on_result, wait_for_all=True)
+
+    @staticmethod
+    def _collect(
+        in_flight: dict[Future, int],
+        on_result: Callable[[int, dict, float], None],
+        wait_for_all: bool,
+    ) -> None:
+        """Hand finished futures' results to on_result with their recipient index."""
+        done, _ = wait(in_flight, return_when=ALL_COMPLETED if wait_for_all else FIRST_COMPLETED)
+        for future in done:
+            on_result(in_flight.pop(future), *future.result())
+
+    @staticmethod
+    def _is_throttled(result: dict) -> bool:
+        """Return True if a bulk result shows Twilio pushing back."""
+        return result.get("attempts", 1) > 1 or result.get("http_status") == 429
+
+    async def send_bulk_async(  # pylint: disable=too-many-arguments
+        self,
+        recipients: Iterable[str],
+        body: str,
+        send_at: datetime | ScheduleSpec,
+        timezone: str = "America/New_York",
+        *,
+        max_concurrency: int = 100,
+        progress: ProgressReporter | None = None,
+    ) -> list[dict]:
+        """
+        Send scheduled SMS to multiple phone numbers from an event loop.
+
+        Args:
+            recipients: Recipient phone numbers (E.164 format); any iterable,
+                consumed lazily so generators are not materialized
+            body: Message content
+            send_at: Local datetime to send the messages, or a ScheduleSpec
+            timezone: Timezone for send_at (default: America/New_York); ignored
+                for a ScheduleSpec
+            max_concurrency: Maximum number of requests in flight (default: 100)
+            progress: Optional reporter updated as each recipient completes
+                (default: no output)
+
+        Returns:
+            List of dicts with send results for each number, in recipient order
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+
+        spec = ScheduleSpec.of(send_at, timezone)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        message_results: list[dict | None] = []
+        tasks: set[asyncio.Task] = set()
+
+        async def send_one(index: int, phone: str) -> None:
+            started = time.perf_counter()
             try:
-                result = self.send(to=phone, body=body, send_at=send_at, timezone=timezone)
-                result["phone"] = phone
-                result["success"] = True
-                message_results.append(result)
-                print(f"✓ Scheduled for {phone}")
-            except (RuntimeError, ValueError) as e:
-                message_results.append({"phone": phone, "success": False, "error": str(e)})
-                print(f"✗ Failed for {phone}: {e}")
+                skipped = self._skip_reason(phone)
+                if skipped is not None:
+                    result = {"phone": phone, "success": False, "skipped": skipped}
+                else:
+                    try:
+                        result = self._success(phone, await self.send_async(
+                            to=phone, body=body, send_at=spec, timezone=timezone
+                        ))
+                    except (RuntimeError, ValueError) as e:
+                        result = self._failure(phone, e)
+                    if self.contact_history is not None and result["success"]:
+                        self.contact_history.record(phone)
+                message_results[index] = result
+                if progress is not None:
+                    progress.update(result, time.perf_counter() - started)
+            finally:
+                semaphore.release()
+
+        for phone in recipients:
+            # Acquire before creating the task so only max_concurrency tasks exist
+            await semaphore.acquire()
+            task = asyncio.create_task(send_one(len(message_results), phone))
+            message_results.append(None)
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+        if progress is not None:
+            progress.finish()
         return message_results
 
+    def _timed_send(
+        self,
+        phone: str,
+        *,
+        body: str,
+        send_at: ScheduleSpec,
+        timezone: str,
+        campaign: str | None = None,
+    ) -> tuple[dict, float]:
+        """Send to a single recipient, returning its result dict and latency."""
+        started = time.perf_counter()
+        try:
+            result = self._success(phone, self.send(
+                to=phone, body=body, send_at=send_at, timezone=timezone, campaign=campaign
+            ))
+        except (RuntimeError, ValueError) as e:
+            result = self._failure(phone, e)
+        return result, time.perf_counter() - started
+
+    def _skip_reason(self, phone: str) -> str | None:
+        """Return why a bulk send should skip phone without sending, if it should."""
+        if self.suppression is not None and phone in self.suppression:
+            return OPTED_OUT
+        if self.contact_history is not None and self.contact_history.recently_messaged(phone):
+            return RECENTLY_MESSAGED
+        return None
+
+    @staticmethod
+    def _success(phone: str, result: dict) -> dict:
+        """Complete a send() result into a bulk result entry."""
+        result["phone"] = phone
+        result["success"] = True
+        return result
+
+    @staticmethod
+    def _failure(phone: str, error: Exception) -> dict:
+        """Build a bulk result entry for a recipient that failed."""
+        result = {"phone": phone, "success": False, "error": str(error)}
+        if isinstance(error, SendError):
+            result["attempts"] = error.attempts
+            result["http_status"] = error.status
+        elif isinstance(error, TransportError):
+            result["attempts"] = error.attempts
+        return result
+
 
 if __name__ == "__main__":
     arg_parser = argparse.ArgumentParser(description="Send scheduled SMS via Twilio")
     arg_parser.add_argument(
         "phone_numbers",
         type=Path,
-        help="List of phone numbers to send to (E.164 format)"
+        help="List of phone numbers to send to (E.164 or national format)"
+    )
+    arg_parser.add_argument(
+        "--default-country",
+        default="1",
+        help="Calling code for numbers written without one (default: 1)"
+    )
+    arg_parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=1,
+        help="Number of concurrent send threads (default: 1)"
+    )
+    arg_parser.add_argument(
+        "--mps",
+        type=float,
+        help="Maximum messages per second (default: unlimited)"
+    )
+    arg_parser.add_argument(
+        "--burst",
+        type=int,
+        default=1,
+        help="Messages allowed back to back when using --mps (default: 1)"
+    )
+    arg_parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=3,
+        help="Attempts per recipient on throttling or server errors (default: 3)"
+    )
+    arg_parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Tune the number of concurrent sends automatically, up to --max-workers"
+    )
+    arg_parser.add_argument(
+        "--journal",
+        type=Path,
+        help="Record outcomes to this file and skip numbers it shows as already scheduled"
+    )
+    arg_parser.add_argument(
+        "--results",
+        type=Path,
+        help="Write per-recipient results to this .jsonl, .csv or .db file as they complete"
+    )
+    arg_parser.add_argument(
+        "--fast-transport",
+        action="store_true",
+        help="Create messages over a lean pooled HTTP client instead of the Twilio SDK"
+    )
+    arg_parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Use HTTP/2 with --fast-transport (requires httpx[http2])"
+    )
+    arg_parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Split recipients across this many worker processes, each with "
+             "--max-workers threads and an equal share of --mps (default: 1)"
+    )
+    arg_parser.add_argument(
+        "--queue",
+        type=Path,
+        help="Add the numbers to this shared SQLite work queue and send from it; run the "
+             "same command on several machines to drain one campaign together"
+    )
+    arg_parser.add_argument(
+        "--idempotency",
+        type=Path,
+        help="SQLite index of idempotency keys; a number already scheduled for this "
+             "message and time is never scheduled again, even across retries and reruns"
+    )
+    arg_parser.add_argument(
+        "--suppression",
+        type=Path,
+        help="Opt-out suppression list (see suppression.py); numbers on it are skipped"
+    )
+    arg_parser.add_argument(
+        "--history",
+        type=Path,
+        help="Directory of daily Bloom filters of numbers messaged; numbers messaged "
+             "within --history-days, by any campaign, are skipped"
+    )
+    arg_parser.add_argument(
+        "--history-days",
+        type=int,
+        default=7,
+        help="Days a number stays in --history before it can be messaged again (default: 7)"
+    )
+    arg_parser.add_argument(
+        "--local-time",
+        action="store_true",
+        help="Send at the scheduled time in each recipient's timezone, looked up by "
+             "US and Canadian area code (others use America/New_York)"
+    )
+    arg_parser.add_argument(
+        "--spread",
+        type=float,
+        metavar="MINUTES",
+        help="Spread the scheduled times over this many minutes from the send time "
+             "at --spread-rate, instead of scheduling every message for one instant"
+    )
+    arg_parser.add_argument(
+        "--spread-rate",
+        type=float,
+        help="Messages per second Twilio releases with --spread"
     )
     args = arg_parser.parse_args()
+    if args.http2 and not args.fast_transport:
+        arg_parser.error("--http2 requires --fast-transport")
+    if args.processes > 1 and (args.journal or args.adaptive or args.queue or args.history):
+        arg_parser.error(
+            "--journal, --adaptive, --queue and --history are not supported with --processes"
+        )
+    if (args.spread is None) != (args.spread_rate is None):
+        arg_parser.error("--spread and --spread-rate must be given together")
+    if args.spread is not None and min(args.spread, args.spread_rate) <= 0:
+        arg_parser.error("--spread and --spread-rate must be positive")
+    if args.spread is not None and (args.queue or args.local_time):
+        arg_parser.error("--spread is not supported with --queue or --local-time")
+    if args.local_time and (args.processes > 1 or args.queue):
+        arg_parser.error("--local-time is not supported with --processes or --queue")
+    if not args.default_country.isdigit() or args.default_country.startswith("0"):
+        arg_parser.error(f"--default-country must be a calling code, got {args.default_country}")
 
-    # List of phone numbers to send to
+    def unique_recipients() -> Iterator[str]:
+        """Stream the numbers file normalized to E.164, without duplicates."""
+        return dedupe_phone_numbers(
+            normalize_phone_stream(read_phone_numbers(args.phone_numbers), args.default_country)
+        )
+
+    # Count unique numbers up front; the file is streamed again when sending so
+    # the list is never held in memory
     try:
-        numbers_text = args.phone_numbers.read_text()
+        unique_count = sum(1 for _ in unique_recipients())
     except FileNotFoundError as exc:
         print(f"Phone numbers file not found: {args.phone_numbers}")
         raise SystemExit(1) from exc
@@ -139,24 +863,129 @@ if __name__ == "__main__":
         print(f"Could not read phone numbers file {args.phone_numbers}: {e}")
         raise SystemExit(1) from e
 
-    phone_numbers = [line.strip() for line in numbers_text.splitlines() if line.strip()]
-    phone_numbers = list(set(phone_numbers))  # Remove duplicates if any
-    print(f"Loaded {len(phone_numbers)} unique phone numbers.")
+    print(f"Loaded {unique_count} unique phone numbers.")
     input("Press Enter to continue..., or Ctrl+C to abort.")
 
     # Schedule message 6 minutes from now
     #scheduled_time = datetime.now() + timedelta(minutes=6)
     scheduled_time = datetime(2026, 1, 30, 10, 0, 0)  # Example fixed time
-    print(f"Scheduling message to be sent at {scheduled_time} local time.")
-    print(f"Sending to {len(phone_numbers)} recipients...\n")
+    print(f"Scheduling message to be sent at {scheduled_time} "
+          f"{'recipient' if args.local_time else 'America/New_York'} local time.")
+    print(f"Sending to {unique_count} recipients...\n")
 
-    sender = SMSSender()
-    results = sender.send_bulk(
-        recipients=phone_numbers,
-        body="Hello! This is a scheduled message. Text STOP to unsubscribe",
-        send_at=scheduled_time,
+    sender = SMSSender(
+        rate_limiter=TokenBucket(args.mps, args.burst) if args.mps else None,
+        retry_policy=RetryPolicy(max_attempts=args.max_attempts),
+        fast_transport=args.fast_transport,
+        # One connection per concurrent send, kept open for the whole run
+        http_pool=HttpPoolConfig(pool_size=max(1, args.max_workers), http2=args.http2),
+        idempotency=IdempotencyIndex(args.idempotency) if args.idempotency else None,
+        suppression=SuppressionList(args.suppression) if args.suppression else None,
+        contact_history=(
+            ContactHistory(args.history, args.history_days) if args.history else None
+        ),
     )
+    send_window = SendWindow(args.spread * 60, args.spread_rate) if args.spread else None
+    if args.results is None:
+        # Per-recipient results are only summarized, so do not keep them in memory
+        result_sink = CallbackSink(lambda _result: None)
+    elif args.results.suffix == ".csv":
+        result_sink = CsvSink(args.results)
+    elif args.results.suffix == ".db":
+        result_sink = SqliteSink(args.results)
+    else:
+        result_sink = JsonlSink(args.results)
+
+    with SendJournal(args.journal) if args.journal else nullcontext() as send_journal:
+        if send_journal is not None and len(send_journal.completed):
+            print(f"Resuming: {len(send_journal.completed)} numbers already scheduled.\n")
+        try:
+            if args.queue:
+                with SqliteWorkQueue(args.queue) as work_queue:
+                    added = work_queue.add(unique_recipients())
+                    print(f"Queued {added} new numbers; {work_queue.remaining()} left to send.")
+                    queue_drain = QueueDrain(work_queue, sink=result_sink)
+                    run_stats = send_from_queue(
+                        sender,
+                        queue_drain,
+                        body="Hello! This is a scheduled message. Text STOP to unsubscribe",
+                        send_at=scheduled_time,
+                        max_workers=args.max_workers,
+                        concurrency=(
+                            AdaptiveConcurrency(
+                                initial=min(4, args.max_workers), maximum=args.max_workers
+                            )
+                            if args.adaptive else None
+                        ),
+                        journal=send_journal,
+                        progress=ProgressReporter(),
+                    )
+                    queue_drain.close()
+                    if queue_drain.released:
+                        print(f"{queue_drain.released} numbers were left to other workers after "
+                              "their leases were lost.")
+                    if queue_drain.lost_leases:
+                        print(f"Warning: {queue_drain.lost_leases} leases expired before their "
+                              "results were recorded; those numbers may have been sent twice.")
+            elif args.processes > 1:
+                print(f"Sending from {args.processes} processes; results are merged at the end.")
+                run_stats = send_bulk_sharded(
+                    sender,
+                    unique_recipients(),
+                    body="Hello! This is a scheduled message. Text STOP to unsubscribe",
+                    send_at=scheduled_time,
+                    processes=args.processes,
+                    max_workers=args.max_workers,
+                    sink=result_sink,
+                    window=send_window,
+                )
+            else:
+                send_all = sender.send_bulk
+                if args.local_time:
+                    send_all = partial(send_bulk_local_time, sender)
+                run_stats = send_all(
+                    unique_recipients(),
+                    body="Hello! This is a scheduled message. Text STOP to unsubscribe",
+                    send_at=scheduled_time,
+                    max_workers=args.max_workers,
+                    concurrency=(
+                        AdaptiveConcurrency(
+                            initial=min(4, args.max_workers), maximum=args.max_workers
+                        )
+                        if args.adaptive else None
+                    ),
+                    journal=send_journal,
+                    sink=result_sink,
+                    window=send_window,
+                    progress=ProgressReporter(total=unique_count),
+                )
+        finally:
+            result_sink.close()
 
     # Summary
-    successful = sum(1 for r in results if r["success"])
-    print(f"\nComplete: {successful}/{len(phone_numbers)} messages scheduled")
+    successful = (
+        run_stats.succeeded + run_stats.skipped - run_stats.opted_out - run_stats.recently_messaged
+    )
+    print(f"\nComplete: {successful}/{run_stats.total if args.queue else unique_count} "
+          "messages scheduled")
+    if run_stats.opted_out:
+        print(f"Skipped {run_stats.opted_out} numbers on the suppression list")
+    if run_stats.recently_messaged:
+        print(f"Skipped {run_stats.recently_messaged} numbers messaged in the last "
+              f"{args.history_days} days")
+    if run_stats.spread_overflow:
+        print(f"Warning: {run_stats.spread_overflow} messages did not fit in the --spread "
+              "window at --spread-rate and were scheduled after it ends")
+    if sender.contact_history is not None:
+        sender.contact_history.close()
+    if run_stats.concurrency_limit is not None:
+        print(f"Final concurrency limit: {run_stats.concurrency_limit}")
+    if sender.idempotency is not None and (unknown := len(sender.idempotency.pending())):
+        print(f"{unknown} numbers have an unknown outcome; check Twilio before releasing "
+              f"their keys in {args.idempotency}")
+    connections = sender.connection_stats()
+    if connections.requests:
+        print(
+            f"Connections: {connections.new_connections} opened, "
+            f"{connections.reused} requests reused one"
+        )
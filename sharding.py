@@ -0,0 +1,270 @@
+"""
+Partition a recipient stream across worker processes and merge their results.
+"""
+
+import json
+import multiprocessing
+import queue
+import tempfile
+import time
+import zlib
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from flow_control import SendWindow, TokenBucket
+from idempotency import IdempotencyIndex
+from progress import BulkStats
+from scheduling import ScheduleSpec
+from sinks import ResultSink
+from suppression import SuppressionList
+
+# Only for annotations; send_sms imports this module for its CLI
+if TYPE_CHECKING:
+    from send_sms import SMSSender
+
+# Highest number of processes; shard numbers are stored one byte per recipient
+MAX_PROCESSES = 255
+
+# Worker entry point: reads chunks of recipients from the queue until None, and
+# writes one JSON result line per recipient to the path, in the order received
+ShardWorker = Callable[[multiprocessing.Queue, Path, dict], None]
+
+
+def shard_of(phone: str, processes: int) -> int:
+    """Return the shard a phone number belongs to, stable across runs and processes."""
+    return zlib.crc32(phone.encode()) % processes
+
+
+def run_sharded(
+    recipients: Iterable[str],
+    processes: int,
+    worker: ShardWorker,
+    job: dict,
+    *,
+    chunk_size: int = 1000,
+) -> Iterator[dict]:
+    """
+    Run worker over recipients split by hash into processes shards.
+
+    Each shard gets its own process, fed chunks of recipients through a bounded
+    queue so the input is never buffered as a whole. Workers write results to
+    shard files; once all have finished, the results are yielded back in
+    recipient order.
+
+    Args:
+        recipients: Recipient phone numbers; any iterable, consumed lazily
+        processes: Number of worker processes
+        worker: Top-level function run in each process (see ShardWorker)
+        job: Picklable arguments passed to every worker
+        chunk_size: Recipients handed to a worker at a time (default: 1000)
+
+    Raises:
+        RuntimeError: If a worker process exits with an error
+    """
+    if not 1 <= processes <= MAX_PROCESSES:
+        raise ValueError(f"processes must be between 1 and {MAX_PROCESSES}, got {processes}")
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="send_sms_shards_") as temp_dir:
+        paths = [Path(temp_dir) / f"shard{shard}.jsonl" for shard in range(processes)]
+        # A few chunks of backlog per worker keeps it busy without buffering the input
+        work = [context.Queue(maxsize=4) for _ in range(processes)]
+        workers = [
+            context.Process(
+                target=worker, args=(work[shard], paths[shard], job), name=f"shard{shard}"
+            )
+            for shard in range(processes)
+        ]
+        for process in workers:
+            process.start()
+
+        try:
+            order = _distribute(recipients, work, workers, chunk_size)
+            for process in workers:
+                process.join()
+        finally:
+            for process in workers:
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+
+        failed = [process.name for process in workers if process.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"Worker processes failed: {', '.join(failed)}")
+
+        yield from _merge(paths, order)
+
+
+def _merge(paths: list[Path], order: array) -> Iterator[dict]:
+    """Read shard results back in recipient order."""
+    shard_files = [path.open(encoding="utf-8") for path in paths]
+    try:
+        for shard in order:
+            yield json.loads(shard_files[shard].readline())
+    finally:
+        for shard_file in shard_files:
+            shard_file.close()
+
+
+def _distribute(
+    recipients: Iterable[str],
+    work: list[multiprocessing.Queue],
+    workers: list,
+    chunk_size: int,
+) -> array:
+    """Queue recipients to their shards in chunks; return each one's shard in input order."""
+    processes = len(work)
+    order = array("B")
+    chunks: list[list[str]] = [[] for _ in range(processes)]
+    for phone in recipients:
+        shard = shard_of(phone, processes)
+        order.append(shard)
+        chunks[shard].append(phone)
+        if len(chunks[shard]) >= chunk_size:
+            _put(work[shard], chunks[shard], workers[shard])
+            chunks[shard] = []
+    for shard in range(processes):
+        if chunks[shard]:
+            _put(work[shard], chunks[shard], workers[shard])
+        _put(work[shard], None, workers[shard])
+    return order
+
+
+def _put(work: multiprocessing.Queue, item: list[str] | None, process) -> None:
+    """Queue work for a worker, failing instead of blocking forever if it died."""
+    while True:
+        try:
+            work.put(item, timeout=1.0)
+            return
+        except queue.Full as e:
+            if not process.is_alive():
+                raise RuntimeError(
+                    f"Worker {process.name} exited with code {process.exitcode}"
+                ) from e
+
+
+def send_bulk_sharded(  # pylint: disable=too-many-arguments,too-many-locals
+    sender: "SMSSender",
+    recipients: Iterable[str],
+    body: str,
+    send_at: datetime | ScheduleSpec,
+    timezone: str = "America/New_York",
+    *,
+    processes: int,
+    max_workers: int = 1,
+    sink: ResultSink | None = None,
+    chunk_size: int = 1000,
+    window: SendWindow | None = None,
+) -> list[dict] | BulkStats:
+    """
+    Send scheduled SMS to multiple phone numbers from several processes.
+
+    For campaigns where one process is CPU bound. Recipients are partitioned
+    by a hash of the number into one shard per process. Each worker builds its
+    own sender and Twilio client with sender's settings, takes an equal share
+    of its rate limiter's rate and burst, and runs send_bulk over
+    its shard with max_workers threads. Results are merged back into
+    recipient order once all workers have finished. A contact history is not
+    supported, since its files take one writer at a time.
+
+    Args:
+        sender: Sender whose settings the workers' senders are built with
+        recipients: Recipient phone numbers (E.164 format); any iterable,
+            consumed lazily so generators are not materialized
+        body: Message content
+        send_at: Local datetime to send the messages, or a ScheduleSpec
+        timezone: Timezone for send_at (default: America/New_York); ignored
+            for a ScheduleSpec
+        processes: Number of worker processes
+        max_workers: Threads sending concurrently in each worker (default: 1)
+        sink: Optional destination each result is written to in recipient
+            order, instead of being collected in memory. The caller closes it.
+        chunk_size: Recipients handed to a worker at a time (default: 1000)
+        window: Optional window the send times are spread over, as in
+            send_bulk; each worker spreads its shard at an equal share of
+            the window's rate
+
+    Returns:
+        List of dicts with send results for each number, in recipient order,
+        or only the run's BulkStats when a sink is given. The stats are also
+        left in sender's last_run_stats.
+
+    Raises:
+        ValueError: If the sender has a contact history, or the window would
+            end too far ahead
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+    if sender.contact_history is not None:
+        raise ValueError("send_bulk_sharded does not support a contact history")
+    spec = ScheduleSpec.of(send_at, timezone)
+    if window is not None:
+        window.check(spec.timestamp())
+
+    stats = BulkStats()
+    started = time.monotonic()
+    rate_limiter = sender.rate_limiter
+    job = {
+        # Workers build a sender of the same class with these settings
+        "sender_class": type(sender),
+        "sender": {
+            "config_path": sender.config_path,
+            "retry_policy": sender.retry_policy,
+            "api_base_url": sender.api_base_url,
+            "fast_transport": sender.transport is not None,
+            "http_pool": sender.http_pool,
+        },
+        # Each worker opens the index itself; connections cannot be pickled
+        "idempotency_path": sender.idempotency.path if sender.idempotency is not None else None,
+        "suppression_path": sender.suppression.path if sender.suppression is not None else None,
+        "rate_limit": (
+            (rate_limiter.rate / processes, max(1, rate_limiter.burst // processes))
+            if rate_limiter is not None else None
+        ),
+        "window": (window.duration, window.rate / processes) if window is not None else None,
+        "body": body,
+        "send_at": spec,
+        "timezone": timezone,
+        "max_workers": max_workers,
+    }
+
+    message_results: list[dict] = []
+    for result in run_sharded(recipients, processes, _send_shard, job, chunk_size=chunk_size):
+        stats.record(result)
+        if sink is not None:
+            sink.write(result)
+        else:
+            message_results.append(result)
+
+    stats.elapsed = time.monotonic() - started
+    sender.last_run_stats = stats
+    return stats if sink is not None else message_results
+
+
+def _send_shard(work: multiprocessing.Queue, path: Path, job: dict) -> None:
+    """send_bulk_sharded worker: send each chunk of a shard, appending results in order."""
+    rate_limit = job["rate_limit"]
+    idempotency_path = job["idempotency_path"]
+    suppression_path = job["suppression_path"]
+    # One window for all chunks, so each continues the shard's spread
+    window = SendWindow(*job["window"]) if job["window"] is not None else None
+    shard_sender = job["sender_class"](
+        rate_limiter=TokenBucket(*rate_limit) if rate_limit is not None else None,
+        idempotency=IdempotencyIndex(idempotency_path) if idempotency_path else None,
+        suppression=SuppressionList(suppression_path) if suppression_path else None,
+        **job["sender"],
+    )
+    with path.open("w", encoding="utf-8") as shard_file:
+        while (chunk := work.get()) is not None:
+            results = shard_sender.send_bulk(
+                chunk,
+                job["body"],
+                job["send_at"],
+                job["timezone"],
+                max_workers=min(job["max_workers"], len(chunk)),
+                window=window,
+            )
+            shard_file.writelines(json.dumps(result) + "\n" for result in results)
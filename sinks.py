@@ -0,0 +1,121 @@
+"""
+Destinations that send_bulk results are streamed to as they complete.
+"""
+
+import csv
+import json
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol
+
+# Columns written by tabular sinks, covering every key a bulk result can have
+RESULT_FIELDS = (
+    "phone", "success", "sid", "status", "error", "attempts", "http_status", "skipped",
+    "past_window",
+)
+
+
+class ResultSink(Protocol):
+    """Receives send_bulk results one at a time, in completion order."""
+
+    def write(self, result: dict) -> None:
+        """Store one recipient's result."""
+
+    def close(self) -> None:
+        """Flush anything buffered and release resources."""
+
+
+class JsonlSink:
+    """Write each result as one JSON line."""
+
+    def __init__(self, path: Path):
+        self._file = path.open("w", encoding="utf-8")
+
+    def write(self, result: dict) -> None:
+        """Append the result as a JSON line."""
+        self._file.write(json.dumps(result) + "\n")
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class CsvSink:
+    """Write results as CSV rows with a header of RESULT_FIELDS."""
+
+    def __init__(self, path: Path):
+        self._file = path.open("w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, RESULT_FIELDS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, result: dict) -> None:
+        """Append the result as a CSV row."""
+        self._writer.writerow(result)
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class SqliteSink:
+    """Insert results into a SQLite table, committing in batches."""
+
+    def __init__(self, path: Path, table: str = "results", batch_size: int = 1000):
+        """
+        Open the database and create the table if needed.
+
+        Args:
+            path: SQLite database file
+            table: Table to insert into (default: results)
+            batch_size: Rows per transaction (default: 1000)
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "phone TEXT, success INTEGER, sid TEXT, status TEXT, error TEXT, "
+            "attempts INTEGER, http_status INTEGER, skipped TEXT, past_window INTEGER)"
+        )
+        # Tables written before past_window was a result key lack its column
+        columns = {row[1] for row in self._connection.execute(f"PRAGMA table_info({table})")}
+        if "past_window" not in columns:
+            with self._connection:
+                self._connection.execute(f"ALTER TABLE {table} ADD COLUMN past_window INTEGER")
+        self._insert = (
+            f"INSERT INTO {table} ({', '.join(RESULT_FIELDS)}) "
+            f"VALUES ({', '.join('?' * len(RESULT_FIELDS))})"
+        )
+        self._batch: list[tuple] = []
+        self.batch_size = batch_size
+
+    def write(self, result: dict) -> None:
+        """Queue the result, committing when a batch is full."""
+        self._batch.append(tuple(result.get(key) for key in RESULT_FIELDS))
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        with self._connection:
+            self._connection.executemany(self._insert, self._batch)
+        self._batch.clear()
+
+    def close(self) -> None:
+        """Commit remaining rows and close the database."""
+        self._flush()
+        self._connection.close()
+
+
+class CallbackSink:
+    """Pass each result to a function."""
+
+    def __init__(self, callback: Callable[[dict], None]):
+        self._callback = callback
+
+    def write(self, result: dict) -> None:
+        """Call the callback with the result."""
+        self._callback(result)
+
+    def close(self) -> None:
+        """Nothing to release."""
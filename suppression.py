@@ -0,0 +1,219 @@
+"""
+Opt-out suppression list, checked before sending so opted-out numbers are skipped.
+
+Build or extend one from text files of numbers:
+
+    python suppression.py opt-outs.bin --add stop_replies.txt --compact
+"""
+
+import argparse
+import heapq
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from phone_numbers import PhoneSet, dedupe_phone_numbers, e164_to_int, normalize_phone_stream
+
+# Header: magic, then the number of sorted values that follow it
+_HEADER = struct.Struct("<8sQ")
+_MAGIC = b"SMSSUP1\0"
+_VALUE_SIZE = array("Q").itemsize
+
+
+class SuppressionList:  # pylint: disable=too-many-instance-attributes
+    """
+    Set of opted-out E.164 numbers in one file.
+
+    The file holds a header, a sorted run of numbers packed as 64-bit integers
+    (native byte order) and an unsorted tail of numbers added since the last
+    compact(). The sorted run is memory-mapped and searched by bisection, so
+    opening even a multi-million entry list costs almost no memory or time;
+    the tail is appended to on every add() and kept in a PhoneSet. compact()
+    merges the tail into the sorted run.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) a suppression list.
+
+        Args:
+            path: Suppression list file
+        """
+        self.path = path
+        if not path.exists() or path.stat().st_size == 0:
+            path.write_bytes(_HEADER.pack(_MAGIC, 0))
+        self._lock = threading.Lock()
+        self._file = path.open("r+b")
+        self._map: mmap.mmap | None = None
+        self._sorted: memoryview | array = array("Q")
+        self._added = PhoneSet()
+        self._load()
+
+    def _load(self) -> None:
+        """Map the sorted run and read the tail into memory."""
+        self._file.seek(0)
+        header = self._file.read(_HEADER.size)
+        if len(header) < _HEADER.size or not header.startswith(_MAGIC):
+            self._file.close()
+            raise ValueError(f"Not a suppression list: {self.path}")
+        _, sorted_count = _HEADER.unpack(header)
+        sorted_end = _HEADER.size + sorted_count * _VALUE_SIZE
+        if sorted_count:
+            self._map = mmap.mmap(self._file.fileno(), sorted_end, access=mmap.ACCESS_READ)
+            self._sorted = memoryview(self._map)[_HEADER.size:].cast("Q")
+
+        self._file.seek(sorted_end)
+        tail = self._file.read()
+        # An add() interrupted mid-write can leave a partial last value
+        whole = len(tail) - len(tail) % _VALUE_SIZE
+        for value in array("Q", tail[:whole]):
+            self._added.add(value)
+        self._file.seek(sorted_end + whole)
+        self._file.truncate()
+
+    def __contains__(self, phone: str) -> bool:
+        """Return True if phone has opted out; O(log n) in the sorted run."""
+        value = e164_to_int(phone)
+        if value is None:
+            return False
+        with self._lock:
+            index = bisect_left(self._sorted, value)
+            if index < len(self._sorted) and self._sorted[index] == value:
+                return True
+            return len(self._added) > 0 and value in self._added
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sorted) + len(self._added)
+
+    def add(self, phone: str) -> bool:
+        """
+        Suppress one number, persisting it at once.
+
+        Returns True if it was not already suppressed.
+        """
+        return self.update([phone]) == 1
+
+    def update(self, phones: Iterable[str]) -> int:
+        """
+        Suppress numbers, appending the new ones to the file's tail.
+
+        Numbers that are not E.164 are ignored. Returns how many were new.
+        """
+        added = 0
+        with self._lock:
+            new_values = array("Q")
+            for phone in phones:
+                value = e164_to_int(phone)
+                if value is None or self._in_sorted(value) or not self._added.add(value):
+                    continue
+                new_values.append(value)
+                if len(new_values) >= 65536:
+                    added += self._append(new_values)
+            added += self._append(new_values)
+        return added
+
+    def _in_sorted(self, value: int) -> bool:
+        index = bisect_left(self._sorted, value)
+        return index < len(self._sorted) and self._sorted[index] == value
+
+    def _append(self, values: array) -> int:
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(values.tobytes())
+        self._file.flush()
+        count = len(values)
+        del values[:]
+        return count
+
+    def filter(self, phones: Iterable[str]) -> Iterator[str]:
+        """Yield the numbers that have not opted out, preserving order."""
+        for phone in phones:
+            if phone not in self:
+                yield phone
+
+    def compact(self) -> None:
+        """
+        Merge the tail into the sorted run.
+
+        The merged file is written next to the original and swapped in with an
+        atomic rename, so a crash leaves either the old or the new list.
+        """
+        with self._lock:
+            merged = array("Q")
+            for value in heapq.merge(self._sorted, sorted(self._added)):
+                if not merged or merged[-1] != value:
+                    merged.append(value)
+            temp_path = self.path.with_name(self.path.name + ".tmp")
+            with temp_path.open("wb") as temp_file:
+                temp_file.write(_HEADER.pack(_MAGIC, len(merged)))
+                merged.tofile(temp_file)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            del merged
+            self._release()
+            os.replace(temp_path, self.path)
+            self._file = self.path.open("r+b")
+            self._added = PhoneSet()
+            self._load()
+
+    def _release(self) -> None:
+        """Unmap the sorted run and close the file."""
+        if isinstance(self._sorted, memoryview):
+            self._sorted.release()
+        self._sorted = array("Q")
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def close(self) -> None:
+        """Unmap and close the file; additions are already on disk."""
+        with self._lock:
+            if not self._file.closed:
+                self._release()
+
+    def __enter__(self) -> "SuppressionList":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Manage an opt-out suppression list")
+    arg_parser.add_argument("path", type=Path, help="Suppression list file (created if missing)")
+    arg_parser.add_argument(
+        "--add",
+        type=Path,
+        action="append",
+        default=[],
+        help="Text file of opted-out numbers, one per line; may be repeated"
+    )
+    arg_parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Merge recent additions into the sorted run afterwards"
+    )
+    arg_parser.add_argument(
+        "--default-country",
+        default="1",
+        help="Calling code added to national numbers in the --add files (default: 1)"
+    )
+    args = arg_parser.parse_args()
+
+    with SuppressionList(args.path) as suppression_list:
+        for numbers_path in args.add:
+            with numbers_path.open(encoding="utf-8") as numbers_file:
+                new = suppression_list.update(dedupe_phone_numbers(normalize_phone_stream(
+                    (line.strip() for line in numbers_file if line.strip()),
+                    args.default_country,
+                )))
+            print(f"Added {new} numbers from {numbers_path}")
+        if args.compact:
+            suppression_list.compact()
+        print(f"{len(suppression_list)} numbers suppressed")
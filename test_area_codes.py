@@ -0,0 +1,37 @@
+"""
+Unit tests for area_codes.py module.
+"""
+
+import unittest
+from zoneinfo import ZoneInfo
+
+from area_codes import AREA_CODE_TIMEZONES, area_code_timezone
+
+
+class TestAreaCodeTimezone(unittest.TestCase):
+    """Test the area code timezone table."""
+
+    def test_known_area_codes(self):
+        """Test that numbers map to the timezone of their area code."""
+        self.assertEqual(area_code_timezone("+12125550001"), "America/New_York")
+        self.assertEqual(area_code_timezone("+13125550001"), "America/Chicago")
+        self.assertEqual(area_code_timezone("+16025550001"), "America/Phoenix")
+        self.assertEqual(area_code_timezone("+14155550001"), "America/Los_Angeles")
+        self.assertEqual(area_code_timezone("+18085550001"), "Pacific/Honolulu")
+        self.assertEqual(area_code_timezone("+16045550001"), "America/Vancouver")
+
+    def test_unknown_numbers(self):
+        """Test that other countries, unassigned area codes and bad input give None."""
+        self.assertIsNone(area_code_timezone("+442071234567"))
+        self.assertIsNone(area_code_timezone("+15555550001"))
+        self.assertIsNone(area_code_timezone("+1212555000"))
+        self.assertIsNone(area_code_timezone("2125550001"))
+
+    def test_every_timezone_exists(self):
+        """Test that the table only names timezones the tz database knows."""
+        for zone in set(AREA_CODE_TIMEZONES.values()):
+            ZoneInfo(zone)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+Unit tests for bench_send_sms.py module.
+"""
+
+import unittest
+
+from bench_send_sms import Scenario, compare, run_scenario
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test benchmark scenarios and comparison."""
+
+    def test_run_scenario_reports_metrics(self):
+        """Test that both modes report throughput, latency and resource use."""
+        for mode in ("send", "send_bulk"):
+            with self.subTest(mode=mode):
+                result = run_scenario(Scenario(mode=mode, size=200, max_workers=2))
+                self.assertEqual(result["scenario"], f"{mode}/mock/n=200/workers=2")
+                self.assertEqual(result["failed"], 0)
+                self.assertGreater(result["msgs_per_sec"], 0)
+                for key in ("p50_ms", "p95_ms", "p99_ms", "cpu_s", "peak_rss_mb"):
+                    self.assertIsNotNone(result[key])
+
+    def test_run_scenario_local_transport(self):
+        """Test a scenario over HTTP to the fake API."""
+        result = run_scenario(Scenario(mode="send_bulk", size=20, transport="local", max_workers=4))
+        self.assertEqual(result["failed"], 0)
+
+    def test_compare_flags_regressions(self):
+        """Test that slower throughput and higher latency are flagged."""
+        baseline = [{"scenario": "s", "msgs_per_sec": 1000.0, "p50_ms": 1.0, "cpu_s": 2.0}]
+        current = [{"scenario": "s", "msgs_per_sec": 800.0, "p50_ms": 0.5, "cpu_s": 2.1}]
+
+        lines = compare(current, baseline)
+
+        self.assertIn("s msgs_per_sec: 1000.0 -> 800.0 (-20.0%)  REGRESSION", lines)
+        self.assertIn("s p50_ms: 1.0 -> 0.5 (-50.0%)", lines)
+        self.assertIn("s cpu_s: 2.0 -> 2.1 (+5.0%)", lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
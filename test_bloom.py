@@ -0,0 +1,201 @@
+"""
+Unit tests for bloom.py module.
+"""
+
+import json
+import unittest
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from bloom import BloomFilter, ContactHistory
+from fake_twilio import FakeTwilioServer
+from progress import RECENTLY_MESSAGED
+from send_sms import SMSSender
+from sharding import send_bulk_sharded
+
+DAY = 86400
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Test the memory-mapped Bloom filter."""
+
+    def setUp(self):
+        """Use a temporary directory for filter files."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.directory = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        """Remove the filter files."""
+        self.temp_dir.cleanup()
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        """Test that every added number is found and strangers rarely are."""
+        added = [f"+1202{i:07d}" for i in range(5000)]
+        with BloomFilter(self.directory / "f.bloom", 5000, 0.01) as bloom_filter:
+            for phone in added:
+                bloom_filter.add(phone)
+            self.assertTrue(all(phone in bloom_filter for phone in added))
+            false_positives = sum(f"+1303{i:07d}" in bloom_filter for i in range(20000))
+        self.assertLess(false_positives / 20000, 0.02)
+
+    def test_reopen_and_merge(self):
+        """Test that filters persist, keep their sizing and merge by union."""
+        with BloomFilter(self.directory / "a.bloom", 1000, 0.001) as first:
+            first.add("+12025550001")
+        with BloomFilter(self.directory / "b.bloom", 1000, 0.001) as second:
+            second.add("+12025550002")
+
+        with BloomFilter(self.directory / "a.bloom", 10, 0.5) as first, \
+                BloomFilter(self.directory / "b.bloom") as second:
+            self.assertEqual(
+                (first.num_bits, first.num_hashes), BloomFilter.sizing(1000, 0.001)
+            )
+            self.assertEqual(first.count, 1)
+            self.assertNotIn("+12025550002", first)
+            first.merge(second)
+            self.assertIn("+12025550001", first)
+            self.assertIn("+12025550002", first)
+
+        with BloomFilter(self.directory / "a.bloom") as first, \
+                BloomFilter(self.directory / "c.bloom", 10, 0.1) as other_sizing:
+            self.assertIn("+12025550002", first)
+            with self.assertRaises(ValueError):
+                first.merge(other_sizing)
+
+    def test_read_only(self):
+        """Test that a read-only filter can be queried but never writes its file."""
+        path = self.directory / "a.bloom"
+        with BloomFilter(path, 1000, 0.001) as bloom_filter:
+            bloom_filter.add("+12025550001")
+        contents = path.read_bytes()
+
+        with BloomFilter(path, read_only=True) as bloom_filter:
+            self.assertIn("+12025550001", bloom_filter)
+            with self.assertRaises(TypeError):
+                bloom_filter.add("+12025550002")
+            bloom_filter.count += 1
+        self.assertEqual(path.read_bytes(), contents)
+        with self.assertRaises(FileNotFoundError):
+            BloomFilter(self.directory / "missing.bloom", read_only=True)
+        self.assertFalse((self.directory / "missing.bloom").exists())
+
+    def test_rejects_other_files(self):
+        """Test that a file that is not a filter is refused."""
+        (self.directory / "x.bloom").write_bytes(b"not a filter")
+        with self.assertRaises(ValueError):
+            BloomFilter(self.directory / "x.bloom")
+
+
+class TestContactHistory(unittest.TestCase):
+    """Test the time-bucketed history of messaged numbers."""
+
+    def setUp(self):
+        """Start a fake clock at noon UTC."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.directory = Path(self.temp_dir.name)
+        self.now = datetime(2030, 1, 10, 12, 0, 0).timestamp()
+
+    def tearDown(self):
+        """Remove the history."""
+        self.temp_dir.cleanup()
+
+    def history(self, name: str = "history", **kwargs) -> ContactHistory:
+        """Open a 3-day history on the fake clock."""
+        return ContactHistory(
+            self.directory / name, 3, daily_capacity=1000, clock=lambda: self.now, **kwargs
+        )
+
+    def test_numbers_expire_after_window(self):
+        """Test that a number counts as recent for window_days, then its filter is dropped."""
+        with self.history() as history:
+            history.record("+12025550001")
+            self.assertTrue(history.recently_messaged("+12025550001"))
+            self.assertFalse(history.recently_messaged("+12025550002"))
+            self.now += 2 * DAY
+            self.assertTrue(history.recently_messaged("+12025550001"))
+            self.now += DAY
+            self.assertFalse(history.recently_messaged("+12025550001"))
+        self.assertEqual(list((self.directory / "history").glob("*.bloom")), [])
+
+    def test_exact_check_confirms_probable_hits(self):
+        """Test that the exact check is only consulted for probable hits."""
+        checked = []
+
+        def exact(phone: str, since: float) -> bool:
+            checked.append((phone, since))
+            return False
+
+        with self.history(exact=exact) as history:
+            history.record("+12025550001")
+            self.assertFalse(history.recently_messaged("+12025550001"))
+            self.assertFalse(history.recently_messaged("+12025550002"))
+        self.assertEqual(checked, [("+12025550001", self.now - 3 * DAY)])
+
+    def test_merge_other_node(self):
+        """Test that another node's days are folded in."""
+        with self.history("node-b") as other:
+            other.record("+12025550002")
+        with self.history() as history:
+            history.merge(self.directory / "node-b")
+            self.assertTrue(history.recently_messaged("+12025550002"))
+
+    def test_merge_leaves_other_node_untouched(self):
+        """Test that merging opens the other node's filters without writing them."""
+        with self.history("node-b") as other:
+            other.record("+12025550002")
+        other_files = {
+            path: (path.read_bytes(), path.stat().st_mtime_ns)
+            for path in (self.directory / "node-b").glob("*.bloom")
+        }
+        self.assertTrue(other_files)
+
+        with self.history() as history:
+            history.merge(self.directory / "node-b")
+            self.assertTrue(history.recently_messaged("+12025550002"))
+
+        for path, (contents, mtime) in other_files.items():
+            self.assertEqual((path.read_bytes(), path.stat().st_mtime_ns), (contents, mtime))
+
+
+class TestFrequencyCappedSending(unittest.TestCase):
+    """Test that bulk sends skip and record recently messaged numbers."""
+
+    def setUp(self):
+        """Write a config and open a history."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.config_path = Path(self.temp_dir.name) / "config.json"
+        self.config_path.write_text(json.dumps({
+            "account_sid": "ACcap", "auth_token": "cap", "messaging_service_sid": "MGcap",
+        }))
+        self.contact_history = ContactHistory(Path(self.temp_dir.name) / "history", 7)
+
+    def tearDown(self):
+        """Close the history and remove temporary files."""
+        self.contact_history.close()
+        self.temp_dir.cleanup()
+
+    def test_second_campaign_skips_numbers_messaged_by_first(self):
+        """Test that a number is only messaged once across campaigns in the window."""
+        with FakeTwilioServer() as server:
+            sender = SMSSender(
+                config_path=self.config_path,
+                api_base_url=server.url,
+                contact_history=self.contact_history,
+            )
+            sender.send_bulk(["+12025550001", "+12025550002"], "First", datetime(2030, 1, 1, 10))
+            results = sender.send_bulk(
+                ["+12025550002", "+12025550003"], "Second", datetime(2030, 1, 2, 10), max_workers=2
+            )
+            with self.assertRaises(ValueError):
+                send_bulk_sharded(sender, ["+12025550004"], "Third", datetime(2030, 1, 3, 10),
+                                  processes=2)
+
+        self.assertEqual(server.stats["created"], 3)
+        self.assertEqual(results[0]["skipped"], RECENTLY_MESSAGED)
+        self.assertTrue(results[1]["success"])
+        self.assertEqual(sender.last_run_stats.recently_messaged, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
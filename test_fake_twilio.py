@@ -0,0 +1,132 @@
+"""
+Unit tests for fake_twilio.py module.
+"""
+
+import json
+import socket
+import struct
+import time
+import unittest
+from contextlib import redirect_stderr
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+from fake_twilio import FakeTwilioBehavior, FakeTwilioServer
+from flow_control import RetryPolicy
+from send_sms import SMSSender, SendError
+
+
+class TestFakeTwilioServer(unittest.TestCase):
+    """Test SMSSender end to end against the local fake API."""
+
+    def setUp(self):
+        """Write a config for a sender."""
+        self.config_data = {
+            "account_sid": "ACtest",
+            "auth_token": "test_token",
+            "messaging_service_sid": "MGtest"
+        }
+
+        with NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(self.config_data, f)
+            self.temp_config_path = Path(f.name)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.temp_config_path.unlink()
+
+    def sender(self, server, **kwargs):
+        """Build a sender pointed at the fake server."""
+        return SMSSender(config_path=self.temp_config_path, api_base_url=server.url, **kwargs)
+
+    def test_scheduled_message_round_trip(self):
+        """Test that a scheduled send returns a Twilio-shaped message."""
+        with FakeTwilioServer() as server:
+            result = self.sender(server).send(
+                to="+11234567890",
+                body="Test message",
+                send_at=datetime(2026, 2, 1, 10, 0, 0),
+            )
+
+        self.assertRegex(result["sid"], r"^SM[0-9a-f]{32}$")
+        self.assertEqual(result["status"], "scheduled")
+        self.assertEqual(server.stats["created"], 1)
+
+    def test_server_errors(self):
+        """Test that configured errors surface as SendError with their status."""
+        with FakeTwilioServer(behavior=FakeTwilioBehavior(error_rate=1.0)) as server:
+            with self.assertRaises(SendError) as context:
+                self.sender(server).send(
+                    to="+11234567890",
+                    body="Test message",
+                    send_at=datetime(2026, 2, 1, 10, 0, 0),
+                )
+
+        self.assertEqual(context.exception.status, 500)
+        self.assertEqual(context.exception.code, 20500)
+        self.assertEqual(server.stats["errors"], 1)
+
+    def test_throttling_sends_429_with_retry_after(self):
+        """Test that requests over the rate get 429s the sender can retry."""
+        behavior = FakeTwilioBehavior(throttle_mps=20, throttle_burst=1, retry_after=0)
+        with FakeTwilioServer(behavior=behavior) as server:
+            sender = self.sender(server, retry_policy=RetryPolicy(max_attempts=10, base_delay=0.05))
+            results = sender.send_bulk(
+                recipients=["+11234567890"] * 5,
+                body="Bulk test message",
+                send_at=datetime(2026, 2, 1, 10, 0, 0),
+                max_workers=5,
+            )
+
+        self.assertTrue(all(r["success"] for r in results))
+        self.assertGreater(server.stats["throttled"], 0)
+        self.assertEqual(server.stats["created"], 5)
+        self.assertGreater(sender.last_run_stats.attempts, 5)
+
+    def test_latency_distributions(self):
+        """Test that drawn latencies follow the configured distribution."""
+        for distribution in ("constant", "uniform", "lognormal"):
+            with self.subTest(distribution=distribution):
+                server = FakeTwilioServer(behavior=FakeTwilioBehavior(
+                    latency=0.05, latency_distribution=distribution, seed=1
+                ))
+                try:
+                    draws = [server.draw_latency() for _ in range(2000)]
+                finally:
+                    server.server_close()
+                self.assertAlmostEqual(sum(draws) / len(draws), 0.05, delta=0.005)
+                self.assertTrue(all(d >= 0 for d in draws))
+
+    def test_client_hanging_up_is_quiet(self):
+        """Test that a client disconnecting before its response prints no traceback."""
+        stderr = StringIO()
+        with redirect_stderr(stderr), \
+                FakeTwilioServer(behavior=FakeTwilioBehavior(latency=0.1)) as server:
+            with socket.create_connection(server.server_address[:2]) as client:
+                client.sendall(
+                    b"POST /2010-04-01/Accounts/ACtest/Messages.json HTTP/1.1\r\n"
+                    b"Host: localhost\r\nContent-Length: 0\r\n\r\n"
+                )
+                # Reset rather than close gracefully, so the server's write fails
+                client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            time.sleep(0.3)
+            result = self.sender(server).send(
+                to="+11234567890", body="Test message", send_at=datetime(2026, 2, 1, 10, 0, 0)
+            )
+
+        self.assertEqual(result["status"], "scheduled")
+        self.assertEqual(server.stats["created"], 2)
+        self.assertEqual(stderr.getvalue(), "")
+
+    def test_invalid_behavior(self):
+        """Test that unknown distributions and error rates are rejected."""
+        with self.assertRaises(ValueError):
+            FakeTwilioBehavior(latency_distribution="pareto")
+        with self.assertRaises(ValueError):
+            FakeTwilioBehavior(error_rate=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
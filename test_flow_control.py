@@ -0,0 +1,244 @@
+"""
+Unit tests for flow_control.py module.
+"""
+
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from flow_control import (
+    MAX_SCHEDULE_LEAD,
+    MIN_SCHEDULE_LEAD,
+    AdaptiveConcurrency,
+    RetryPolicy,
+    SendWindow,
+    TokenBucket,
+)
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test token bucket rate limiting."""
+
+    def test_burst_is_free_then_paced(self):
+        """Test that a full bucket allows a burst and then paces at the rate."""
+        bucket = TokenBucket(rate=10, burst=3, clock=lambda: 0.0)
+
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.reserve(), 0.1)
+        self.assertAlmostEqual(bucket.reserve(), 0.2)
+
+    def test_refill_is_capped_at_burst(self):
+        """Test that idle time does not accumulate more than burst tokens."""
+        now = [0.0]
+        bucket = TokenBucket(rate=10, burst=2, clock=lambda: now[0])
+        bucket.reserve()
+        bucket.reserve()
+
+        now[0] = 60.0
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1)
+
+    def test_try_acquire_never_waits(self):
+        """Test that try_acquire refuses instead of reserving a future token."""
+        now = [0.0]
+        bucket = TokenBucket(rate=10, burst=2, clock=lambda: now[0])
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+        now[0] = 0.1
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+    def test_acquire_sleeps_for_reserved_delay(self):
+        """Test that acquire blocks only when the bucket is empty."""
+        bucket = TokenBucket(rate=4, burst=1, clock=lambda: 0.0)
+        with patch("flow_control.time.sleep") as mock_sleep:
+            bucket.acquire()
+            mock_sleep.assert_not_called()
+            bucket.acquire()
+            mock_sleep.assert_called_once_with(0.25)
+
+    def test_acquire_async_sleeps_for_reserved_delay(self):
+        """Test that acquire_async suspends only when the bucket is empty."""
+        bucket = TokenBucket(rate=4, burst=1, clock=lambda: 0.0)
+        with patch("flow_control.asyncio.sleep") as mock_sleep:
+            asyncio.run(bucket.acquire_async())
+            mock_sleep.assert_not_called()
+            asyncio.run(bucket.acquire_async())
+            mock_sleep.assert_called_once_with(0.25)
+
+    def test_concurrent_reservations_are_distinct(self):
+        """Test that threads sharing a bucket each get their own send slot."""
+        bucket = TokenBucket(rate=100, burst=1, clock=lambda: 0.0)
+        delays = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(25):
+                delay = bucket.reserve()
+                with lock:
+                    delays.append(round(delay, 6))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(delays), [round(i / 100, 6) for i in range(100)])
+
+    def test_invalid_parameters(self):
+        """Test that non-positive rate and burst are rejected."""
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, burst=0)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test retry classification and backoff."""
+
+    def test_retryable_errors(self):
+        """Test that throttling and server errors are retried, client errors are not."""
+        policy = RetryPolicy(max_attempts=3)
+        self.assertTrue(policy.should_retry(1, 429, None))
+        self.assertTrue(policy.should_retry(1, 503, None))
+        self.assertTrue(policy.should_retry(1, None, 20429))
+        self.assertFalse(policy.should_retry(1, 400, 21211))
+        self.assertFalse(policy.should_retry(3, 429, None))
+
+    def test_delay_is_jittered_and_capped(self):
+        """Test that delays stay within the exponential ceiling and max_delay."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+        for attempt, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 5.0), (10, 5.0)]:
+            with self.subTest(attempt=attempt):
+                for _ in range(50):
+                    self.assertLessEqual(policy.delay(attempt), ceiling)
+
+    def test_delay_honors_retry_after(self):
+        """Test that Retry-After sets a floor on the delay."""
+        policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+        self.assertGreaterEqual(policy.delay(1, retry_after=7.0), 7.0)
+
+    def test_invalid_max_attempts(self):
+        """Test that max_attempts below 1 is rejected."""
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    """Test AIMD concurrency control."""
+
+    def test_additive_increase_per_window(self):
+        """Test that the limit grows by one after each clean window."""
+        controller = AdaptiveConcurrency(initial=2, maximum=4)
+        for _ in range(2):
+            controller.record(0.1)
+        self.assertEqual(controller.limit, 3)
+        for _ in range(3):
+            controller.record(0.1)
+        self.assertEqual(controller.limit, 4)
+        for _ in range(20):
+            controller.record(0.1)
+        self.assertEqual(controller.limit, 4)
+        self.assertEqual(controller.history, [(0, 2), (2, 3), (5, 4)])
+
+    def test_multiplicative_decrease_on_throttle(self):
+        """Test that throttling halves the limit once per congestion event."""
+        controller = AdaptiveConcurrency(initial=8, maximum=16)
+        controller.record(0.1, throttled=True)
+        self.assertEqual(controller.limit, 4)
+
+        # Requests already in flight at the old limit do not shrink it again
+        for _ in range(8):
+            controller.record(0.1, throttled=True)
+        self.assertEqual(controller.limit, 4)
+
+        controller.record(0.1, throttled=True)
+        self.assertEqual(controller.limit, 2)
+
+    def test_decrease_respects_minimum(self):
+        """Test that the limit never falls below the minimum."""
+        controller = AdaptiveConcurrency(initial=2, minimum=2)
+        controller.record(0.1, throttled=True)
+        self.assertEqual(controller.limit, 2)
+        self.assertEqual(controller.history, [(0, 2)])
+
+    def test_latency_spike_decreases_limit(self):
+        """Test that a sustained rise in latency counts as congestion."""
+        controller = AdaptiveConcurrency(initial=10, maximum=10, latency_tolerance=2.0)
+        for _ in range(5):
+            controller.record(0.1)
+        for _ in range(10):
+            controller.record(1.0)
+        self.assertEqual(controller.limit, 5)
+
+    def test_invalid_parameters(self):
+        """Test that inconsistent bounds and factors are rejected."""
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrency(initial=10, maximum=5)
+        with self.assertRaises(ValueError):
+            AdaptiveConcurrency(decrease=1.5)
+
+
+class TestSendWindow(unittest.TestCase):
+    """Test spreading send times over a window."""
+
+    NOW = 1_800_000_000.0
+    START = NOW + 86400
+
+    def window(self, duration: float, rate: float) -> SendWindow:
+        """Make a window on a clock fixed at NOW."""
+        return SendWindow(duration, rate, clock=lambda: self.NOW)
+
+    def test_times_advance_at_rate_past_window_end(self):
+        """Test that send times step at the rate and keep it past the window end."""
+        window = self.window(duration=3, rate=2)
+        times = [window.next_send_time(self.START) - self.START for _ in range(8)]
+        self.assertEqual(times, [0, 0, 1, 1, 2, 2, 3, 3])
+        self.assertEqual(window.end, self.START + 3)
+
+    def test_overrun_beyond_maximum_lead_is_refused(self):
+        """Test that a send time pushed past the maximum lead raises instead of being returned."""
+        window = self.window(duration=1, rate=1)
+        start = self.NOW + MAX_SCHEDULE_LEAD - 1
+        self.assertEqual(window.next_send_time(start), start)
+        self.assertEqual(window.next_send_time(start), start + 1)
+        with self.assertRaises(ValueError):
+            window.next_send_time(start)
+
+    def test_new_start_restarts_spread(self):
+        """Test that a different start begins a new spread."""
+        window = self.window(duration=60, rate=1)
+        window.next_send_time(self.START)
+        window.next_send_time(self.START)
+        self.assertEqual(window.next_send_time(self.START + 3600), self.START + 3600)
+        self.assertEqual(window.scheduled, 1)
+
+    def test_respects_minimum_lead(self):
+        """Test that a window starting too soon is moved to the earliest allowed time."""
+        window = self.window(duration=60, rate=1)
+        first = window.next_send_time(self.NOW)
+        self.assertGreaterEqual(first, self.NOW + MIN_SCHEDULE_LEAD)
+        self.assertEqual(window.next_send_time(self.NOW), first + 1)
+
+    def test_check_rejects_window_beyond_maximum_lead(self):
+        """Test that a window ending beyond the maximum lead is rejected up front."""
+        window = self.window(duration=3600, rate=1)
+        window.check(self.NOW + MAX_SCHEDULE_LEAD - 3600)
+        with self.assertRaises(ValueError):
+            window.check(self.NOW + MAX_SCHEDULE_LEAD - 3599)
+
+    def test_invalid_parameters(self):
+        """Test that non-positive durations and rates are rejected."""
+        with self.assertRaises(ValueError):
+            SendWindow(duration=0, rate=1)
+        with self.assertRaises(ValueError):
+            SendWindow(duration=60, rate=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Unit tests for idempotency.py module.
+"""
+
+import json
+import unittest
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from fake_twilio import FakeTwilioBehavior, FakeTwilioServer
+from flow_control import RetryPolicy
+from idempotency import IdempotencyIndex, UnknownOutcomeError, idempotency_key
+from send_sms import SMSSender, SendError
+from transport import HttpPoolConfig, TransportError
+
+
+class TestIdempotencyIndex(unittest.TestCase):
+    """Test reserving and settling keys."""
+
+    def setUp(self):
+        """Open an index in a temporary directory."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.index = IdempotencyIndex(Path(self.temp_dir.name) / "keys.db")
+
+    def tearDown(self):
+        """Close the index and remove its file."""
+        self.index.close()
+        self.temp_dir.cleanup()
+
+    def test_key_is_deterministic(self):
+        """Test that keys depend only on campaign and recipient."""
+        key = idempotency_key("spring-sale", "+12025551234")
+        self.assertEqual(key, idempotency_key("spring-sale", "+12025551234"))
+        self.assertNotEqual(key, idempotency_key("spring-sale", "+12025551235"))
+        self.assertNotEqual(key, idempotency_key("summer-sale", "+12025551234"))
+
+    def test_reserve_complete_release(self):
+        """Test a key's life cycle."""
+        self.assertIsNone(self.index.reserve("k"))
+        self.assertEqual(self.index.reserve("k"), {"state": "pending", "sid": None, "status": None})
+        self.assertEqual(self.index.pending(), ["k"])
+
+        self.index.complete("k", "SM1", "scheduled")
+        self.assertEqual(
+            self.index.reserve("k"), {"state": "sent", "sid": "SM1", "status": "scheduled"}
+        )
+        self.assertEqual(self.index.pending(), [])
+
+        self.index.release("k")
+        self.assertIsNone(self.index.reserve("k"))
+
+
+class TestIdempotentSending(unittest.TestCase):
+    """Test SMSSender with an idempotency index against the local fake API."""
+
+    def setUp(self):
+        """Write a config and open an index."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.config_path = Path(self.temp_dir.name) / "config.json"
+        self.config_path.write_text(json.dumps(
+            {"account_sid": "AC", "auth_token": "t", "messaging_service_sid": "MG"}
+        ))
+        self.index = IdempotencyIndex(Path(self.temp_dir.name) / "keys.db")
+        self.send_at = datetime(2030, 1, 1, 10, 0, 0)
+
+    def tearDown(self):
+        """Close the index and remove temporary files."""
+        self.index.close()
+        self.temp_dir.cleanup()
+
+    def sender(self, server, **kwargs):
+        """Build a sender with the index, pointed at the fake server."""
+        return SMSSender(
+            config_path=self.config_path, api_base_url=server.url, idempotency=self.index, **kwargs
+        )
+
+    def test_repeat_send_is_not_scheduled_again(self):
+        """Test that sending the same message to the same number twice creates it once."""
+        with FakeTwilioServer() as server:
+            sender = self.sender(server)
+            first = sender.send(to="+12025551234", body="Hi", send_at=self.send_at)
+            second = sender.send(to="+12025551234", body="Hi", send_at=self.send_at)
+            other = sender.send(to="+12025551234", body="Hi", send_at=self.send_at, campaign="x")
+
+        self.assertEqual(server.stats["created"], 2)
+        self.assertEqual(second["sid"], first["sid"])
+        self.assertEqual(second["skipped"], "already scheduled")
+        self.assertNotEqual(other["sid"], first["sid"])
+
+    def test_server_error_is_not_retried_and_blocks_resend(self):
+        """Test that an ambiguous 5xx leaves the outcome unknown instead of retrying."""
+        with FakeTwilioServer(behavior=FakeTwilioBehavior(error_rate=1.0)) as server:
+            sender = self.sender(server, retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+            with self.assertRaises(SendError):
+                sender.send(to="+12025551234", body="Hi", send_at=self.send_at)
+            with self.assertRaises(UnknownOutcomeError):
+                sender.send(to="+12025551234", body="Hi", send_at=self.send_at)
+
+        self.assertEqual(server.stats["requests"], 1)
+        self.assertEqual(len(self.index.pending()), 1)
+
+    def test_throttling_is_retried_and_released(self):
+        """Test that 429s are still retried, and a final 429 frees the key."""
+        behavior = FakeTwilioBehavior(throttle_mps=0.001, retry_after=0)
+        with FakeTwilioServer(behavior=behavior) as server:
+            sender = self.sender(server, retry_policy=RetryPolicy(max_attempts=2, base_delay=0))
+            sender.send(to="+12025550001", body="Hi", send_at=self.send_at)
+            with self.assertRaises(SendError):
+                sender.send(to="+12025550002", body="Hi", send_at=self.send_at)
+
+        self.assertEqual(server.stats["throttled"], 2)
+        self.assertEqual(self.index.pending(), [])
+
+    def test_timeout_leaves_outcome_unknown(self):
+        """Test that a request that timed out is never sent again automatically."""
+        with FakeTwilioServer(behavior=FakeTwilioBehavior(latency=0.3)) as server:
+            sender = self.sender(server, http_pool=HttpPoolConfig(read_timeout=0.05))
+            with self.assertRaises(TransportError):
+                sender.send(to="+12025551234", body="Hi", send_at=self.send_at)
+            with self.assertRaises(UnknownOutcomeError):
+                sender.send(to="+12025551234", body="Hi", send_at=self.send_at)
+
+    def test_resumed_bulk_run_skips_scheduled(self):
+        """Test that re-running a bulk send does not schedule anyone twice."""
+        phones = [f"+1202555{i:04d}" for i in range(20)]
+        with FakeTwilioServer() as server:
+            sender = self.sender(server)
+            sender.send_bulk(phones[:12], "Hi", self.send_at, max_workers=4)
+            results = sender.send_bulk(phones, "Hi", self.send_at, max_workers=4)
+
+        self.assertEqual(server.stats["created"], 20)
+        self.assertEqual(sender.last_run_stats.skipped, 12)
+        self.assertTrue(all(result["success"] for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
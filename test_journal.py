@@ -0,0 +1,64 @@
+"""
+Unit tests for journal.py module.
+"""
+
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from journal import SendJournal
+
+
+class TestSendJournal(unittest.TestCase):
+    """Test the append-only send journal."""
+
+    def setUp(self):
+        """Create a scratch directory for journal files."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = Path(self.temp_dir.name) / "journal.jsonl"
+
+    def tearDown(self):
+        """Remove journal files."""
+        self.temp_dir.cleanup()
+
+    def test_records_are_appended_as_json_lines(self):
+        """Test that each outcome becomes one JSON line."""
+        with SendJournal(self.path) as journal:
+            journal.record({"phone": "+11234567890", "success": True, "sid": "SM1",
+                            "status": "scheduled", "attempts": 1})
+            journal.record({"phone": "+10987654321", "success": False, "error": "boom"})
+
+        lines = [json.loads(line) for line in self.path.read_text().splitlines()]
+        self.assertEqual(lines, [
+            {"phone": "+11234567890", "success": True, "sid": "SM1",
+             "status": "scheduled", "attempts": 1},
+            {"phone": "+10987654321", "success": False, "error": "boom"},
+        ])
+
+    def test_reopen_loads_completed_recipients(self):
+        """Test that only successful recipients are treated as done on resume."""
+        with SendJournal(self.path) as journal:
+            journal.record({"phone": "+11234567890", "success": True, "sid": "SM1"})
+            journal.record({"phone": "+10987654321", "success": False, "error": "boom"})
+
+        with SendJournal(self.path) as journal:
+            self.assertTrue(journal.is_done("+11234567890"))
+            self.assertFalse(journal.is_done("+10987654321"))
+            journal.record({"phone": "+10987654321", "success": True, "sid": "SM2"})
+
+        self.assertEqual(len(self.path.read_text().splitlines()), 3)
+
+    def test_ignores_truncated_last_line(self):
+        """Test that a partial record left by a crash does not break resume."""
+        self.path.write_text(
+            '{"phone": "+11234567890", "success": true, "sid": "SM1"}\n{"phone": "+1098'
+        )
+
+        with SendJournal(self.path) as journal:
+            self.assertTrue(journal.is_done("+11234567890"))
+            self.assertEqual(len(journal.completed), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Unit tests for local_scheduler.py module.
+"""
+
+import json
+import threading
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from zoneinfo import ZoneInfo
+
+from fake_twilio import FakeTwilioServer
+from local_scheduler import EXPIRED, LocalScheduler
+from scheduling import SEND_NOW, ScheduleSpec
+from send_sms import SMSSender
+from sinks import CallbackSink
+
+
+class TestLocalScheduler(unittest.TestCase):
+    """Test sending messages from the local scheduler when they fall due."""
+
+    def setUp(self):
+        """Write a config and start a fake Twilio server."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = Path(self.temp_dir.name) / "jobs.db"
+        config_path = Path(self.temp_dir.name) / "config.json"
+        config_path.write_text(json.dumps(
+            {"account_sid": "ACloc", "auth_token": "token", "messaging_service_sid": "MGloc"}
+        ))
+        self.server = FakeTwilioServer().start()
+        self.sender = SMSSender(config_path=config_path, api_base_url=self.server.url)
+
+    def tearDown(self):
+        """Stop the server and remove temporary files."""
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def test_due_messages_are_sent_and_later_ones_persist(self):
+        """Test that only due messages are sent, unscheduled, and the rest survive reopening."""
+        results = []
+        with LocalScheduler(self.path, self.sender, sink=CallbackSink(results.append)) as scheduler:
+            self.assertEqual(
+                scheduler.schedule(["+12025550001", "+12025550002"], "Now", SEND_NOW), 2
+            )
+            scheduler.schedule(["+12025550003"], "Later", datetime(2099, 1, 1, 10, 0, 0))
+            self.assertEqual(scheduler.run_pending(), 2)
+            self.assertEqual(scheduler.run_pending(), 0)
+
+        self.assertEqual(self.server.stats["created"], 2)
+        self.assertEqual([r["status"] for r in results], ["accepted", "accepted"])
+        with LocalScheduler(self.path, self.sender) as scheduler:
+            self.assertEqual(scheduler.pending(), 1)
+            self.assertEqual(
+                scheduler.next_due(), ScheduleSpec.from_local(datetime(2099, 1, 1, 10)).timestamp()
+            )
+
+    def test_scheduled_time_is_stored_as_unix_time(self):
+        """Test that a local send time is due at the matching Unix time."""
+        with LocalScheduler(self.path, self.sender) as scheduler:
+            scheduler.schedule(
+                ["+12025550001"], "Later", datetime(2099, 1, 1, 10), "America/Chicago"
+            )
+            scheduler.schedule(
+                ["+12025550002"], "Later", ScheduleSpec.from_timestamp(4_100_000_000)
+            )
+
+            self.assertEqual(
+                scheduler.next_due(),
+                datetime(2099, 1, 1, 10, tzinfo=ZoneInfo("America/Chicago")).timestamp(),
+            )
+            self.assertEqual(scheduler.pending(), 2)
+
+    def test_run_sends_within_bounded_lateness(self):
+        """Test that run() wakes for a message added while it sleeps and sends it on time."""
+        with LocalScheduler(self.path, self.sender, poll_interval=5.0) as scheduler:
+            runner = threading.Thread(target=scheduler.run)
+            runner.start()
+            try:
+                scheduler.schedule(
+                    ["+12025550001"], "Soon", ScheduleSpec.from_timestamp(time.time() + 1)
+                )
+                deadline = time.monotonic() + 5
+                while scheduler.pending() and time.monotonic() < deadline:
+                    time.sleep(0.05)
+            finally:
+                scheduler.stop()
+                runner.join()
+
+            self.assertEqual(scheduler.stats.succeeded, 1)
+            self.assertLess(scheduler.worst_lateness, 1.0)
+
+    def test_expired_messages_are_skipped(self):
+        """Test that messages more than max_lateness past due are not sent."""
+        now = [1_900_000_000.0]
+        results = []
+        with LocalScheduler(
+            self.path, self.sender, sink=CallbackSink(results.append), max_lateness=60,
+            clock=lambda: now[0],
+        ) as scheduler:
+            scheduler.schedule(["+12025550001"], "Stale", SEND_NOW)
+            now[0] += 61
+            scheduler.run_pending()
+
+        self.assertEqual(self.server.stats["requests"], 0)
+        self.assertEqual(results, [{"phone": "+12025550001", "success": False, "skipped": EXPIRED}])
+        self.assertEqual((scheduler.stats.skipped, scheduler.stats.succeeded), (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
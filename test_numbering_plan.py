@@ -0,0 +1,81 @@
+"""
+Unit tests for numbering_plan.py module.
+"""
+
+import unittest
+
+from numbering_plan import (
+    LINE_FIXED,
+    LINE_FIXED_OR_MOBILE,
+    LINE_MOBILE,
+    LINE_TOLL_FREE,
+    LINE_UNKNOWN,
+    NUMBERING_PLANS,
+    OTHER_COUNTRY_CODES,
+    NumberInfo,
+    accepts_sms,
+    lookup,
+)
+
+
+class TestLookup(unittest.TestCase):
+    """Test numbering plan lookups."""
+
+    def test_known_ranges(self):
+        """Test that numbers resolve to their country and longest matching range."""
+        cases = {
+            "+12025551234": NumberInfo("1", "2025551234", LINE_FIXED_OR_MOBILE),
+            "+447911123456": NumberInfo("44", "7911123456", LINE_MOBILE),
+            "+442071234567": NumberInfo("44", "2071234567", LINE_FIXED),
+            "+44800123456": NumberInfo("44", "800123456", LINE_TOLL_FREE),
+            "+8613800138000": NumberInfo("86", "13800138000", LINE_MOBILE),
+            "+819012345678": NumberInfo("81", "9012345678", LINE_MOBILE),
+            "+2348012345678": NumberInfo("234", "8012345678", LINE_UNKNOWN),
+        }
+        for phone, info in cases.items():
+            with self.subTest(phone=phone):
+                self.assertEqual(lookup(phone), info)
+
+    def test_invalid_numbers(self):
+        """Test that unassigned codes, ranges and wrong lengths are rejected."""
+        invalid = [
+            "+1202555123",  # NANP is 10 national digits
+            "+120255512345",
+            "+44791112345",  # UK mobiles are 10 national digits
+            "+447612345678",  # UK pagers
+            "+999123456789",  # Unassigned country code
+            "+80012345678",  # Global freephone
+            "+23412",  # Shorter than E.164 allows
+            "12025551234",
+            "+1202555123a",
+            "+１２０２５５５１２３４",  # Full-width digits
+            "",
+        ]
+        for phone in invalid:
+            with self.subTest(phone=phone):
+                self.assertIsNone(lookup(phone))
+
+    def test_country_codes_are_prefix_free(self):
+        """Test that no country code is a prefix of another, as the trie relies on."""
+        codes = [*NUMBERING_PLANS, *OTHER_COUNTRY_CODES]
+        self.assertEqual(len(codes), len(set(codes)))
+        for code in codes:
+            for other in codes:
+                if other != code:
+                    self.assertFalse(other.startswith(code), f"{code} prefixes {other}")
+
+
+class TestAcceptsSms(unittest.TestCase):
+    """Test the SMS deliverability check."""
+
+    def test_landlines_and_premium_rate_are_rejected(self):
+        """Test that only ranges that can take SMS pass."""
+        self.assertTrue(accepts_sms("+447911123456"))
+        self.assertTrue(accepts_sms("+12025551234"))
+        self.assertFalse(accepts_sms("+442071234567"))
+        self.assertFalse(accepts_sms("+449012345678"))
+        self.assertFalse(accepts_sms("+4479111234"))
+
+
+if __name__ == "__main__":
+    unittest.main()
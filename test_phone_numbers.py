@@ -0,0 +1,204 @@
+"""
+Unit tests for phone_numbers.py module.
+"""
+
+import random
+import unittest
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+from phone_numbers import (
+    REASON_EMPTY,
+    REASON_INVALID_CHARACTERS,
+    REASON_INVALID_COUNTRY_CODE,
+    REASON_OK,
+    REASON_TOO_LONG,
+    REASON_TOO_SHORT,
+    PhoneSet,
+    dedupe_phone_numbers,
+    e164_to_int,
+    int_to_e164,
+    normalize_phone_numbers,
+    normalize_phone_stream,
+    read_phone_numbers,
+)
+
+
+class TestPacking(unittest.TestCase):
+    """Test E.164 to integer packing."""
+
+    def test_round_trip(self):
+        """Test that E.164 numbers survive packing and unpacking."""
+        for phone in ["+11234567890", "+447911123456", "+8613800138000", "+999999999999999"]:
+            with self.subTest(phone=phone):
+                value = e164_to_int(phone)
+                self.assertLess(value, 2 ** 64)
+                self.assertEqual(int_to_e164(value), phone)
+
+    def test_non_e164_is_not_packed(self):
+        """Test that strings that are not E.164 return None."""
+        invalid = ["1234567890", "+01234567890", "+1 123 456 7890", "", "+", "+1234567890123456"]
+        for phone in invalid:
+            with self.subTest(phone=phone):
+                self.assertIsNone(e164_to_int(phone))
+
+
+class TestPhoneSet(unittest.TestCase):
+    """Test the packed phone number hash set."""
+
+    def test_add_and_contains(self):
+        """Test membership for strings and packed ints."""
+        phones = PhoneSet()
+        self.assertTrue(phones.add("+11234567890"))
+        self.assertFalse(phones.add("+11234567890"))
+        self.assertFalse(phones.add(11234567890))
+        self.assertIn("+11234567890", phones)
+        self.assertIn(11234567890, phones)
+        self.assertNotIn("+10987654321", phones)
+        self.assertNotIn("not a number", phones)
+        self.assertEqual(len(phones), 1)
+
+    def test_growth_keeps_all_entries(self):
+        """Test that resizing past the initial capacity loses nothing."""
+        rng = random.Random(7)
+        values = {rng.randrange(10 ** 10, 10 ** 11) for _ in range(5000)}
+        phones = PhoneSet(capacity=16)
+        for value in values:
+            phones.add(value)
+
+        self.assertEqual(len(phones), len(values))
+        for value in values:
+            self.assertIn(value, phones)
+        self.assertNotIn(10 ** 11 + 1, phones)
+
+    def test_add_rejects_non_e164(self):
+        """Test that only E.164 numbers can be stored."""
+        with self.assertRaises(ValueError):
+            PhoneSet().add("(123) 456-7890")
+
+
+class TestDedupe(unittest.TestCase):
+    """Test order-preserving deduplication."""
+
+    def test_keeps_first_seen_order(self):
+        """Test that duplicates are dropped and order is kept."""
+        phones = ["+13333333333", "+11111111111", "+13333333333", "+12222222222", "+11111111111"]
+        self.assertEqual(
+            list(dedupe_phone_numbers(phones)),
+            ["+13333333333", "+11111111111", "+12222222222"],
+        )
+
+    def test_passes_invalid_numbers_through_once(self):
+        """Test that non-E.164 entries are deduplicated but not dropped."""
+        phones = ["bad", "+11111111111", "bad", "(123) 456-7890"]
+        self.assertEqual(
+            list(dedupe_phone_numbers(phones)),
+            ["bad", "+11111111111", "(123) 456-7890"],
+        )
+
+    def test_is_lazy(self):
+        """Test that input is consumed only as output is requested."""
+        consumed = []
+
+        def phones():
+            for i in range(3):
+                consumed.append(i)
+                yield f"+1123456789{i}"
+
+        numbers = dedupe_phone_numbers(phones())
+        next(numbers)
+        self.assertEqual(consumed, [0])
+
+
+class TestNormalize(unittest.TestCase):
+    """Test batch normalization to E.164."""
+
+    def test_formats_normalize_to_e164(self):
+        """Test that formatting, prefixes and the default country are handled."""
+        cases = {
+            "+11234567890": "+11234567890",
+            "(123) 456-7890": "+11234567890",
+            "123.456.7890": "+11234567890",
+            "1-123-456-7890": "+11234567890",
+            "+1 (123) 456-7890": "+11234567890",
+            "001 123 456 7890": "+11234567890",
+            "+44 7911 123456": "+447911123456",
+            "+44 (0)7911 123456": "+447911123456",
+            "0044 7911 123456": "+447911123456",
+        }
+        normalized = normalize_phone_numbers(list(cases))
+        self.assertEqual(normalized.phones, list(cases.values()))
+        self.assertEqual(normalized.reasons, bytes(len(cases)))
+        self.assertEqual(normalized.rejected(), 0)
+
+    def test_rejection_reasons(self):
+        """Test that each rejected number gets None and the reason it failed."""
+        cases = {
+            "": REASON_EMPTY,
+            "  ": REASON_EMPTY,
+            "+1123456789a": REASON_INVALID_CHARACTERS,
+            "call me": REASON_INVALID_CHARACTERS,
+            "456-7890": REASON_TOO_SHORT,
+            "+1234567890": REASON_TOO_SHORT,
+            "+": REASON_TOO_SHORT,
+            "123456789012": REASON_TOO_LONG,
+            "+4412345678901234": REASON_TOO_LONG,
+            "+01234567890": REASON_INVALID_COUNTRY_CODE,
+        }
+        normalized = normalize_phone_numbers(list(cases))
+        self.assertEqual(normalized.phones, [None] * len(cases))
+        self.assertEqual(list(normalized.reasons), list(cases.values()))
+        self.assertEqual(normalized.rejected(), len(cases))
+
+    def test_other_default_country(self):
+        """Test that national numbers lose their trunk 0 outside fixed-length plans."""
+        normalized = normalize_phone_numbers(["07911 123456", "7911 123456", "0123"], "44")
+        self.assertEqual(normalized.phones, ["+447911123456", "+447911123456", None])
+        self.assertEqual(list(normalized.reasons), [REASON_OK, REASON_OK, REASON_TOO_SHORT])
+
+    def test_keeps_positions(self):
+        """Test that results line up with inputs, including numbers spanning lines."""
+        raw = ["bad", "+11234567890\n", "", "(098) 765\n4321"]
+        normalized = normalize_phone_numbers(raw)
+        self.assertEqual(normalized.phones, [None, "+11234567890", None, "+10987654321"])
+        self.assertEqual(normalize_phone_numbers([]).phones, [])
+
+    def test_invalid_default_country(self):
+        """Test that the default country must be a calling code."""
+        for country in ("", "+1", "01"):
+            with self.subTest(country=country), self.assertRaises(ValueError):
+                normalize_phone_numbers(["1234567890"], country)
+
+    def test_stream_passes_rejected_numbers_through(self):
+        """Test that streaming keeps order and leaves rejected numbers as typed."""
+        phones = ["(123) 456-7890", "bad", "+1 098 765 4321"]
+        self.assertEqual(
+            list(normalize_phone_stream(iter(phones), batch_size=2)),
+            ["+11234567890", "bad", "+10987654321"],
+        )
+
+
+class TestReadPhoneNumbers(unittest.TestCase):
+    """Test streaming phone number ingestion."""
+
+    def test_strips_and_skips_blank_lines(self):
+        """Test that numbers are stripped and blank lines dropped."""
+        with NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
+            f.write("+11234567890\n\n  +10987654321 \r\n\t\n+11111111111")
+            temp_path = Path(f.name)
+
+        try:
+            numbers = read_phone_numbers(temp_path)
+            self.assertEqual(next(numbers), "+11234567890")
+            self.assertEqual(list(numbers), ["+10987654321", "+11111111111"])
+        finally:
+            temp_path.unlink()
+
+    def test_missing_file(self):
+        """Test that a missing file raises FileNotFoundError when read."""
+        with self.assertRaises(FileNotFoundError):
+            list(read_phone_numbers(Path("non_existent_numbers.txt")))
+
+
+if __name__ == "__main__":
+    unittest.main()
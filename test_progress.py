@@ -0,0 +1,87 @@
+"""
+Unit tests for progress.py module.
+"""
+
+import io
+import json
+import unittest
+
+from progress import ProgressReporter
+
+
+class FakeTerminal(io.StringIO):
+    """StringIO that claims to be a terminal."""
+
+    def isatty(self):
+        return True
+
+
+class TestProgressReporter(unittest.TestCase):
+    """Test throttled progress reporting."""
+
+    def setUp(self):
+        """Use a manually advanced clock."""
+        self.now = [0.0]
+
+    def reporter(self, stream, **kwargs):
+        """Build a reporter on the fake clock."""
+        return ProgressReporter(stream=stream, clock=lambda: self.now[0], **kwargs)
+
+    def test_structured_reports_are_throttled(self):
+        """Test that non-terminal output is JSON lines at most once per interval."""
+        stream = io.StringIO()
+        progress = self.reporter(stream, total=10, interval=5.0)
+
+        for i in range(4):
+            self.now[0] = i * 2.0
+            progress.update({"phone": "+11234567890", "success": i != 1}, 0.1)
+        progress.finish()
+
+        reports = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(len(reports), 2)
+        self.assertEqual(reports[0]["done"], 4)
+        final = reports[-1]
+        self.assertEqual((final["succeeded"], final["failed"], final["skipped"]), (3, 1, 0))
+        self.assertEqual(final["rate_per_s"], round(4 / 6.0, 1))
+        self.assertEqual(final["eta_s"], 9.0)
+        self.assertEqual(final["p50_ms"], 100.0)
+
+    def test_terminal_redraws_single_line(self):
+        """Test that terminal output rewrites one line and ends with a newline."""
+        stream = FakeTerminal()
+        progress = self.reporter(stream, interval=0.0)
+
+        self.now[0] = 1.0
+        progress.update({"phone": "+11234567890", "success": True}, 0.05)
+        progress.update({"phone": "+11234567890", "success": True, "skipped": "x"}, 0.0)
+        progress.finish()
+
+        output = stream.getvalue()
+        self.assertEqual(output.count("\r"), 3)
+        self.assertTrue(output.endswith("\n"))
+        self.assertIn("✓1 ✗0 skipped 1", output.splitlines()[-1])
+
+    def test_latency_percentiles(self):
+        """Test percentiles over recorded latencies, ignoring skipped results."""
+        progress = self.reporter(io.StringIO(), quiet=True)
+        for ms in range(1, 101):
+            progress.update({"phone": "+11234567890", "success": True}, ms / 1000)
+        progress.update({"phone": "+11234567890", "success": True, "skipped": "x"}, 10.0)
+
+        snapshot = progress.snapshot()
+        self.assertEqual((snapshot["p50_ms"], snapshot["p95_ms"], snapshot["p99_ms"]),
+                         (51.0, 96.0, 100.0))
+
+    def test_quiet_writes_nothing(self):
+        """Test that quiet mode tracks progress silently."""
+        stream = io.StringIO()
+        progress = self.reporter(stream, quiet=True, interval=0.0)
+        progress.update({"phone": "+11234567890", "success": False}, 0.1)
+        progress.finish()
+
+        self.assertEqual(stream.getvalue(), "")
+        self.assertEqual(progress.snapshot()["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""
+Unit tests for scheduling.py module.
+"""
+
+import unittest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from scheduling import ScheduleSpec
+
+
+class TestScheduleSpec(unittest.TestCase):
+    """Test prepared schedule times."""
+
+    def test_from_local_converts_to_utc(self):
+        """Test conversion of a local time to Twilio's UTC format."""
+        spec = ScheduleSpec.from_local(datetime(2026, 2, 1, 10, 0, 0), "America/New_York")
+        self.assertEqual(spec.send_at_utc, "2026-02-01T15:00:00Z")
+
+        summer = ScheduleSpec.from_local(datetime(2026, 7, 1, 10, 0, 0), "America/Los_Angeles")
+        self.assertEqual(summer.send_at_utc, "2026-07-01T17:00:00Z")
+
+    def test_timestamp_round_trip(self):
+        """Test that a spec's Unix time matches the time it was built from."""
+        self.assertEqual(ScheduleSpec.from_timestamp(1_900_000_000.5).timestamp(), 1_900_000_000)
+        self.assertEqual(
+            ScheduleSpec("2026-02-01T15:00:00Z").timestamp(),
+            datetime(2026, 2, 1, 10, tzinfo=ZoneInfo("America/New_York")).timestamp(),
+        )
+
+    def test_of_passes_specs_through(self):
+        """Test that an existing spec is reused rather than converted again."""
+        spec = ScheduleSpec("2026-02-01T15:00:00Z")
+        self.assertIs(ScheduleSpec.of(spec, "Europe/London"), spec)
+        self.assertEqual(
+            ScheduleSpec.of(datetime(2026, 2, 1, 10, 0, 0), "America/New_York"), spec
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
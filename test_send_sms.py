@@ -2,16 +2,28 @@
 Unit tests for send_sms.py module.
 """
 
+import asyncio
 import json
+import threading
+import time
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from unittest.mock import Mock, MagicMock, patch
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from unittest.mock import AsyncMock, Mock, MagicMock, patch
 
 from twilio.base.exceptions import TwilioRestException
+from twilio.http.response import Response
 
-from send_sms import SMSSender, E164_PATTERN
+import send_sms
+from area_codes import send_bulk_local_time
+from flow_control import AdaptiveConcurrency, RetryPolicy, SendWindow
+from journal import SendJournal
+from progress import ProgressReporter
+from scheduling import SEND_NOW, ScheduleSpec
+from sinks import CallbackSink
+from send_sms import E164_PATTERN, SMSSender, SendError
 
 
 class TestPhoneValidation(unittest.TestCase):
@@ -24,6 +36,8 @@ class TestPhoneValidation(unittest.TestCase):
             "+19876543210",
             "+10000000000",
             "+19999999999",
+            "+447911123456",
+            "+8613800138000",
         ]
         for number in valid_numbers:
             with self.subTest(number=number):
@@ -42,6 +56,8 @@ class TestPhoneValidation(unittest.TestCase):
             "",  # Empty string
             "phone",  # Text
             "+1",  # Too short
+            "+442071234567",  # Landline
+            "+999123456789",  # Unassigned country code
         ]
         for number in invalid_numbers:
             with self.subTest(number=number):
@@ -164,6 +180,17 @@ class TestSMSSending(unittest.TestCase):
             )
         self.assertIn("Invalid phone number format", str(context.exception))
 
+    def test_send_landline_is_rejected_locally(self):
+        """Test that a landline fails without calling the API."""
+        with self.assertRaises(ValueError) as context:
+            self.sender.send(
+                to="+442071234567",
+                body="Test message",
+                send_at=datetime(2026, 2, 1, 10, 0, 0)
+            )
+        self.assertIn("numbering plan", str(context.exception))
+        self.mock_client.messages.create.assert_not_called()
+
     def test_send_twilio_exception(self):
         """Test that Twilio API errors are handled properly."""
         # Mock Twilio raising an exception
@@ -183,6 +210,141 @@ class TestSMSSending(unittest.TestCase):
             )
         self.assertIn("Failed to send SMS", str(context.exception))
 
+    def test_send_uses_rate_limiter(self):
+        """Test that each send waits on the configured rate limiter."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="scheduled")
+        self.sender.rate_limiter = Mock()
+
+        self.sender.send(
+            to="+11234567890",
+            body="Test message",
+            send_at=datetime(2026, 2, 1, 10, 0, 0)
+        )
+
+        self.sender.rate_limiter.acquire.assert_called_once_with()
+
+    def test_send_invalid_phone_skips_rate_limiter(self):
+        """Test that invalid numbers do not consume rate limiter tokens."""
+        self.sender.rate_limiter = Mock()
+
+        with self.assertRaises(ValueError):
+            self.sender.send(
+                to="1234567890",
+                body="Test message",
+                send_at=datetime(2026, 2, 1, 10, 0, 0)
+            )
+
+        self.sender.rate_limiter.acquire.assert_not_called()
+
+    @patch('send_sms.time.sleep')
+    def test_send_retries_throttled_request(self, mock_sleep):
+        """Test that a 429 is retried and the attempt count is reported."""
+        self.sender.retry_policy = RetryPolicy(max_attempts=3)
+        self.mock_client.messages.create.side_effect = [
+            TwilioRestException(status=429, uri="/Messages", msg="Too Many Requests"),
+            Mock(sid="SM123456", status="scheduled"),
+        ]
+
+        result = self.sender.send(
+            to="+11234567890",
+            body="Test message",
+            send_at=datetime(2026, 2, 1, 10, 0, 0)
+        )
+
+        self.assertEqual(result["sid"], "SM123456")
+        self.assertEqual(result["attempts"], 2)
+        self.assertEqual(self.mock_client.messages.create.call_count, 2)
+        mock_sleep.assert_called_once()
+
+    @patch('send_sms.time.sleep')
+    def test_send_honors_retry_after(self, mock_sleep):
+        """Test that the Retry-After header sets the minimum wait."""
+        self.sender.retry_policy = RetryPolicy(max_attempts=2, base_delay=0.01)
+
+        calls = []
+
+        def create(**_kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                response = Response(429, "", {"Retry-After": "7"})
+                send_sms.last_response.set(response)
+                raise TwilioRestException(status=429, uri="/Messages", msg="Too Many Requests")
+            return Mock(sid="SM123456", status="scheduled")
+
+        self.mock_client.messages.create.side_effect = create
+
+        self.sender.send(
+            to="+11234567890",
+            body="Test message",
+            send_at=datetime(2026, 2, 1, 10, 0, 0)
+        )
+
+        self.assertGreaterEqual(mock_sleep.call_args[0][0], 7.0)
+
+    @patch('send_sms.time.sleep')
+    def test_send_gives_up_after_max_attempts(self, mock_sleep):
+        """Test that retries stop at max_attempts and report the count."""
+        self.sender.retry_policy = RetryPolicy(max_attempts=3)
+        self.mock_client.messages.create.side_effect = TwilioRestException(
+            status=503, uri="/Messages", msg="Service Unavailable"
+        )
+
+        with self.assertRaises(SendError) as context:
+            self.sender.send(
+                to="+11234567890",
+                body="Test message",
+                send_at=datetime(2026, 2, 1, 10, 0, 0)
+            )
+
+        self.assertEqual(context.exception.attempts, 3)
+        self.assertEqual(context.exception.status, 503)
+        self.assertIn("Failed to send SMS", str(context.exception))
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    @patch('send_sms.time.sleep')
+    def test_send_does_not_retry_client_error(self, mock_sleep):
+        """Test that non-retryable errors fail on the first attempt."""
+        self.sender.retry_policy = RetryPolicy(max_attempts=3)
+        self.mock_client.messages.create.side_effect = TwilioRestException(
+            status=400, uri="/Messages", msg="Invalid phone number"
+        )
+
+        with self.assertRaises(SendError) as context:
+            self.sender.send(
+                to="+11234567890",
+                body="Test message",
+                send_at=datetime(2026, 2, 1, 10, 0, 0)
+            )
+
+        self.assertEqual(context.exception.attempts, 1)
+        mock_sleep.assert_not_called()
+
+    def test_send_with_schedule_spec(self):
+        """Test that a prepared spec is sent as-is without timezone work."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="scheduled")
+
+        with patch('scheduling.ZoneInfo') as mock_zoneinfo:
+            self.sender.send(
+                to="+11234567890",
+                body="Test message",
+                send_at=ScheduleSpec("2026-02-01T15:00:00Z")
+            )
+
+        mock_zoneinfo.assert_not_called()
+        call_kwargs = self.mock_client.messages.create.call_args[1]
+        self.assertEqual(call_kwargs["send_at"], "2026-02-01T15:00:00Z")
+
+    def test_send_now_is_unscheduled(self):
+        """Test that SEND_NOW creates the message without scheduling parameters."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="accepted")
+
+        result = self.sender.send(to="+11234567890", body="Now", send_at=SEND_NOW)
+
+        self.assertEqual(result["status"], "accepted")
+        call_kwargs = self.mock_client.messages.create.call_args[1]
+        self.assertNotIn("send_at", call_kwargs)
+        self.assertNotIn("schedule_type", call_kwargs)
+
     def test_send_with_different_timezone(self):
         """Test sending with different timezone."""
         mock_message = Mock()
@@ -316,6 +478,462 @@ class TestBulkSending(unittest.TestCase):
         self.assertEqual(len(results), 0)
         self.mock_client.messages.create.assert_not_called()
 
+    def test_send_bulk_concurrent_preserves_order(self):
+        """Test that concurrent bulk sending returns results in recipient order."""
+        def create(**kwargs):
+            # Finish later recipients first to scramble completion order
+            time.sleep(0.001 * (10 - int(kwargs["to"][-1])))
+            message = Mock()
+            message.sid = f"SM{kwargs['to'][-4:]}"
+            message.status = "scheduled"
+            return message
+
+        self.mock_client.messages.create.side_effect = create
+
+        recipients = [f"+1123456789{i}" for i in range(10)]
+        send_at = datetime(2026, 2, 1, 10, 0, 0)
+
+        results = self.sender.send_bulk(
+            recipients=recipients,
+            body="Bulk test message",
+            send_at=send_at,
+            max_workers=4
+        )
+
+        self.assertEqual([r["phone"] for r in results], recipients)
+        for phone, result in zip(recipients, results):
+            self.assertTrue(result["success"])
+            self.assertEqual(result["sid"], f"SM{phone[-4:]}")
+
+    def test_send_bulk_concurrent_bounds_in_flight(self):
+        """Test that no more than max_workers requests are in flight at once."""
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def create(**_kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.005)
+            with lock:
+                active[0] -= 1
+            return Mock(sid="SM123456", status="scheduled")
+
+        self.mock_client.messages.create.side_effect = create
+
+        results = self.sender.send_bulk(
+            recipients=["+11234567890"] * 20,
+            body="Bulk test message",
+            send_at=datetime(2026, 2, 1, 10, 0, 0),
+            max_workers=3
+        )
+
+        self.assertEqual(len(results), 20)
+        self.assertLessEqual(peak[0], 3)
+
+    def test_send_bulk_concurrent_partial_failure(self):
+        """Test that concurrent failures keep the same result shape."""
+        mock_message = Mock()
+        mock_message.sid = "SM123456"
+        mock_message.status = "scheduled"
+        self.mock_client.messages.create.return_value = mock_message
+
+        recipients = ["+11234567890", "invalid_number", "+11111111111"]
+        results = self.sender.send_bulk(
+            recipients=recipients,
+            body="Bulk test message",
+            send_at=datetime(2026, 2, 1, 10, 0, 0),
+            max_workers=2
+        )
+
+        self.assertEqual([r["success"] for r in results], [True, False, True])
+        self.assertEqual(results[1], {
+            "phone": "invalid_number",
+            "success": False,
+            "error": "Invalid phone number format: invalid_number. Expected E.164 format.",
+        })
+
+    def test_send_bulk_records_stats(self):
+        """Test that send_bulk leaves aggregate counts in last_run_stats."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="scheduled")
+
+        self.sender.send_bulk(
+            recipients=["+11234567890", "invalid_number", "+11111111111"],
+            body="Bulk test message",
+            send_at=datetime(2026, 2, 1, 10, 0, 0)
+        )
+
+        stats = self.sender.last_run_stats
+        self.assertEqual((stats.total, stats.succeeded, stats.failed), (3, 2, 1))
+        self.assertEqual(stats.attempts, 2)
+        self.assertIsNone(stats.concurrency_limit)
+
+    def test_send_bulk_adaptive_concurrency_backs_off(self):
+        """Test that throttled sends shrink the adaptive in-flight limit."""
+        def create(**kwargs):
+            if kwargs["to"].endswith("5"):
+                raise TwilioRestException(status=429, uri="/Messages", msg="Too Many Requests")
+            return Mock(sid="SM123456", status="scheduled")
+
+        self.mock_client.messages.create.side_effect = create
+        controller = AdaptiveConcurrency(initial=4, maximum=8)
+
+        recipients = [f"+1123456789{i}" for i in range(10)]
+        results = self.sender.send_bulk(
+            recipients=recipients,
+            body="Bulk test message",
+            send_at=datetime(2026, 2, 1, 10, 0, 0),
+            concurrency=controller
+        )
+
+        self.assertEqual([r["phone"] for r in results], recipients)
+        self.assertEqual(results[5]["http_status"], 429)
+        stats = self.sender.last_run_stats
+        self.assertEqual(stats.failed, 1)
+        self.assertEqual(stats.concurrency_limit, controller.limit)
+        self.assertIn(2, [limit for _, limit in stats.concurrency_history])
+
+    def test_send_bulk_adaptive_concurrency_ignores_invalid_numbers(self):
+        """Test that recipients rejected locally are not latency samples."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="scheduled")
+        controller = AdaptiveConcurrency(initial=4, maximum=8)
+        controller.record = Mock(wraps=controller.record)
+
+        results = self.sender.send_bulk(
+            recipients=["invalid", "12345", "+abc", "+11234567890", "+11234567891"],
+            body="Bulk test message",
+            send_at=datetime(2026, 2, 1, 10, 0, 0),
+            concurrency=controller
+        )
+
+        self.assertEqual([r["success"] for r in results], [False, False, False, True, True])
+        self.assertEqual(controller.record.call_count, 2)
+
+    def test_send_bulk_accepts_generator(self):
+        """Test that recipients can be a lazily consumed generator."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="scheduled")
+        consumed = []
+
+        def recipients():
+            for i in range(5):
+                consumed.append(i)
+                yield f"+1123456789{i}"
+
+        for max_workers in (1, 2):
+            with self.subTest(max_workers=max_workers):
+                consumed.clear()
+                results = self.sender.send_bulk(
+                    recipients=recipients(),
+                    body="Bulk test message",
+                    send_at=datetime(2026, 2, 1, 10, 0, 0),
+                    max_workers=max_workers
+                )
+                self.assertEqual(consumed, [0, 1, 2, 3, 4])
+                self.assertEqual([r["phone"][-1] for r in results], list("01234"))
+
+    def test_send_bulk_resumes_from_journal(self):
+        """Test that a re-run with the same journal skips scheduled recipients."""
+        self.mock_client.messages.create.side_effect = [
+            Mock(sid="SM1", status="scheduled"),
+            TwilioRestException(status=400, uri="/Messages", msg="Invalid number"),
+            Mock(sid="SM2", status="scheduled"),
+        ]
+        recipients = ["+11234567890", "+10987654321"]
+
+        with TemporaryDirectory() as temp_dir:
+            journal_path = Path(temp_dir) / "journal.jsonl"
+            with SendJournal(journal_path) as journal:
+                first = self.sender.send_bulk(
+                    recipients=recipients,
+                    body="Bulk test message",
+                    send_at=datetime(2026, 2, 1, 10, 0, 0),
+                    journal=journal
+                )
+            with SendJournal(journal_path) as journal:
+                second = self.sender.send_bulk(
+                    recipients=recipients,
+                    body="Bulk test message",
+                    send_at=datetime(2026, 2, 1, 10, 0, 0),
+                    journal=journal
+                )
+
+        self.assertEqual([r["success"] for r in first], [True, False])
+        self.assertEqual(second[0], {
+            "phone": "+11234567890", "success": True, "skipped": "already scheduled"
+        })
+        self.assertEqual(second[1]["sid"], "SM2")
+        self.assertEqual(self.mock_client.messages.create.call_count, 3)
+        stats = self.sender.last_run_stats
+        self.assertEqual((stats.skipped, stats.succeeded, stats.failed), (1, 1, 0))
+
+    def test_send_bulk_streams_to_sink(self):
+        """Test that a sink receives every result and only stats are returned."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="scheduled")
+        received = []
+
+        for max_workers in (1, 3):
+            with self.subTest(max_workers=max_workers):
+                received.clear()
+                stats = self.sender.send_bulk(
+                    recipients=["+11234567890", "invalid_number", "+11111111111"],
+                    body="Bulk test message",
+                    send_at=datetime(2026, 2, 1, 10, 0, 0),
+                    max_workers=max_workers,
+                    sink=CallbackSink(received.append)
+                )
+                self.assertIs(stats, self.sender.last_run_stats)
+                self.assertEqual((stats.total, stats.succeeded, stats.failed), (3, 2, 1))
+                self.assertEqual(
+                    sorted(r["phone"] for r in received),
+                    ["+11111111111", "+11234567890", "invalid_number"],
+                )
+
+    def test_send_bulk_reports_progress(self):
+        """Test that send_bulk feeds the progress reporter instead of printing."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="scheduled")
+        progress = ProgressReporter(total=3, quiet=True)
+
+        with patch('builtins.print') as mock_print:
+            self.sender.send_bulk(
+                recipients=["+11234567890", "invalid_number", "+11111111111"],
+                body="Bulk test message",
+                send_at=datetime(2026, 2, 1, 10, 0, 0),
+                progress=progress
+            )
+
+        mock_print.assert_not_called()
+        snapshot = progress.snapshot()
+        self.assertEqual((snapshot["done"], snapshot["succeeded"], snapshot["failed"]), (3, 2, 1))
+
+    def test_send_bulk_converts_send_time_once(self):
+        """Test that the schedule is prepared once per run, not per recipient."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="scheduled")
+
+        with patch('scheduling.ZoneInfo', wraps=ZoneInfo) as mock_zoneinfo:
+            self.sender.send_bulk(
+                recipients=["+11234567890", "+10987654321", "+11111111111"],
+                body="Bulk test message",
+                send_at=datetime(2026, 2, 1, 10, 0, 0)
+            )
+
+        self.assertEqual(mock_zoneinfo.call_count, 2)
+        sent_at = {c[1]["send_at"] for c in self.mock_client.messages.create.call_args_list}
+        self.assertEqual(sent_at, {"2026-02-01T15:00:00Z"})
+
+    def test_send_bulk_local_time_groups_by_instant(self):
+        """Test that each timezone is converted once and sends are grouped by UTC instant."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="scheduled")
+
+        with patch('scheduling.ZoneInfo', wraps=ZoneInfo) as mock_zoneinfo:
+            results = send_bulk_local_time(
+                self.sender,
+                recipients=[
+                    "+14155550001", "+12125550001", ("+13125550001", "Europe/London"),
+                    "+14155550002", "+12125550002", "+15555550001",
+                ],
+                body="Bulk test message",
+                send_at=datetime(2026, 2, 1, 10, 0, 0),
+            )
+
+        # America/Los_Angeles, America/New_York and Europe/London, plus UTC each
+        self.assertEqual(mock_zoneinfo.call_count, 6)
+        self.assertEqual(
+            [r["phone"] for r in results],
+            ["+13125550001", "+12125550001", "+12125550002", "+15555550001",
+             "+14155550001", "+14155550002"],
+        )
+        sent_at = [c[1]["send_at"] for c in self.mock_client.messages.create.call_args_list]
+        self.assertEqual(sent_at, ["2026-02-01T10:00:00Z"] + ["2026-02-01T15:00:00Z"] * 3
+                         + ["2026-02-01T18:00:00Z"] * 2)
+
+    def test_send_bulk_invalid_max_workers(self):
+        """Test that max_workers below 1 is rejected."""
+        with self.assertRaises(ValueError):
+            self.sender.send_bulk(
+                recipients=["+11234567890"],
+                body="Bulk test message",
+                send_at=datetime(2026, 2, 1, 10, 0, 0),
+                max_workers=0
+            )
+
+
+class TestSpreadSending(unittest.TestCase):
+    """Test spreading bulk send times over a window."""
+
+    def setUp(self):
+        """Set up a sender with a mocked Twilio client."""
+        with NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump({
+                "account_sid": "test_sid",
+                "auth_token": "test_token",
+                "messaging_service_sid": "test_msg_sid"
+            }, f)
+            self.temp_config_path = Path(f.name)
+
+        self.mock_client_patcher = patch('send_sms.Client')
+        self.mock_client = MagicMock()
+        self.mock_client_patcher.start().return_value = self.mock_client
+        self.sender = SMSSender(config_path=self.temp_config_path)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.mock_client_patcher.stop()
+        self.temp_config_path.unlink()
+
+    def test_send_bulk_spreads_send_times_over_window(self):
+        """Test that a window gives recipients successive send times at its rate."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="scheduled")
+        send_at = datetime.now() + timedelta(days=1)
+        start = ScheduleSpec.from_local(send_at.replace(microsecond=0), "America/New_York")
+
+        results = self.sender.send_bulk(
+            recipients=["+11234567890", "+10987654321", "+11111111111", "+12222222222"],
+            body="Bulk test message",
+            send_at=start,
+            max_workers=2,
+            window=SendWindow(duration=60, rate=2),
+        )
+
+        self.assertTrue(all(r["success"] for r in results))
+        sent_at = sorted(
+            ScheduleSpec(c[1]["send_at"]).timestamp() - start.timestamp()
+            for c in self.mock_client.messages.create.call_args_list
+        )
+        self.assertEqual(sent_at, [0, 0, 1, 1])
+
+    def test_send_bulk_reports_sends_past_window(self):
+        """Test that recipients a window cannot hold are scheduled after it and counted."""
+        self.mock_client.messages.create.return_value = Mock(sid="SM123456", status="scheduled")
+        send_at = datetime.now() + timedelta(days=1)
+        start = ScheduleSpec.from_local(send_at.replace(microsecond=0), "America/New_York")
+
+        results = self.sender.send_bulk(
+            recipients=["+11234567890", "+10987654321", "+11111111111"],
+            body="Bulk test message",
+            send_at=start,
+            window=SendWindow(duration=2, rate=1),
+        )
+
+        self.assertEqual([r.get("past_window", False) for r in results], [False, False, True])
+        self.assertEqual(self.sender.last_run_stats.spread_overflow, 1)
+        self.assertEqual(
+            ScheduleSpec(self.mock_client.messages.create.call_args[1]["send_at"]).timestamp(),
+            start.timestamp() + 2,
+        )
+
+    def test_send_bulk_rejects_window_beyond_twilio_limit(self):
+        """Test that a window ending more than 35 days ahead is refused before sending."""
+        with self.assertRaises(ValueError):
+            self.sender.send_bulk(
+                recipients=["+11234567890"],
+                body="Bulk test message",
+                send_at=datetime.now() + timedelta(days=40),
+                window=SendWindow(duration=60, rate=2),
+            )
+        self.mock_client.messages.create.assert_not_called()
+
+
+class TestAsyncSending(unittest.IsolatedAsyncioTestCase):
+    """Test asyncio SMS sending functionality."""
+
+    def setUp(self):
+        """Set up test fixtures with mocked Twilio clients."""
+        self.config_data = {
+            "account_sid": "test_sid",
+            "auth_token": "test_token",
+            "messaging_service_sid": "test_msg_sid"
+        }
+
+        with NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(self.config_data, f)
+            self.temp_config_path = Path(f.name)
+
+        # Mock the Twilio Client and its aiohttp transport
+        self.mock_client_patcher = patch('send_sms.Client')
+        self.mock_client_class = self.mock_client_patcher.start()
+        self.mock_client = MagicMock()
+        self.mock_client.http_client.close = AsyncMock()
+        self.mock_client_class.return_value = self.mock_client
+        self.mock_http_patcher = patch('send_sms.AsyncTrackingHttpClient')
+        self.mock_http_patcher.start()
+
+        self.sender = SMSSender(config_path=self.temp_config_path)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.mock_http_patcher.stop()
+        self.mock_client_patcher.stop()
+        self.temp_config_path.unlink()
+
+    async def test_send_async_valid_message(self):
+        """Test sending a valid SMS message asynchronously."""
+        mock_message = Mock()
+        mock_message.sid = "SM123456"
+        mock_message.status = "scheduled"
+        self.mock_client.messages.create_async = AsyncMock(return_value=mock_message)
+
+        result = await self.sender.send_async(
+            to="+11234567890",
+            body="Test message",
+            send_at=datetime(2026, 2, 1, 10, 0, 0),
+        )
+
+        self.assertEqual(result, {"sid": "SM123456", "status": "scheduled", "attempts": 1})
+        call_kwargs = self.mock_client.messages.create_async.call_args[1]
+        self.assertEqual(call_kwargs["to"], "+11234567890")
+        self.assertEqual(call_kwargs["send_at"], "2026-02-01T15:00:00Z")
+        self.assertEqual(call_kwargs["schedule_type"], "fixed")
+
+        await self.sender.aclose()
+        self.mock_client.http_client.close.assert_awaited_once()
+
+    async def test_send_async_twilio_exception(self):
+        """Test that async Twilio API errors raise RuntimeError."""
+        self.mock_client.messages.create_async = AsyncMock(side_effect=TwilioRestException(
+            status=400,
+            uri="/Messages",
+            msg="Invalid phone number"
+        ))
+
+        with self.assertRaises(RuntimeError) as context:
+            await self.sender.send_async(
+                to="+11234567890",
+                body="Test message",
+                send_at=datetime(2026, 2, 1, 10, 0, 0),
+            )
+        self.assertIn("Failed to send SMS", str(context.exception))
+
+    async def test_send_bulk_async_order_and_limit(self):
+        """Test async bulk sending keeps order and bounds in-flight requests."""
+        active = [0]
+        peak = [0]
+
+        async def create(**kwargs):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.001 * (10 - int(kwargs["to"][-1])))
+            active[0] -= 1
+            if kwargs["to"].endswith("3"):
+                raise TwilioRestException(status=400, uri="/Messages", msg="Invalid number")
+            return Mock(sid=f"SM{kwargs['to'][-4:]}", status="scheduled")
+
+        self.mock_client.messages.create_async = create
+
+        recipients = [f"+1123456789{i}" for i in range(10)]
+        results = await self.sender.send_bulk_async(
+            recipients=recipients,
+            body="Bulk test message",
+            send_at=datetime(2026, 2, 1, 10, 0, 0),
+            max_concurrency=3,
+        )
+
+        self.assertEqual([r["phone"] for r in results], recipients)
+        self.assertLessEqual(peak[0], 3)
+        self.assertFalse(results[3]["success"])
+        self.assertIn("Failed to send SMS", results[3]["error"])
+        self.assertEqual(results[5]["sid"], "SM7895")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+"""
+Unit tests for sharding.py module.
+"""
+
+import json
+import unittest
+from datetime import datetime
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from unittest.mock import patch
+
+from fake_twilio import FakeTwilioServer
+from flow_control import TokenBucket
+from progress import BulkStats
+from send_sms import SMSSender
+from sharding import run_sharded, send_bulk_sharded, shard_of
+from sinks import CallbackSink
+
+
+class TestSharding(unittest.TestCase):
+    """Test sending across worker processes against the local fake API."""
+
+    def setUp(self):
+        """Write a config for a sender."""
+        config = {"account_sid": "AC1", "auth_token": "test_token", "messaging_service_sid": "MG1"}
+        with NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(config, f)
+            self.temp_config_path = Path(f.name)
+        self.send_at = datetime(2030, 1, 1, 10, 0, 0)
+        self.phones = [f"+1202555{i:04d}" for i in range(60)]
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.temp_config_path.unlink()
+
+    def test_shard_of_is_stable_and_in_range(self):
+        """Test that a number always maps to the same shard."""
+        shards = [shard_of(phone, 4) for phone in self.phones]
+        self.assertEqual(shards, [shard_of(phone, 4) for phone in self.phones])
+        self.assertEqual(set(shards), {0, 1, 2, 3})
+
+    def test_results_merged_in_recipient_order(self):
+        """Test that results from every shard come back in input order."""
+        with FakeTwilioServer() as server:
+            sender = SMSSender(config_path=self.temp_config_path, api_base_url=server.url)
+            results = send_bulk_sharded(
+                sender,
+                iter(self.phones + ["invalid"]),
+                "Hello",
+                self.send_at,
+                processes=3,
+                max_workers=4,
+                chunk_size=7,
+            )
+
+        self.assertEqual([r["phone"] for r in results], self.phones + ["invalid"])
+        self.assertTrue(all(r["success"] for r in results[:-1]))
+        self.assertFalse(results[-1]["success"])
+        self.assertEqual(server.stats["created"], 60)
+        self.assertEqual(sender.last_run_stats.total, 61)
+        self.assertEqual(sender.last_run_stats.failed, 1)
+
+    def test_sink_receives_ordered_results(self):
+        """Test that a sink gets results in input order and stats are returned."""
+        written = []
+        with FakeTwilioServer() as server:
+            sender = SMSSender(
+                config_path=self.temp_config_path, api_base_url=server.url, fast_transport=True
+            )
+            stats = send_bulk_sharded(
+                sender,
+                self.phones,
+                "Hello",
+                self.send_at,
+                processes=2,
+                sink=CallbackSink(written.append),
+            )
+
+        self.assertIsInstance(stats, BulkStats)
+        self.assertEqual(stats.succeeded, 60)
+        self.assertEqual([r["phone"] for r in written], self.phones)
+
+    def test_rate_limit_split_across_workers(self):
+        """Test that each worker gets an equal share of the rate and burst."""
+        sender = SMSSender(
+            config_path=self.temp_config_path, rate_limiter=TokenBucket(30, burst=10)
+        )
+        for processes, share in ((4, (7.5, 2)), (20, (1.5, 1))):
+            with self.subTest(processes=processes), \
+                    patch("sharding.run_sharded", return_value=iter([])) as mock_run:
+                send_bulk_sharded(sender, self.phones, "Hello", self.send_at, processes=processes)
+
+                self.assertEqual(mock_run.call_args.args[3]["rate_limit"], share)
+
+    def test_worker_failure_raises(self):
+        """Test that a worker that cannot start fails the run instead of hanging."""
+        sender = SMSSender(config_path=self.temp_config_path)
+        sender.config_path = Path("/nonexistent/config.json")
+        with self.assertRaises(RuntimeError):
+            send_bulk_sharded(sender, self.phones, "Hello", self.send_at, processes=2, chunk_size=1)
+
+    def test_invalid_processes(self):
+        """Test that the process count is validated."""
+        for processes in (0, 256):
+            with self.subTest(processes=processes), self.assertRaises(ValueError):
+                list(run_sharded(self.phones, processes, print, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
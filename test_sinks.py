@@ -0,0 +1,123 @@
+"""
+Unit tests for sinks.py module.
+"""
+
+import csv
+import json
+import sqlite3
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from sinks import CallbackSink, CsvSink, JsonlSink, SqliteSink
+
+RESULTS = [
+    {"phone": "+11234567890", "success": True, "sid": "SM1", "status": "scheduled", "attempts": 1},
+    {"phone": "+10987654321", "success": False, "error": "Failed to send SMS: boom",
+     "attempts": 3, "http_status": 503},
+    {"phone": "+12025550123", "success": True, "sid": "SM2", "status": "scheduled", "attempts": 1,
+     "past_window": True},
+]
+
+
+class TestSinks(unittest.TestCase):
+    """Test streaming result sinks."""
+
+    def setUp(self):
+        """Create a scratch directory for sink files."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        """Remove sink files."""
+        self.temp_dir.cleanup()
+
+    def test_jsonl_sink(self):
+        """Test that each result becomes one JSON line."""
+        path = self.dir / "results.jsonl"
+        sink = JsonlSink(path)
+        for result in RESULTS:
+            sink.write(result)
+        sink.close()
+
+        self.assertEqual([json.loads(line) for line in path.read_text().splitlines()], RESULTS)
+
+    def test_csv_sink(self):
+        """Test that results become CSV rows with blanks for missing keys."""
+        path = self.dir / "results.csv"
+        sink = CsvSink(path)
+        for result in RESULTS:
+            sink.write(result)
+        sink.close()
+
+        with path.open(newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]["sid"], "SM1")
+        self.assertEqual(rows[0]["error"], "")
+        self.assertEqual(rows[1]["http_status"], "503")
+        self.assertEqual([row["past_window"] for row in rows], ["", "", "True"])
+
+    def test_sqlite_sink_flushes_partial_batch(self):
+        """Test that rows beyond the last full batch are committed on close."""
+        path = self.dir / "results.db"
+        sink = SqliteSink(path, batch_size=1)
+        sink.write(RESULTS[0])
+        sink.batch_size = 10
+        sink.write(RESULTS[1])
+        sink.close()
+
+        with sqlite3.connect(path) as connection:
+            rows = connection.execute("SELECT phone, success, http_status FROM results").fetchall()
+        connection.close()
+        self.assertEqual(rows, [("+11234567890", 1, None), ("+10987654321", 0, 503)])
+
+    def test_sqlite_sink_keeps_past_window(self):
+        """Test that recipients scheduled past the spread window are marked."""
+        path = self.dir / "results.db"
+        sink = SqliteSink(path)
+        for result in RESULTS:
+            sink.write(result)
+        sink.close()
+
+        with sqlite3.connect(path) as connection:
+            rows = connection.execute("SELECT phone, past_window FROM results").fetchall()
+        connection.close()
+        self.assertEqual(rows, [
+            ("+11234567890", None), ("+10987654321", None), ("+12025550123", 1),
+        ])
+
+    def test_sqlite_sink_adds_past_window_to_existing_table(self):
+        """Test that a table created without the past_window column gains it."""
+        path = self.dir / "results.db"
+        with sqlite3.connect(path) as connection:
+            connection.execute(
+                "CREATE TABLE results (phone TEXT, success INTEGER, sid TEXT, status TEXT, "
+                "error TEXT, attempts INTEGER, http_status INTEGER, skipped TEXT)"
+            )
+        connection.close()
+        sink = SqliteSink(path)
+        sink.write(RESULTS[2])
+        sink.close()
+
+        with sqlite3.connect(path) as connection:
+            rows = connection.execute("SELECT phone, past_window FROM results").fetchall()
+        connection.close()
+        self.assertEqual(rows, [("+12025550123", 1)])
+
+    def test_sqlite_sink_rejects_bad_table_name(self):
+        """Test that table names are restricted to identifiers."""
+        with self.assertRaises(ValueError):
+            SqliteSink(self.dir / "results.db", table="results; DROP TABLE x")
+
+    def test_callback_sink(self):
+        """Test that results are passed to the callback."""
+        received = []
+        sink = CallbackSink(received.append)
+        for result in RESULTS:
+            sink.write(result)
+        sink.close()
+        self.assertEqual(received, RESULTS)
+
+
+if __name__ == "__main__":
+    unittest.main()
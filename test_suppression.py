@@ -0,0 +1,134 @@
+"""
+Unit tests for suppression.py module.
+"""
+
+import asyncio
+import json
+import unittest
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from fake_twilio import FakeTwilioServer
+from progress import OPTED_OUT
+from send_sms import SMSSender
+from sinks import CallbackSink
+from suppression import SuppressionList
+
+
+class TestSuppressionList(unittest.TestCase):
+    """Test the on-disk opt-out index."""
+
+    def setUp(self):
+        """Pick a list file in a temporary directory."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = Path(self.temp_dir.name) / "opt-outs.bin"
+
+    def tearDown(self):
+        """Remove the list file."""
+        self.temp_dir.cleanup()
+
+    def test_additions_persist_and_survive_compaction(self):
+        """Test that numbers are found before and after compacting and reopening."""
+        with SuppressionList(self.path) as suppression:
+            self.assertEqual(suppression.update(["+12025550003", "+12025550001", "bad"]), 2)
+            self.assertTrue(suppression.add("+12025550002"))
+            self.assertFalse(suppression.add("+12025550001"))
+        with SuppressionList(self.path) as suppression:
+            self.assertIn("+12025550001", suppression)
+            suppression.compact()
+            self.assertFalse(suppression.add("+12025550003"))
+            self.assertTrue(suppression.add("+12025550004"))
+        with SuppressionList(self.path) as suppression:
+            self.assertEqual(len(suppression), 4)
+            for phone in ("+12025550001", "+12025550002", "+12025550003", "+12025550004"):
+                self.assertIn(phone, suppression)
+            self.assertNotIn("+12025550005", suppression)
+            self.assertNotIn("not a number", suppression)
+            suppression.compact()
+            self.assertEqual(len(suppression), 4)
+
+    def test_filter_keeps_order(self):
+        """Test that filtering drops suppressed numbers and keeps the rest in order."""
+        with SuppressionList(self.path) as suppression:
+            suppression.update(f"+1202555{i:04d}" for i in range(0, 1000, 2))
+            suppression.compact()
+            phones = [f"+1202555{i:04d}" for i in range(1000)]
+            self.assertEqual(list(suppression.filter(phones)), phones[1::2])
+
+    def test_partial_trailing_write_is_dropped(self):
+        """Test that a value cut short by a crash is ignored on reopening."""
+        with SuppressionList(self.path) as suppression:
+            suppression.add("+12025550001")
+        with self.path.open("ab") as list_file:
+            list_file.write(b"\x01\x02\x03")
+        with SuppressionList(self.path) as suppression:
+            self.assertEqual(len(suppression), 1)
+            suppression.add("+12025550002")
+        with SuppressionList(self.path) as suppression:
+            self.assertIn("+12025550002", suppression)
+
+    def test_rejects_other_files(self):
+        """Test that a file that is not a suppression list is refused."""
+        self.path.write_text("+12025550001\n")
+        with self.assertRaises(ValueError):
+            SuppressionList(self.path)
+
+
+class TestSuppressedSending(unittest.TestCase):
+    """Test that SMSSender skips suppressed numbers without calling the API."""
+
+    def setUp(self):
+        """Write a config and a suppression list with one number."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        temp_path = Path(self.temp_dir.name)
+        (temp_path / "config.json").write_text(json.dumps(
+            {"account_sid": "ACopt", "auth_token": "token", "messaging_service_sid": "MGopt"}
+        ))
+        self.suppression = SuppressionList(temp_path / "opt-outs.bin")
+        self.suppression.add("+12025550002")
+        self.config_path = temp_path / "config.json"
+
+    def tearDown(self):
+        """Close the list and remove temporary files."""
+        self.suppression.close()
+        self.temp_dir.cleanup()
+
+    def test_bulk_skips_opted_out(self):
+        """Test that send_bulk reports suppressed numbers as skipped, not sent."""
+        recipients = ["+12025550001", "+12025550002", "+12025550003"]
+        with FakeTwilioServer() as server:
+            sender = SMSSender(
+                config_path=self.config_path, api_base_url=server.url, suppression=self.suppression
+            )
+            results = sender.send_bulk(recipients, "Hi", datetime(2030, 1, 1, 10, 0, 0))
+            stats = sender.send_bulk(
+                recipients, "Hi", datetime(2030, 1, 1, 10, 0, 0), max_workers=2,
+                sink=CallbackSink(lambda _result: None),
+            )
+
+        self.assertEqual(server.stats["created"], 4)
+        self.assertEqual(
+            results[1], {"phone": "+12025550002", "success": False, "skipped": OPTED_OUT}
+        )
+        self.assertTrue(results[0]["success"] and results[2]["success"])
+        self.assertEqual((stats.succeeded, stats.skipped, stats.opted_out), (2, 1, 1))
+
+    def test_single_and_async_sends_skip_opted_out(self):
+        """Test that send and send_bulk_async skip suppressed numbers too."""
+        with FakeTwilioServer() as server:
+            sender = SMSSender(
+                config_path=self.config_path, api_base_url=server.url, suppression=self.suppression
+            )
+            result = sender.send("+12025550002", "Hi", datetime(2030, 1, 1, 10, 0, 0))
+            async_results = asyncio.run(sender.send_bulk_async(
+                ["+12025550002"], "Hi", datetime(2030, 1, 1, 10, 0, 0)
+            ))
+
+        self.assertEqual(server.stats["requests"], 0)
+        self.assertEqual(result["skipped"], OPTED_OUT)
+        self.assertEqual(async_results[0]["skipped"], OPTED_OUT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,298 @@
+"""
+Unit tests for transport.py module.
+"""
+
+import asyncio
+import importlib.util
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from unittest.mock import patch
+from urllib.parse import parse_qs
+
+from twilio.base.exceptions import TwilioRestException
+
+from fake_twilio import FakeTwilioBehavior, FakeTwilioServer
+from flow_control import RetryPolicy
+from send_sms import SMSSender, ScheduleSpec, SendError
+from transport import (
+    ConnectionStats,
+    FastTransport,
+    HttpPoolConfig,
+    TransportError,
+    last_response,
+)
+
+HAVE_HTTPX = importlib.util.find_spec("httpx") is not None
+
+
+class TestFastTransport(unittest.TestCase):
+    """Test FastTransport against the local fake API."""
+
+    def test_create_returns_sid_and_status(self):
+        """Test that a created message's sid and status are parsed."""
+        with FakeTwilioServer() as server:
+            transport = FastTransport("ACtest", "test_token", "MGtest", server.url)
+            sid, status = transport.create("+12025551234", "Hello", "2030-01-01T15:00:00Z")
+
+        self.assertTrue(sid.startswith("SM"))
+        self.assertEqual(len(sid), 34)
+        self.assertEqual(status, "scheduled")
+        self.assertEqual(server.stats["created"], 1)
+
+    def test_form_encoding(self):
+        """Test that every field is form encoded, including reserved characters."""
+        body = "Sale: 50% off & free shipping = 1+1 ✓"
+        with FakeTwilioServer() as server:
+            transport = FastTransport("ACtest", "test_token", "MGtest", server.url)
+            pool = transport._pool  # pylint: disable=protected-access
+            with patch.object(pool, "urlopen", wraps=pool.urlopen) as mock_urlopen:
+                transport.create("+12025551234", body, "2030-01-01T15:00:00Z")
+                transport.create("+12025551235", body, "2030-01-01T15:00:00Z")
+
+        form = parse_qs(mock_urlopen.call_args.kwargs["body"].decode())
+        self.assertEqual(form, {
+            "MessagingServiceSid": ["MGtest"],
+            "ScheduleType": ["fixed"],
+            "SendAt": ["2030-01-01T15:00:00Z"],
+            "Body": [body],
+            "To": ["+12025551235"],
+        })
+
+    def test_unscheduled_create(self):
+        """Test that an empty send time creates the message without scheduling fields."""
+        with FakeTwilioServer() as server:
+            transport = FastTransport("ACtest", "test_token", "MGtest", server.url)
+            pool = transport._pool  # pylint: disable=protected-access
+            with patch.object(pool, "urlopen", wraps=pool.urlopen) as mock_urlopen:
+                _, status = transport.create("+12025551234", "Now", "")
+
+        self.assertEqual(status, "accepted")
+        form = parse_qs(mock_urlopen.call_args.kwargs["body"].decode())
+        self.assertEqual(set(form), {"MessagingServiceSid", "Body", "To"})
+
+    def test_error_raises_twilio_rest_exception(self):
+        """Test that error responses raise TwilioRestException like the SDK."""
+        with FakeTwilioServer(behavior=FakeTwilioBehavior(error_rate=1.0)) as server:
+            transport = FastTransport("ACtest", "test_token", "MGtest", server.url)
+            with self.assertRaises(TwilioRestException) as context:
+                transport.create("+12025551234", "Hello", "2030-01-01T15:00:00Z")
+
+        self.assertEqual(context.exception.status, 500)
+        self.assertEqual(context.exception.code, 20500)
+        self.assertEqual(context.exception.msg, "Internal Server Error")
+
+    def test_throttled_response_is_recorded(self):
+        """Test that the last response is recorded so Retry-After can be read."""
+        behavior = FakeTwilioBehavior(throttle_mps=0.001, retry_after=7)
+        with FakeTwilioServer(behavior=behavior) as server:
+            transport = FastTransport("ACtest", "test_token", "MGtest", server.url)
+            transport.create("+12025551234", "Hello", "2030-01-01T15:00:00Z")
+            with self.assertRaises(TwilioRestException) as context:
+                transport.create("+12025551235", "Hello", "2030-01-01T15:00:00Z")
+
+        self.assertEqual(context.exception.status, 429)
+        self.assertEqual(last_response.get().headers["Retry-After"], "7")
+
+
+class TestSenderFastTransport(unittest.TestCase):
+    """Test SMSSender with fast_transport enabled."""
+
+    def setUp(self):
+        """Write a config for a sender."""
+        with NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump({
+                "account_sid": "ACtest",
+                "auth_token": "test_token",
+                "messaging_service_sid": "MGtest"
+            }, f)
+            self.temp_config_path = Path(f.name)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.temp_config_path.unlink()
+
+    def test_send_is_drop_in(self):
+        """Test that send returns the same result shape as with the SDK."""
+        with FakeTwilioServer() as server:
+            sender = SMSSender(
+                config_path=self.temp_config_path, api_base_url=server.url, fast_transport=True
+            )
+            result = sender.send(
+                to="+12025551234",
+                body="Hello",
+                send_at=ScheduleSpec.from_local(datetime(2030, 1, 1, 10, 0, 0)),
+            )
+
+        self.assertEqual(set(result), {"sid", "status", "attempts"})
+        self.assertEqual(result["status"], "scheduled")
+        self.assertEqual(result["attempts"], 1)
+
+    def test_send_error_after_retries(self):
+        """Test that server errors are retried and then raised as SendError."""
+        with FakeTwilioServer(behavior=FakeTwilioBehavior(error_rate=1.0)) as server:
+            sender = SMSSender(
+                config_path=self.temp_config_path,
+                retry_policy=RetryPolicy(max_attempts=2, base_delay=0.001),
+                api_base_url=server.url,
+                fast_transport=True,
+            )
+            with self.assertRaises(SendError) as context:
+                sender.send(to="+12025551234", body="Hello", send_at=datetime(2030, 1, 1, 10))
+
+        self.assertEqual(context.exception.status, 500)
+        self.assertEqual(context.exception.attempts, 2)
+        self.assertEqual(server.stats["errors"], 2)
+
+
+class TestConnectionPooling(unittest.TestCase):
+    """Test pool configuration and connection reuse counters."""
+
+    def setUp(self):
+        """Write a config for a sender."""
+        with NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump({
+                "account_sid": "ACtest",
+                "auth_token": "test_token",
+                "messaging_service_sid": "MGtest"
+            }, f)
+            self.temp_config_path = Path(f.name)
+        self.send_at = ScheduleSpec.from_local(datetime(2030, 1, 1, 10, 0, 0))
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.temp_config_path.unlink()
+
+    def send_concurrently(self, sender, count=20, workers=4):
+        """Send count messages from workers threads."""
+        with ThreadPoolExecutor(workers) as executor:
+            list(executor.map(
+                lambda i: sender.send(to=f"+1202555{i:04d}", body="Hi", send_at=self.send_at),
+                range(count),
+            ))
+
+    def test_connection_stats(self):
+        """Test that reused is the requests that did not open a connection."""
+        stats = ConnectionStats(requests=10, new_connections=3) + ConnectionStats(requests=2)
+        self.assertEqual(stats, ConnectionStats(requests=12, new_connections=3))
+        self.assertEqual(stats.reused, 9)
+
+    def test_pool_bounds_connections(self):
+        """Test that the client opens at most pool_size connections and reuses them."""
+        for fast_transport in (False, True):
+            with self.subTest(fast_transport=fast_transport), FakeTwilioServer() as server:
+                sender = SMSSender(
+                    config_path=self.temp_config_path,
+                    api_base_url=server.url,
+                    fast_transport=fast_transport,
+                    http_pool=HttpPoolConfig(pool_size=2),
+                )
+                self.send_concurrently(sender)
+                stats = sender.connection_stats()
+
+                self.assertEqual(stats.requests, 20)
+                self.assertLessEqual(stats.new_connections, 2)
+                self.assertGreaterEqual(stats.reused, 18)
+
+    def test_keep_alive_disabled(self):
+        """Test that every request opens a new connection without keep-alive."""
+        for fast_transport in (False, True):
+            with self.subTest(fast_transport=fast_transport), FakeTwilioServer() as server:
+                sender = SMSSender(
+                    config_path=self.temp_config_path,
+                    api_base_url=server.url,
+                    fast_transport=fast_transport,
+                    http_pool=HttpPoolConfig(pool_size=1, keep_alive=False),
+                )
+                self.send_concurrently(sender, count=5, workers=1)
+
+                self.assertEqual(sender.connection_stats().new_connections, 5)
+
+    def test_timeouts(self):
+        """Test that the read timeout bounds a slow response."""
+        for fast_transport in (False, True):
+            behavior = FakeTwilioBehavior(latency=0.5)
+            with self.subTest(fast_transport=fast_transport), \
+                    FakeTwilioServer(behavior=behavior) as server:
+                sender = SMSSender(
+                    config_path=self.temp_config_path,
+                    api_base_url=server.url,
+                    fast_transport=fast_transport,
+                    http_pool=HttpPoolConfig(read_timeout=0.05),
+                )
+                with self.assertRaises(TransportError) as context:
+                    sender.send(to="+12025551234", body="Hi", send_at=self.send_at)
+
+                self.assertIn("timed out", str(context.exception).lower())
+
+    def test_bulk_timeouts_are_failures(self):
+        """Test that send_bulk reports timed-out requests as failed recipients."""
+        for fast_transport in (False, True):
+            behavior = FakeTwilioBehavior(latency=0.5)
+            with self.subTest(fast_transport=fast_transport), \
+                    FakeTwilioServer(behavior=behavior) as server:
+                sender = SMSSender(
+                    config_path=self.temp_config_path,
+                    api_base_url=server.url,
+                    fast_transport=fast_transport,
+                    http_pool=HttpPoolConfig(read_timeout=0.05),
+                )
+                results = sender.send_bulk(
+                    ["+12025551234", "+12025551235"], "Hi", self.send_at, max_workers=2
+                )
+
+                self.assertEqual([result["success"] for result in results], [False, False])
+                self.assertEqual([result["attempts"] for result in results], [1, 1])
+                self.assertIn("timed out", results[0]["error"].lower())
+                self.assertEqual(sender.last_run_stats.failed, 2)
+
+    def test_async_pool(self):
+        """Test that the async client is pooled and counted too."""
+        async def run(sender):
+            await asyncio.gather(*(
+                sender.send_async(to=f"+1202555{i:04d}", body="Hi", send_at=self.send_at)
+                for i in range(20)
+            ))
+            stats = sender.connection_stats()
+            await sender.aclose()
+            return stats
+
+        with FakeTwilioServer() as server:
+            sender = SMSSender(
+                config_path=self.temp_config_path,
+                api_base_url=server.url,
+                http_pool=HttpPoolConfig(pool_size=3),
+            )
+            stats = asyncio.run(run(sender))
+
+        self.assertEqual(stats.requests, 20)
+        self.assertLessEqual(stats.new_connections, 3)
+
+    def test_http2_requires_fast_transport(self):
+        """Test that HTTP/2 is rejected for the SDK client."""
+        with self.assertRaises(ValueError):
+            SMSSender(config_path=self.temp_config_path, http_pool=HttpPoolConfig(http2=True))
+
+    @unittest.skipUnless(HAVE_HTTPX, "httpx is not installed")
+    def test_http2_transport(self):
+        """Test the httpx-backed fast transport end to end."""
+        with FakeTwilioServer() as server:
+            sender = SMSSender(
+                config_path=self.temp_config_path,
+                api_base_url=server.url,
+                fast_transport=True,
+                http_pool=HttpPoolConfig(pool_size=2, http2=True),
+            )
+            # The fake server has no TLS, so httpx falls back to HTTP/1.1, whose
+            # connection sharing in http2 mode is unreliable across threads
+            self.send_concurrently(sender, workers=1)
+            stats = sender.connection_stats()
+
+        self.assertEqual(stats, ConnectionStats(requests=20, new_connections=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
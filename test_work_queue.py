@@ -0,0 +1,250 @@
+"""
+Unit tests for work_queue.py module.
+"""
+
+import json
+import threading
+import time
+import unittest
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+
+from fake_twilio import FakeTwilioBehavior, FakeTwilioServer
+from journal import SendJournal
+from progress import ProgressReporter
+from send_sms import SMSSender
+from sinks import CallbackSink
+from work_queue import QueueDrain, SqliteWorkQueue, send_from_queue
+
+
+class TestSqliteWorkQueue(unittest.TestCase):
+    """Test leasing and acking recipients."""
+
+    def setUp(self):
+        """Create a queue in a temporary directory."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = Path(self.temp_dir.name) / "queue.db"
+        self.now = 1000.0
+        self.queue = SqliteWorkQueue(self.path, lease_seconds=60, clock=lambda: self.now)
+
+    def tearDown(self):
+        """Close the queue and remove its file."""
+        self.queue.close()
+        self.temp_dir.cleanup()
+
+    def test_add_ignores_queued_numbers(self):
+        """Test that adding the same numbers again queues nothing new."""
+        self.assertEqual(self.queue.add(["+12025550001", "+12025550002"]), 2)
+        self.assertEqual(self.queue.add(["+12025550002", "+12025550003"], batch_size=1), 1)
+        self.assertEqual(self.queue.counts()["pending"], 3)
+
+    def test_leases_are_disjoint(self):
+        """Test that two owners never lease the same recipient."""
+        self.queue.add(f"+1202555{i:04d}" for i in range(5))
+        first = self.queue.lease("a", 3)
+        second = self.queue.lease("b", 3)
+
+        self.assertEqual(first, ["+12025550000", "+12025550001", "+12025550002"])
+        self.assertEqual(second, ["+12025550003", "+12025550004"])
+        self.assertEqual(self.queue.lease("c", 3), [])
+        self.assertEqual(self.queue.remaining(), 5)
+
+    def test_ack_marks_done_or_failed(self):
+        """Test that acked recipients are finished with their results stored."""
+        self.queue.add(["+12025550001", "+12025550002"])
+        self.queue.lease("a", 2)
+        accepted = self.queue.ack("a", [
+            {"phone": "+12025550001", "success": True, "sid": "SM1"},
+            {"phone": "+12025550002", "success": False, "error": "invalid"},
+        ])
+
+        self.assertEqual(accepted, 2)
+        self.assertEqual(self.queue.counts(), {"pending": 0, "leased": 0, "done": 1, "failed": 1})
+        self.assertEqual(self.queue.lease("a", 2), [])
+
+    def test_expired_lease_is_leased_again(self):
+        """Test that a recipient whose worker died is handed to another."""
+        self.queue.add(["+12025550001"])
+        self.queue.lease("a", 1)
+        self.now += 61
+
+        self.assertEqual(self.queue.lease("b", 1), ["+12025550001"])
+        # The first owner's late ack is rejected rather than overwriting b's lease
+        self.assertEqual(self.queue.ack("a", [{"phone": "+12025550001", "success": True}]), 0)
+        self.assertEqual(self.queue.ack("b", [{"phone": "+12025550001", "success": True}]), 1)
+
+    def test_ack_after_expiry_without_new_lease(self):
+        """Test that a late ack still counts if nobody else took the lease."""
+        self.queue.add(["+12025550001"])
+        self.queue.lease("a", 1)
+        self.now += 61
+
+        self.assertEqual(self.queue.ack("a", [{"phone": "+12025550001", "success": True}]), 1)
+        self.assertEqual(self.queue.counts()["done"], 1)
+
+    def test_renew_extends_only_own_leases(self):
+        """Test that renewing keeps a lease from expiring unless it was already taken."""
+        self.queue.add(["+12025550001", "+12025550002"])
+        self.queue.lease("a", 2)
+        self.now += 50
+        self.assertEqual(self.queue.renew("a", ["+12025550001"]), {"+12025550001"})
+        self.now += 20
+
+        self.assertEqual(self.queue.lease("b", 2), ["+12025550002"])
+        self.assertEqual(self.queue.renew("a", ["+12025550001", "+12025550002"]), {"+12025550001"})
+
+    def test_drain_drops_recipients_whose_lease_was_lost(self):
+        """Test that a drain does not yield recipients another worker took over."""
+        self.queue.add(["+12025550001", "+12025550002", "+12025550003"])
+        drain = QueueDrain(self.queue, owner="a", batch_size=3, renew_interval=0.05)
+        recipients = drain.recipients()
+        self.assertEqual(next(recipients), "+12025550001")
+        self.now += 61
+        self.queue.lease("b", 3)
+        time.sleep(0.2)
+
+        self.assertEqual(list(recipients), [])
+        self.assertEqual(drain.released, 2)
+        drain.close()
+
+
+class TestQueueDrain(unittest.TestCase):
+    """Test draining a shared queue with SMSSender against the local fake API."""
+
+    def setUp(self):
+        """Write a config and create an empty queue file."""
+        self.temp_dir = TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = Path(self.temp_dir.name) / "queue.db"
+        with NamedTemporaryFile(mode='w', suffix='.json', dir=self.temp_dir.name,
+                                delete=False) as f:
+            json.dump({"account_sid": "AC", "auth_token": "t", "messaging_service_sid": "MG"}, f)
+            self.config_path = Path(f.name)
+        self.send_at = datetime(2030, 1, 1, 10, 0, 0)
+
+    def tearDown(self):
+        """Remove temporary files."""
+        self.temp_dir.cleanup()
+
+    def drain(  # pylint: disable=too-many-arguments
+        self, server, totals, lease_seconds=60, max_workers=4, *, journal=None, progress=None,
+        **drain_kwargs
+    ):
+        """Drain the queue from a new sender and queue connection."""
+        sender = SMSSender(config_path=self.config_path, api_base_url=server.url)
+        with SqliteWorkQueue(self.path, lease_seconds=lease_seconds) as queue:
+            drain = QueueDrain(queue, **drain_kwargs)
+            stats = send_from_queue(
+                sender, drain, "Hello", self.send_at, max_workers=max_workers,
+                journal=journal, progress=progress, poll_interval=0.05
+            )
+            drain.close()
+            totals.append(stats.total)
+            return drain
+
+    def test_workers_share_the_queue_without_duplicates(self):
+        """Test that concurrent workers send every recipient exactly once."""
+        phones = [f"+1202555{i:04d}" for i in range(300)]
+        with SqliteWorkQueue(self.path) as queue:
+            queue.add(phones)
+
+        totals: list[int] = []
+        with FakeTwilioServer() as server:
+            workers = [
+                threading.Thread(
+                    target=self.drain, args=(server, totals), kwargs={"batch_size": 25}
+                )
+                for _ in range(3)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        self.assertEqual(server.stats["created"], 300)
+        self.assertEqual(sum(totals), 300)
+        with SqliteWorkQueue(self.path) as queue:
+            self.assertEqual(queue.counts()["done"], 300)
+
+    def test_waits_for_and_takes_over_expired_leases(self):
+        """Test that a worker picks up recipients leased by one that died."""
+        with SqliteWorkQueue(self.path, lease_seconds=0.2) as queue:
+            queue.add(["+12025550001", "+12025550002", "+12025550003"])
+            queue.lease("dead-worker", 2)
+
+        with FakeTwilioServer() as server:
+            drain = self.drain(server, [], lease_seconds=0.2, owner="survivor")
+
+        self.assertEqual(server.stats["created"], 3)
+        self.assertEqual(drain.lost_leases, 0)
+
+    def test_progress_finishes_once(self):
+        """Test that rounds spent waiting on other workers' leases write no final reports."""
+        with SqliteWorkQueue(self.path, lease_seconds=0.2) as queue:
+            queue.add(["+12025550001", "+12025550002", "+12025550003"])
+            queue.lease("dead-worker", 2)
+        stream = StringIO()
+        progress = ProgressReporter(stream=stream, interval=60)
+
+        with FakeTwilioServer() as server:
+            self.drain(server, [], lease_seconds=0.2, progress=progress)
+
+        reports = stream.getvalue().splitlines()
+        self.assertEqual(len(reports), 1)
+        self.assertEqual(json.loads(reports[0])["done"], 3)
+
+    def test_journal_skips_completed_recipients(self):
+        """Test that recipients the journal shows as scheduled are acked without sending."""
+        with SqliteWorkQueue(self.path) as queue:
+            queue.add(["+12025550001", "+12025550002"])
+        journal_path = Path(self.temp_dir.name) / "journal.jsonl"
+        with SendJournal(journal_path) as journal:
+            journal.record({"phone": "+12025550001", "success": True})
+
+        with FakeTwilioServer() as server, SendJournal(journal_path) as journal:
+            self.drain(server, [], journal=journal)
+
+        self.assertEqual(server.stats["created"], 1)
+        with SqliteWorkQueue(self.path) as queue:
+            self.assertEqual(queue.counts()["done"], 2)
+        with SendJournal(journal_path) as journal:
+            self.assertEqual(len(journal.completed), 2)
+
+    def test_slow_batch_keeps_its_lease(self):
+        """Test that a batch taking longer than the lease to send is not leased twice."""
+        phones = [f"+1202555{i:04d}" for i in range(10)]
+        with SqliteWorkQueue(self.path) as queue:
+            queue.add(phones)
+        totals: list[int] = []
+
+        with FakeTwilioServer(behavior=FakeTwilioBehavior(latency=0.05)) as server:
+            slow = threading.Thread(target=self.drain, args=(server, totals), kwargs={
+                "lease_seconds": 0.2, "batch_size": 10, "renew_interval": 0.05, "max_workers": 1,
+            })
+            slow.start()
+            # Starts once the slow worker's first lease would have expired
+            time.sleep(0.3)
+            other = self.drain(server, totals, lease_seconds=0.2, renew_interval=0.05)
+            slow.join()
+
+        self.assertEqual(server.stats["created"], 10)
+        self.assertEqual(sorted(totals), [0, 10])
+        self.assertEqual(other.lost_leases, 0)
+
+    def test_results_pass_through_to_sink(self):
+        """Test that results also reach a downstream sink."""
+        with SqliteWorkQueue(self.path) as queue:
+            queue.add(["+12025550001", "invalid"])
+        written: list[dict] = []
+
+        with FakeTwilioServer() as server:
+            self.drain(server, [], sink=CallbackSink(written.append))
+
+        self.assertEqual({r["phone"] for r in written}, {"+12025550001", "invalid"})
+        with SqliteWorkQueue(self.path) as queue:
+            self.assertEqual(queue.counts()["failed"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
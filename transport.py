@@ -0,0 +1,407 @@
+"""
+HTTP clients and transports for Twilio requests, with pooling and connection counters.
+"""
+
+import asyncio
+import json
+import re
+import threading
+from base64 import b64encode
+from contextvars import ContextVar
+from dataclasses import dataclass
+from urllib.parse import quote_plus, urlencode
+
+import urllib3
+from aiohttp import ClientError, ClientSession, TCPConnector, TraceConfig
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from twilio.base.exceptions import TwilioRestException
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.http.http_client import TwilioHttpClient
+from twilio.http.response import Response
+
+TWILIO_API_URL = "https://api.twilio.com"
+
+# Response to the current thread's or task's latest Twilio request, used to read
+# Retry-After since TwilioRestException does not carry response headers
+last_response: ContextVar[Response | None] = ContextVar("last_twilio_response", default=None)
+
+# Top-level "sid" and "status" string fields of a Message resource. The leading
+# quote keeps "account_sid" and "messaging_service_sid" from matching.
+_SID_FIELD = re.compile(rb'"sid"\s*:\s*"([^"]+)"')
+_STATUS_FIELD = re.compile(rb'"status"\s*:\s*"([^"]+)"')
+
+
+class TransportError(RuntimeError):
+    """
+    A request to Twilio got no response, e.g. it timed out or the connection dropped.
+
+    The message may or may not have been created, so it is not retried.
+    """
+
+    def __init__(self, error: Exception):
+        super().__init__(f"Request to Twilio failed: {type(error).__name__}: {error}")
+        # Set by SMSSender to the attempt that failed
+        self.attempts = 1
+
+
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    """Connection pool and timeout settings for the HTTP clients talking to Twilio."""
+
+    # Connections kept open; match it to the number of concurrent sends so
+    # none are opened and thrown away under load
+    pool_size: int = 10
+    # Reuse connections between requests instead of closing each one
+    keep_alive: bool = True
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    # Negotiate HTTP/2 (FastTransport only, the SDK clients ignore it; requires
+    # httpx with h2 installed)
+    http2: bool = False
+
+
+@dataclass(frozen=True)
+class ConnectionStats:
+    """How many requests went out and how many connections were opened for them."""
+
+    requests: int = 0
+    new_connections: int = 0
+
+    @property
+    def reused(self) -> int:
+        """Requests sent over an already open connection."""
+        return max(0, self.requests - self.new_connections)
+
+    def __add__(self, other: "ConnectionStats") -> "ConnectionStats":
+        return ConnectionStats(
+            self.requests + other.requests, self.new_connections + other.new_connections
+        )
+
+
+class _ConnectCounter:  # pylint: disable=too-few-public-methods
+    """Thread-safe count of TCP connections opened."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def increment(self) -> None:
+        """Count one connection."""
+        with self._lock:
+            self.count += 1
+
+
+def _counting_pool_class(pool_class: type[HTTPConnectionPool], counter: _ConnectCounter) -> type:
+    """
+    Subclass a urllib3 pool class so its connections count every connect().
+
+    urllib3 reconnects a pooled connection object after the server closes it, so
+    its own num_connections undercounts the TCP connections actually opened.
+    """
+
+    class CountingConnection(pool_class.ConnectionCls):  # pylint: disable=too-few-public-methods
+        """Connection that reports each (re)connect."""
+
+        def connect(self) -> None:
+            """Open the socket and count it."""
+            super().connect()
+            counter.increment()
+
+    class CountingPool(pool_class):  # pylint: disable=too-few-public-methods
+        """Pool that opens CountingConnections."""
+
+        ConnectionCls = CountingConnection
+
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    """requests adapter whose pools count the TCP connections they open."""
+
+    def __init__(self, pool_maxsize: int):
+        self.counter = _ConnectCounter()
+        # Block rather than open extra connections that are discarded after one use
+        super().__init__(pool_connections=1, pool_maxsize=pool_maxsize, pool_block=True)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool_class(HTTPConnectionPool, self.counter),
+            "https": _counting_pool_class(HTTPSConnectionPool, self.counter),
+        }
+
+    def connection_stats(self) -> ConnectionStats:
+        """Return requests sent and connections opened through this adapter."""
+        pools = self.poolmanager.pools
+        requests = sum(pools[key].num_requests for key in pools.keys())
+        return ConnectionStats(requests, self.counter.count)
+
+
+class TrackingHttpClient(TwilioHttpClient):
+    """TwilioHttpClient that records each response for the calling context."""
+
+    def __init__(self, pool: HttpPoolConfig | None = None):
+        """
+        Initialize the client.
+
+        Args:
+            pool: Pool size, keep-alive and timeouts (default: the SDK's own)
+        """
+        super().__init__()
+        self._adapter: _CountingAdapter | None = None
+        if pool is None:
+            return
+        self._adapter = _CountingAdapter(pool.pool_size)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        if not pool.keep_alive:
+            self.session.headers["Connection"] = "close"
+        # requests takes a (connect, read) pair; the base class only accepts a number
+        self.timeout = (pool.connect_timeout, pool.read_timeout)
+
+    def connection_stats(self) -> ConnectionStats:
+        """Return request and new-connection counts (zero unless a pool was configured)."""
+        if self._adapter is None:
+            return ConnectionStats()
+        return self._adapter.connection_stats()
+
+    def request(self, *request_args, **request_kwargs) -> Response:
+        try:
+            response = super().request(*request_args, **request_kwargs)
+        except RequestException as e:
+            raise TransportError(e) from e
+        last_response.set(response)
+        return response
+
+
+class AsyncTrackingHttpClient(AsyncTwilioHttpClient):
+    """AsyncTwilioHttpClient that records each response for the calling task."""
+
+    def __init__(self, pool: HttpPoolConfig | None = None):
+        """
+        Initialize the client; create it inside a running event loop.
+
+        Args:
+            pool: Pool size, keep-alive and timeouts (default: the SDK's own)
+        """
+        self._stats = ConnectionStats()
+        self._total_timeout: float | None = None
+        if pool is None:
+            super().__init__()
+            return
+        super().__init__(pool_connections=False)
+        trace = TraceConfig()
+        trace.on_request_start.append(self._count_request)
+        trace.on_connection_create_end.append(self._count_connection)
+        self.session = ClientSession(
+            connector=TCPConnector(limit=pool.pool_size, force_close=not pool.keep_alive),
+            trace_configs=[trace],
+        )
+        # The base class passes its per-request timeout (None by default) as a total
+        # that replaces any session timeout, so the limit is applied per request
+        self._total_timeout = pool.connect_timeout + pool.read_timeout
+
+    async def _count_request(self, *_trace_args) -> None:
+        self._stats += ConnectionStats(requests=1)
+
+    async def _count_connection(self, *_trace_args) -> None:
+        self._stats += ConnectionStats(new_connections=1)
+
+    def connection_stats(self) -> ConnectionStats:
+        """Return request and new-connection counts (zero unless a pool was configured)."""
+        return self._stats
+
+    async def request(self, *request_args, **request_kwargs) -> Response:
+        if request_kwargs.get("timeout") is None and self._total_timeout is not None:
+            request_kwargs["timeout"] = self._total_timeout
+        try:
+            response = await super().request(*request_args, **request_kwargs)
+        except (ClientError, asyncio.TimeoutError) as e:
+            raise TransportError(e) from e
+        last_response.set(response)
+        return response
+
+
+class FastTransport:  # pylint: disable=too-many-instance-attributes
+    """
+    Minimal Messages.create client on a keep-alive connection pool.
+
+    Skips the Twilio SDK's generic request pipeline: the Basic auth header and the
+    form fields that are the same for every message are encoded once, and only
+    sid and status are read from the response. Errors are raised as
+    TwilioRestException like the SDK does, and requests without a response as
+    TransportError like the tracking SDK clients, so callers handle both the
+    same way.
+    Requests go over urllib3, or over httpx when HTTP/2 is enabled.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        account_sid: str,
+        auth_token: str,
+        messaging_service_sid: str,
+        base_url: str = TWILIO_API_URL,
+        *,
+        pool: HttpPoolConfig | None = None,
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            account_sid: Twilio account SID
+            auth_token: Twilio auth token
+            messaging_service_sid: Messaging service every message is sent from
+            base_url: API root (default: https://api.twilio.com)
+            pool: Pool size, keep-alive, timeouts and HTTP/2 (default: HttpPoolConfig())
+        """
+        pool = pool or HttpPoolConfig()
+        self._base_url = base_url
+        self._path = f"/2010-04-01/Accounts/{account_sid}/Messages.json"
+        credentials = b64encode(f"{account_sid}:{auth_token}".encode()).decode()
+        self._headers = {
+            "Authorization": f"Basic {credentials}",
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Accept": "application/json",
+        }
+        if not pool.keep_alive:
+            self._headers["Connection"] = "close"
+        if pool.http2:
+            self._pool = None
+            self._http2 = _Http2Client(base_url, pool)
+        else:
+            url = urllib3.util.parse_url(base_url)
+            pool_class = HTTPSConnectionPool if url.scheme == "https" else HTTPConnectionPool
+            self._counter = _ConnectCounter()
+            self._pool = _counting_pool_class(pool_class, self._counter)(
+                url.host,
+                url.port,
+                maxsize=pool.pool_size,
+                block=True,
+                timeout=urllib3.Timeout(connect=pool.connect_timeout, read=pool.read_timeout),
+            )
+            self._http2 = None
+        self._constant_form = urlencode(
+            {"MessagingServiceSid": messaging_service_sid, "ScheduleType": "fixed"}
+        )
+        self._unscheduled_form = urlencode({"MessagingServiceSid": messaging_service_sid})
+        # Most recent (value, encoded form field) for the per-run constant fields
+        self._send_at_field = ("", "")
+        self._body_field = ("", "")
+
+    def create(self, to: str, body: str, send_at_utc: str) -> tuple[str, str]:
+        """
+        Schedule a message.
+
+        Args:
+            to: Recipient phone number (E.164 format)
+            body: Message content
+            send_at_utc: Send time as a UTC ISO 8601 string, or "" to send it
+                unscheduled
+
+        Returns:
+            The message's sid and status
+
+        Raises:
+            TwilioRestException: If Twilio answers with an error status
+            TransportError: If no response arrives
+        """
+        body_field = self._body_field
+        if body_field[0] != body:
+            body_field = self._body_field = (body, f"Body={quote_plus(body)}")
+        if send_at_utc:
+            send_at_field = self._send_at_field
+            if send_at_field[0] != send_at_utc:
+                send_at_field = self._send_at_field = (
+                    send_at_utc, f"SendAt={quote_plus(send_at_utc)}"
+                )
+            form = f"{self._constant_form}&{send_at_field[1]}&{body_field[1]}&To={quote_plus(to)}"
+        else:
+            form = f"{self._unscheduled_form}&{body_field[1]}&To={quote_plus(to)}"
+
+        if self._http2 is not None:
+            status_code, headers, data = self._http2.post(self._path, form.encode(), self._headers)
+        else:
+            try:
+                response = self._pool.urlopen(
+                    "POST", self._path, body=form.encode(), headers=self._headers, retries=False
+                )
+            except urllib3.exceptions.HTTPError as e:
+                raise TransportError(e) from e
+            status_code, headers, data = response.status, response.headers, response.data
+        last_response.set(Response(status_code, "", headers))
+        if status_code >= 400:
+            raise self._error(status_code, data)
+
+        sid = _SID_FIELD.search(data)
+        status = _STATUS_FIELD.search(data)
+        if sid is None or status is None:
+            payload = json.loads(data)
+            return payload["sid"], payload["status"]
+        return sid.group(1).decode(), status.group(1).decode()
+
+    def connection_stats(self) -> ConnectionStats:
+        """Return how many requests were sent and connections opened so far."""
+        if self._http2 is not None:
+            return self._http2.stats
+        return ConnectionStats(self._pool.num_requests, self._counter.count)
+
+    def _error(self, status: int, data: bytes) -> TwilioRestException:
+        """Build the exception the SDK would raise for an error response."""
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            payload = {}
+        return TwilioRestException(
+            status=status,
+            uri=self._base_url + self._path,
+            msg=payload.get("message", "Unable to create record"),
+            code=payload.get("code"),
+            method="POST",
+            details=payload.get("details"),
+        )
+
+
+class _Http2Client:  # pylint: disable=too-few-public-methods
+    """httpx client for FastTransport, counting connections through trace events."""
+
+    def __init__(self, base_url: str, pool: HttpPoolConfig):
+        try:
+            import httpx  # pylint: disable=import-outside-toplevel,import-error
+        except ImportError as e:
+            raise ImportError(
+                "HTTP/2 requires httpx with h2: pip install 'httpx[http2]'"
+            ) from e
+        self._client = httpx.Client(
+            base_url=base_url,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=pool.pool_size,
+                max_keepalive_connections=pool.pool_size if pool.keep_alive else 0,
+            ),
+            timeout=httpx.Timeout(
+                pool.read_timeout, connect=pool.connect_timeout, pool=None
+            ),
+        )
+        self._extensions = {"trace": self._trace}
+        self._transport_errors = httpx.TransportError
+        self.stats = ConnectionStats()
+        self._lock = threading.Lock()
+
+    def _trace(self, event: str, _info: dict) -> None:
+        if event == "connection.connect_tcp.complete":
+            with self._lock:
+                self.stats += ConnectionStats(new_connections=1)
+
+    def post(self, path: str, body: bytes, headers: dict) -> tuple[int, dict, bytes]:
+        """Send a POST and return its status, headers and body."""
+        try:
+            response = self._client.post(
+                path, content=body, headers=headers, extensions=self._extensions
+            )
+        except self._transport_errors as e:
+            raise TransportError(e) from e
+        with self._lock:
+            self.stats += ConnectionStats(requests=1)
+        return response.status_code, response.headers, response.content
@@ -0,0 +1,427 @@
+"""
+Shared recipient queue so several processes or machines can drain one campaign.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+from flow_control import AdaptiveConcurrency
+from journal import SendJournal
+from progress import BulkStats, ProgressReporter
+from scheduling import ScheduleSpec
+from sinks import ResultSink
+
+# Only for annotations; send_sms imports this module for its CLI
+if TYPE_CHECKING:
+    from send_sms import SMSSender
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """
+    Open a SQLite database shared between threads and processes.
+
+    Transactions are explicit (see transaction()), so writers can take the
+    write lock up front.
+    """
+    connection = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    return connection
+
+
+def transaction(
+    connection: sqlite3.Connection,
+    lock: threading.Lock,
+    work: Callable[[sqlite3.Connection], object],
+) -> object:
+    """Run work inside a write transaction, holding lock."""
+    with lock:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            outcome = work(connection)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return outcome
+
+
+class WorkQueue(Protocol):
+    """
+    Backend holding a campaign's recipients for workers to lease and ack.
+
+    A lease hands recipients to one owner until it expires; a recipient whose
+    lease expires without an ack is leased again, so none is lost if a worker dies.
+    """
+
+    def lease(self, owner: str, count: int) -> list[str]:
+        """Lease up to count pending or expired recipients to owner."""
+
+    def ack(self, owner: str, results: list[dict]) -> int:
+        """
+        Mark leased recipients finished with their send_bulk results.
+
+        Returns how many were still leased to owner; the rest had expired and
+        been leased to someone else.
+        """
+
+    def renew(self, owner: str, phones: Iterable[str]) -> set[str]:
+        """
+        Extend owner's leases on phones by the full lease time.
+
+        Returns the phones still leased to owner; the rest had expired and
+        been leased to someone else, or were acked.
+        """
+
+    def remaining(self) -> int:
+        """Count recipients not yet acked, whether pending or leased."""
+
+
+class SqliteWorkQueue:  # pylint: disable=too-many-instance-attributes
+    """
+    WorkQueue in a SQLite database file.
+
+    Several processes on one machine, or machines sharing a filesystem with
+    working locks, can open the same file. Lease expiry uses wall-clock time,
+    so nodes' clocks should be in sync to well within lease_seconds.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        lease_seconds: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Open (or create) a queue.
+
+        Args:
+            path: SQLite database file
+            lease_seconds: How long a lease lasts before the recipient is handed
+                out again unless renewed; keep it well above a QueueDrain's
+                renew_interval (default: 300)
+            clock: Wall-clock time source in seconds (default: time.time)
+        """
+        self.lease_seconds = lease_seconds
+        self._clock = clock
+        self._connection = connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS recipients ("
+            "id INTEGER PRIMARY KEY, phone TEXT NOT NULL UNIQUE, "
+            "state TEXT NOT NULL DEFAULT 'pending', owner TEXT, lease_until REAL, "
+            "leases INTEGER NOT NULL DEFAULT 0, result TEXT)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS recipients_state ON recipients (state, lease_until)"
+        )
+        self._lock = threading.Lock()
+
+    def _transaction(self, work: Callable[[sqlite3.Connection], object]) -> object:
+        """Run work inside a write transaction."""
+        return transaction(self._connection, self._lock, work)
+
+    def add(self, phones: Iterable[str], batch_size: int = 10_000) -> int:
+        """
+        Queue recipients, ignoring any already in the queue.
+
+        Every node of a campaign can add the same list safely. Returns how many
+        were new.
+        """
+        phones = iter(phones)
+        added = 0
+        while batch := list(islice(phones, batch_size)):
+            added += self._transaction(lambda connection, batch=batch: connection.executemany(
+                "INSERT OR IGNORE INTO recipients (phone) VALUES (?)", ((p,) for p in batch)
+            ).rowcount)
+        return added
+
+    def lease(self, owner: str, count: int) -> list[str]:
+        """Lease up to count pending or expired recipients to owner, oldest first."""
+        def take(connection: sqlite3.Connection) -> list[str]:
+            now = self._clock()
+            rows = connection.execute(
+                "SELECT id, phone FROM recipients WHERE state = 'pending' ORDER BY id LIMIT ?",
+                (count,),
+            ).fetchall()
+            if len(rows) < count:
+                rows += connection.execute(
+                    "SELECT id, phone FROM recipients "
+                    "WHERE state = 'leased' AND lease_until <= ? LIMIT ?",
+                    (now, count - len(rows)),
+                ).fetchall()
+            connection.executemany(
+                "UPDATE recipients SET state = 'leased', owner = ?, lease_until = ?, "
+                "leases = leases + 1 WHERE id = ?",
+                ((owner, now + self.lease_seconds, row_id) for row_id, _ in rows),
+            )
+            return [phone for _, phone in rows]
+
+        return self._transaction(take)
+
+    def ack(self, owner: str, results: list[dict]) -> int:
+        """Mark owner's leased recipients done or failed; return how many were still owner's."""
+        return self._transaction(lambda connection: connection.executemany(
+            "UPDATE recipients SET state = ?, result = ?, owner = NULL, lease_until = NULL "
+            "WHERE phone = ? AND owner = ? AND state = 'leased'",
+            (
+                ("done" if result["success"] else "failed", json.dumps(result),
+                 result["phone"], owner)
+                for result in results
+            ),
+        ).rowcount)
+
+    def renew(self, owner: str, phones: Iterable[str]) -> set[str]:
+        """Extend owner's leases on phones; return the phones still leased to owner."""
+        def extend(connection: sqlite3.Connection) -> set[str]:
+            lease_until = self._clock() + self.lease_seconds
+            return {
+                phone for phone in phones
+                if connection.execute(
+                    "UPDATE recipients SET lease_until = ? "
+                    "WHERE phone = ? AND owner = ? AND state = 'leased'",
+                    (lease_until, phone, owner),
+                ).rowcount
+            }
+
+        return self._transaction(extend)
+
+    def remaining(self) -> int:
+        """Count recipients not yet acked, whether pending or leased."""
+        counts = self.counts()
+        return counts["pending"] + counts["leased"]
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of recipients in each state."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT state, COUNT(*) FROM recipients GROUP BY state"
+            ).fetchall()
+        return {"pending": 0, "leased": 0, "done": 0, "failed": 0, **dict(rows)}
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def __enter__(self) -> "SqliteWorkQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class QueueDrain:  # pylint: disable=too-many-instance-attributes
+    """
+    Feed send_bulk from a WorkQueue and ack its results.
+
+    recipients() leases batches as send_bulk consumes them and stops when
+    nothing is left to lease; the drain itself is the send_bulk sink, acking
+    results in batches. send_from_queue runs it to completion.
+
+    While any leased recipient is unacked, a background thread renews the
+    leases every renew_interval, so a batch that takes longer than the lease
+    to send is not handed to another worker. A recipient whose lease was lost
+    anyway, e.g. while this process was paused, is dropped instead of sent.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        queue: WorkQueue,
+        owner: str | None = None,
+        batch_size: int = 100,
+        sink: ResultSink | None = None,
+        renew_interval: float = 60.0,
+    ):
+        """
+        Initialize the drain.
+
+        Args:
+            queue: Queue to lease recipients from
+            owner: Name this worker leases under (default: host, pid and a
+                random suffix)
+            batch_size: Recipients leased, and results acked, at a time
+                (default: 100)
+            sink: Optional destination every result is also written to
+            renew_interval: Seconds between lease renewals; keep it well below
+                the queue's lease time (default: 60)
+        """
+        self.queue = queue
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.batch_size = batch_size
+        self.sink = sink
+        self.renew_interval = renew_interval
+        self._unacked: list[dict] = []
+        # Recipients leased and not yet acked, and those of them whose lease
+        # renewal found taken by another worker
+        self._leased: set[str] = set()
+        self._lost: set[str] = set()
+        self._lock = threading.Lock()
+        self._heartbeat: threading.Thread | None = None
+        self._closed = threading.Event()
+        # Results whose lease had expired and gone to another worker by the time
+        # they were acked; those recipients may have been messaged twice
+        self.lost_leases = 0
+        # Leased recipients dropped unsent because their lease was lost first
+        self.released = 0
+
+    def recipients(self) -> Iterator[str]:
+        """Yield leased recipients until there are none left to lease."""
+        while True:
+            self.flush()
+            batch = self.queue.lease(self.owner, self.batch_size)
+            if not batch:
+                return
+            with self._lock:
+                self._leased.update(batch)
+                if self._heartbeat is None:
+                    self._heartbeat = threading.Thread(target=self._renew_leases, daemon=True)
+                    self._heartbeat.start()
+            for phone in batch:
+                with self._lock:
+                    lost = phone in self._lost
+                    self._lost.discard(phone)
+                if lost:
+                    self.released += 1
+                else:
+                    yield phone
+
+    def _renew_leases(self) -> None:
+        """Heartbeat thread: renew unacked leases until all are acked or the drain closes."""
+        while not self._closed.wait(self.renew_interval):
+            with self._lock:
+                if not self._leased:
+                    self._heartbeat = None
+                    return
+                phones = list(self._leased)
+            held = self.queue.renew(self.owner, phones)
+            with self._lock:
+                lost = self._leased.intersection(phones).difference(held)
+                self._leased -= lost
+                self._lost |= lost
+
+    def write(self, result: dict) -> None:
+        """Queue the result for acking, acking when a batch is full."""
+        self._unacked.append(result)
+        if self.sink is not None:
+            self.sink.write(result)
+        if len(self._unacked) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Ack the results collected so far."""
+        if self._unacked:
+            accepted = self.queue.ack(self.owner, self._unacked)
+            self.lost_leases += len(self._unacked) - accepted
+            with self._lock:
+                self._leased.difference_update(result["phone"] for result in self._unacked)
+            self._unacked = []
+
+    def close(self) -> None:
+        """Ack remaining results and stop renewing; the queue and downstream sink stay open."""
+        self.flush()
+        self._closed.set()
+
+
+class _RoundProgress:
+    """
+    Pass one send_bulk round's updates to a reporter without finishing it.
+
+    send_bulk finishes its reporter when it returns, which for a queue is at
+    the end of every round, including the empty ones while other workers'
+    leases are waited on; the final report belongs after the last round.
+    """
+
+    def __init__(self, progress: ProgressReporter):
+        self.progress = progress
+
+    def update(self, result: dict, latency: float) -> None:
+        """Count one completed recipient."""
+        self.progress.update(result, latency)
+
+    def finish(self) -> None:
+        """Leave the final report to send_from_queue."""
+
+
+def send_from_queue(  # pylint: disable=too-many-arguments
+    sender: "SMSSender",
+    drain: QueueDrain,
+    body: str,
+    send_at: datetime | ScheduleSpec,
+    timezone: str = "America/New_York",
+    *,
+    max_workers: int = 1,
+    concurrency: AdaptiveConcurrency | None = None,
+    journal: SendJournal | None = None,
+    progress: ProgressReporter | None = None,
+    poll_interval: float = 1.0,
+) -> BulkStats:
+    """
+    Send to recipients leased from a shared work queue until it is drained.
+
+    Several processes or machines can drain the same queue at once; each
+    recipient is leased to one of them, sent with send_bulk and acked. When
+    nothing is left to lease but other workers still hold leases, this waits
+    and polls, so recipients whose worker died are sent once their lease
+    expires.
+
+    Args:
+        sender: Sender the recipients are sent with
+        drain: Drain over the queue, naming this worker and its batch size;
+            its lost_leases counts acks that came too late and released
+            the recipients dropped because their lease was lost
+        body: Message content
+        send_at: Local datetime to send the messages, or a ScheduleSpec
+        timezone: Timezone for send_at (default: America/New_York); ignored
+            for a ScheduleSpec
+        max_workers: Number of threads sending concurrently (default: 1)
+        concurrency: Optional AIMD controller; replaces max_workers
+        journal: Optional journal of completed recipients, which are skipped
+            and acked instead of being sent again
+        progress: Optional reporter updated as each recipient completes and
+            finished once the queue is drained (default: no output)
+        poll_interval: Seconds between checks while waiting on other
+            workers' leases (default: 1.0)
+
+    Returns:
+        BulkStats for the recipients this worker sent; results go to the
+        drain's sink. The stats are also left in sender's last_run_stats.
+    """
+    stats = BulkStats()
+    started = time.monotonic()
+    spec = ScheduleSpec.of(send_at, timezone)
+    round_progress = _RoundProgress(progress) if progress is not None else None
+    while True:
+        # send_bulk only returns once every result is in, so this worker's
+        # leases are all acked before it waits on anyone else's
+        stats.merge(sender.send_bulk(
+            drain.recipients(),
+            body,
+            spec,
+            timezone,
+            max_workers=max_workers,
+            concurrency=concurrency,
+            journal=journal,
+            sink=drain,
+            progress=round_progress,
+        ))
+        drain.flush()
+        if not drain.queue.remaining():
+            break
+        time.sleep(poll_interval)
+
+    if progress is not None:
+        progress.finish()
+    stats.elapsed = time.monotonic() - started
+    if concurrency is not None:
+        stats.concurrency_limit = concurrency.limit
+        stats.concurrency_history = list(concurrency.history)
+    sender.last_run_stats = stats
+    return stats